@@ -12,8 +12,10 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 import os
-from decouple import Config, RepositoryEnv
+from copy import deepcopy
+from decouple import Config, Csv, RepositoryEnv
 from datetime import timedelta
+from importlib.util import find_spec
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -50,12 +52,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'tasks.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'tasks.middleware.PoolTimeoutMiddleware',
 ]
 
 ROOT_URLCONF = 'tasklist.urls'
@@ -85,8 +89,55 @@ REST_FRAMEWORK = {
      'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'tasks.authentication.CachedJWTAuthentication',
     ],
+    # orjson-backed, with the same output as DRF's JSON classes (which they fall
+    # back to when orjson isn't installed)
+    'DEFAULT_RENDERER_CLASSES': [
+        'tasks.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'tasks.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# application/msgpack requests and responses, for service clients, when msgpack is installed
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('tasks.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('tasks.parsers.MessagePackParser')
+
+# Stateless mode: authenticate from the token's user_id/username/role claims without
+# touching the database. Role changes and deactivation then take effect at the user's
+# next token refresh, which reads the user, so at the latest when the current access
+# token expires.
+JWT_STATELESS_AUTH = config('JWT_STATELESS_AUTH', default=False, cast=bool)
+if JWT_STATELESS_AUTH:
+    REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] = [
+        'rest_framework_simplejwt.authentication.JWTStatelessUserAuthentication',
+    ]
+
+# In-process cache of the user columns read by CachedJWTAuthentication. User changes
+# reach other workers through a version key in the ALIAS cache when that cache is
+# shared; with a per-process cache they wait up to TIMEOUT seconds.
+JWT_USER_CACHE = {
+    'ALIAS': 'default',
+    'MAX_SIZE': config('JWT_USER_CACHE_MAX_SIZE', default=10000, cast=int),
+    'TIMEOUT': config('JWT_USER_CACHE_TIMEOUT', default=60, cast=int),
+}
+
+
+# Production server started by `manage.py serve`
+SERVER = {
+    'BIND': config('SERVER_BIND', default='0.0.0.0:8000'),
+    'WORKERS': config('SERVER_WORKERS', default=2, cast=int),
+    'THREADS': config('SERVER_THREADS', default=4, cast=int),
+    'ASGI': config('SERVER_ASGI', default=False, cast=bool),
+    'TIMEOUT': config('SERVER_TIMEOUT', default=30, cast=int),
+    'GRACEFUL_TIMEOUT': config('SERVER_GRACEFUL_TIMEOUT', default=30, cast=int),
+    'MAX_REQUESTS': config('SERVER_MAX_REQUESTS', default=0, cast=int),
 }
 
 
@@ -101,6 +152,11 @@ REST_FRAMEWORK = {
 # }
 
 
+# Connections come from a per-process psycopg pool (DB_POOL=True), or otherwise stay
+# open for DB_CONN_MAX_AGE seconds. Either way a reused connection is health-checked
+# before use. Size the pool to at least the server's threads per worker.
+DB_POOL = config('DB_POOL', default=True, cast=bool)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',  
@@ -109,9 +165,97 @@ DATABASES = {
         'PASSWORD': config('POSTGRES_PASSWORD', default='tasklist_pass'),  
         'HOST': config('DB_HOST', default='tasklist-db'),  
         'PORT': config('DB_PORT', default='5432'), 
+        'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+        },
+    }
+}
+
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=8, cast=int),
+        # Seconds an idle connection above min_size is kept
+        'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+        # Seconds a request waits for a free connection before failing with 503
+        'timeout': config('DB_POOL_TIMEOUT', default=3, cast=float),
+    }
+
+# Read replicas (DB_REPLICA_HOSTS, comma separated) become the aliases replica_1,
+# replica_2, ... with the default connection settings. Safe requests read from one of
+# them, picked by DB_REPLICA_WEIGHTS; a user stays on the primary for
+# DB_REPLICA_PIN_SECONDS after a write request.
+READ_REPLICAS = {
+    'WEIGHTS': {},
+    'PIN_SECONDS': config('DB_REPLICA_PIN_SECONDS', default=5, cast=int),
+    'CACHE_ALIAS': 'default',
+}
+replica_hosts = config('DB_REPLICA_HOSTS', default='', cast=Csv())
+replica_weights = config('DB_REPLICA_WEIGHTS', default='', cast=Csv(int))
+for index, host in enumerate(replica_hosts):
+    alias = f'replica_{index + 1}'
+    DATABASES[alias] = {**deepcopy(DATABASES['default']), 'HOST': host, 'TEST': {'MIRROR': 'default'}}
+    READ_REPLICAS['WEIGHTS'][alias] = replica_weights[index] if index < len(replica_weights) else 1
+
+DATABASE_ROUTERS = ['tasks.routers.ReplicaRouter']
+
+# Cache
+# LocMemCache is per process; point CACHE_BACKEND/CACHE_LOCATION at a shared cache
+# (e.g. django.core.cache.backends.redis.RedisCache) when running several workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='tasklist'),
     }
 }
 
+TASK_LIST_CACHE = {
+    'ENABLED': config('TASK_LIST_CACHE_ENABLED', default=True, cast=bool),
+    'ALIAS': 'default',
+    'TIMEOUT': config('TASK_LIST_CACHE_TIMEOUT', default=300, cast=int),
+}
+
+# Developer directory (/api/users/developers/), cached in the default cache and
+# replaced whenever a user changes
+DEVELOPER_DIRECTORY_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': config('DEVELOPER_DIRECTORY_CACHE_TIMEOUT', default=300, cast=int),
+}
+
+# Delta sync (/api/tasks/changes/): changes younger than SETTLE_SECONDS wait for the
+# next poll so in-flight transactions can commit; tombstones are kept TOMBSTONE_DAYS
+# days (purge_task_tombstones), older watermarks must resync from scratch.
+TASK_SYNC = {
+    'SETTLE_SECONDS': config('TASK_SYNC_SETTLE_SECONDS', default=2, cast=float),
+    'TOMBSTONE_DAYS': config('TASK_SYNC_TOMBSTONE_DAYS', default=30, cast=int),
+}
+
+# Live task events (/api/async/tasks/events/, ASGI only). LocalTaskEventBackend only
+# reaches streams served by the writing process; with several workers use
+# tasks.events.PostgresTaskEventBackend (LISTEN/NOTIFY on CHANNEL). A stream more than
+# QUEUE_SIZE events behind, or a write of more than MAX_BATCH_EVENTS tasks, gets a
+# reload event instead of the individual changes.
+TASK_EVENTS = {
+    'BACKEND': config('TASK_EVENTS_BACKEND', default='tasks.events.LocalTaskEventBackend'),
+    'CHANNEL': config('TASK_EVENTS_CHANNEL', default='task_events'),
+    'HEARTBEAT_SECONDS': config('TASK_EVENTS_HEARTBEAT_SECONDS', default=15, cast=float),
+    'QUEUE_SIZE': config('TASK_EVENTS_QUEUE_SIZE', default=100, cast=int),
+    'MAX_BATCH_EVENTS': config('TASK_EVENTS_MAX_BATCH_EVENTS', default=100, cast=int),
+}
+
+# In-process set of blacklisted refresh token ids checked by /api/token/refresh/.
+# Blacklists made by other processes are seen at once through the shared cache's
+# version key, or within SYNC_INTERVAL seconds when the cache is per process.
+TOKEN_BLACKLIST_CACHE = {
+    'ENABLED': config('TOKEN_BLACKLIST_CACHE_ENABLED', default=True, cast=bool),
+    'ALIAS': 'default',
+    'MAX_SIZE': config('TOKEN_BLACKLIST_CACHE_MAX_SIZE', default=100000, cast=int),
+    'SYNC_INTERVAL': config('TOKEN_BLACKLIST_CACHE_SYNC_INTERVAL', default=60, cast=int),
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -170,6 +314,8 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_USER_CLASS': 'tasks.authentication.RoleTokenUser',
+    'TOKEN_REFRESH_SERIALIZER': 'tasks.serializers.CustomTokenRefreshSerializer',
 }
 
 CSRF_COOKIE_SAMESITE = 'Lax'
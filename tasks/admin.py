@@ -1,5 +1,23 @@
+from contextlib import contextmanager
+
 from django.contrib import admin
+from django.db import transaction
+from .cache import task_list_cache
+from .changes import task_tombstones
+from .counters import task_counters
+from .events import task_events
 from .models import Task, User
+from .search import search_tasks
+
+
+# Admin deletes update the counters, tombstones, events and list cache once per
+# action instead of once per task
+@contextmanager
+def batched_task_writes():
+    with transaction.atomic(), task_counters.batch(), task_tombstones.batch(), task_events.batch(), \
+            task_list_cache.batch():
+        yield
+
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
@@ -8,4 +26,24 @@ class TaskAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description') 
     readonly_fields = ('created_at', 'updated_at', 'completed_at')
 
-admin.site.register(User)
+    # Use the search indexes instead of icontains scans over search_fields
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return search_tasks(queryset, search_term.strip()), False
+
+    def delete_queryset(self, request, queryset):
+        with batched_task_writes():
+            super().delete_queryset(request, queryset)
+
+
+# Deleting users cascades to their tasks
+@admin.register(User)
+class UserAdmin(admin.ModelAdmin):
+    def delete_model(self, request, obj):
+        with batched_task_writes():
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with batched_task_writes():
+            super().delete_queryset(request, queryset)
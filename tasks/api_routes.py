@@ -1,6 +1,7 @@
 from django.urls import path
 from rest_framework_simplejwt import views as jwt_views
-from .api_views import TaskListCreateAPIView, TaskDetailAPIView, SignUpView, CustomTokenObtainPairView, LogoutView, UserListAPIView
+from .async_views import AsyncTaskListAPIView, AsyncTaskDetailAPIView, AsyncUserListAPIView, AsyncTaskEventsAPIView
+from .api_views import TaskListCreateAPIView, TaskDetailAPIView, SignUpView, CustomTokenObtainPairView, LogoutView, UserListAPIView, DeveloperDirectoryAPIView, TaskBulkAPIView, TaskToggleDoneAPIView, TaskListCacheStatsAPIView, DatabasePoolStatsAPIView, TaskStatsAPIView, TaskCountsAPIView, TaskExportAPIView, TaskImportAPIView, TaskChangesAPIView
 
 urlpatterns = [
     path('signup/', SignUpView.as_view(), name='api-signup'),
@@ -8,6 +9,20 @@ urlpatterns = [
     path('token/refresh/', jwt_views.TokenRefreshView.as_view(), name='api-token_refresh'),
     path('logout/', LogoutView.as_view(), name='api-logout'),
     path('users/', UserListAPIView.as_view(), name='api-user-list'),
+    path('users/developers/', DeveloperDirectoryAPIView.as_view(), name='api-developer-directory'),
     path('tasks/', TaskListCreateAPIView.as_view(), name='api-task-list-create'),
+    path('tasks/changes/', TaskChangesAPIView.as_view(), name='api-task-changes'),
+    path('tasks/import/', TaskImportAPIView.as_view(), name='api-task-import'),
+    path('tasks/export/', TaskExportAPIView.as_view(), name='api-task-export'),
+    path('tasks/stats/', TaskStatsAPIView.as_view(), name='api-task-stats'),
+    path('tasks/counts/', TaskCountsAPIView.as_view(), name='api-task-counts'),
+    path('tasks/cache-stats/', TaskListCacheStatsAPIView.as_view(), name='api-task-cache-stats'),
+    path('db/pool-stats/', DatabasePoolStatsAPIView.as_view(), name='api-db-pool-stats'),
+    path('tasks/bulk/', TaskBulkAPIView.as_view(), name='api-task-bulk'),
     path('tasks/<int:pk>/', TaskDetailAPIView.as_view(), name='api-task-detail'),
+    path('tasks/<int:pk>/toggle/', TaskToggleDoneAPIView.as_view(), name='api-task-toggle'),
+    path('async/users/', AsyncUserListAPIView.as_view(), name='api-async-user-list'),
+    path('async/tasks/', AsyncTaskListAPIView.as_view(), name='api-async-task-list'),
+    path('async/tasks/events/', AsyncTaskEventsAPIView.as_view(), name='api-async-task-events'),
+    path('async/tasks/<int:pk>/', AsyncTaskDetailAPIView.as_view(), name='api-async-task-detail'),
 ]
\ No newline at end of file
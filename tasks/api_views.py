@@ -1,29 +1,40 @@
 # Third party packages
+from datetime import timedelta
 from django.shortcuts import render
 from django.views import View
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, Count, Max, Value, When
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localdate, now
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import MultiPartParser
 from rest_framework import status
 from rest_framework.permissions import BasePermission
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
 
 # Custom or same Module
-from .serializers import TaskSerializer, UserSerializer
+from .serializers import TaskSerializer, TaskReadSerializer, TaskBulkSerializer, UserSerializer, CustomTokenObtainPairSerializer
 from .permissions import IsDeveloper, IsLead
-from .models import Task
-
-
-
-# Pagination class with 10 items per page
-class TaskPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+from .models import Task, TaskCounter
+from .pagination import TaskPagination, TaskCursorPagination, UserPagination
+from .renderers import CSVRenderer, NDJSONRenderer
+from .importer import TaskImporter, import_formats, read_rows
+from .conditional import make_etag, not_modified, set_validators
+from .cache import developer_directory, task_list_cache
+from .counters import task_counters
+from .changes import ExpiredWatermark, InvalidWatermark, task_changes, task_tombstones
+from .events import task_events
+from .db import pool_stats
+from .search import search_tasks
+from .stats import daily_histogram, developer_stats
 
 
 class SignUpView(APIView):
@@ -45,17 +56,9 @@ class SignUpView(APIView):
 
 
 # Custom view to add user ID, username, and role to the JWT response after successful login.
+# The serializer builds it from the user it just authenticated, so there is no second lookup.
 class CustomTokenObtainPairView(TokenObtainPairView):
-    def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
-        if response.status_code == 200:
-            user = get_user_model().objects.get(username=request.data['username'])
-            response.data['user'] = {
-                'id': user.id,
-                'username': user.username,
-                'role': user.role
-            }
-        return response
+    serializer_class = CustomTokenObtainPairSerializer
 
 
 class LogoutView(APIView):
@@ -77,21 +80,59 @@ class LogoutView(APIView):
             )
 
 
+def get_task_fields(request):
+    # ?fields= and ?exclude= of the task list and detail GETs
+    return TaskReadSerializer.select_fields(request.query_params.get('fields'), request.query_params.get('exclude'))
+
+
+# Only the serialized columns are read. Without ?page= or ?page_size= the whole list
+# is returned, as before; with either, a page of it.
 class UserListAPIView(APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = UserPagination
+    fields = ('id', 'username', 'role')
 
-    def get(self, request):
+    def get_queryset(self, request):
         role = request.query_params.get('role', None)
         User = get_user_model()
-        
+        users = User.objects.only(*self.fields).order_by('username', 'id')
+
         if role:
-            users = User.objects.filter(role=role)
-        else:
-            users = User.objects.all()
-            
+            return users.filter(role=role)
+        return users
+
+    def paginates(self, request):
+        params = ('page', self.pagination_class.page_size_query_param)
+        return any(param in request.query_params for param in params)
+
+    def get(self, request):
+        users = self.get_queryset(request)
+        if self.paginates(request):
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(users, request)
+            return paginator.get_paginated_response(UserSerializer(page, many=True).data)
         serializer = UserSerializer(users, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+
+# id and username of every developer, for the developer filter of the task page.
+# Served from the developer directory cache with an ETag, so a client that already
+# has the current list gets a 304 without the user table being read.
+class DeveloperDirectoryAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def load(self):
+        users = get_user_model().objects.filter(role='developer').order_by('username', 'id')
+        return list(users.values('id', 'username'))
+
+    def get(self, request):
+        version = developer_directory.get_version()
+        etag = make_etag('developers', version)
+        response = not_modified(request, etag)
+        if response:
+            return response
+        return set_validators(Response(developer_directory.get(version, self.load)), etag)
+
 class IsLead(BasePermission):
     def has_permission(self, request, view):
         return hasattr(request.user, 'role') and request.user.role == 'lead'
@@ -103,9 +144,12 @@ class IsDeveloper(BasePermission):
 
 class TaskListCreateAPIView(APIView):
     permission_classes = [IsAuthenticated]
-    pagination_class = TaskPagination    
+    pagination_class = TaskPagination
+    cursor_pagination_class = TaskCursorPagination
+    # Read by the cursor pagination and its ETag, whatever the fieldset
+    cursor_columns = ('id', 'created_at', 'updated_at')
 
-    def get(self, request):
+    def get_queryset(self, request):
         developer_id = request.query_params.get('developer', None)
         is_done = request.query_params.get('is_done', None)
 
@@ -115,22 +159,101 @@ class TaskListCreateAPIView(APIView):
             if developer_id:
                 tasks = tasks.filter(developer_id=developer_id)
         else:  
-            tasks = Task.objects.filter(developer=request.user)
+            tasks = Task.objects.filter(developer_id=request.user.id)
 
         # Apply status filter if present
         if is_done is not None:
             is_done_bool = is_done.lower() == 'true'
             tasks = tasks.filter(is_done=is_done_bool)
 
-        tasks = tasks.order_by('-created_at')
+        # Full-text search over title and description
+        query = request.query_params.get('q', '').strip()
+        if query:
+            tasks = search_tasks(tasks, query)
+
+        return tasks.order_by('-created_at')
+
+    page_stats = {'count': Count('id'), 'last_modified': Max('updated_at')}
+
+    def get_counter_scope(self, request):
+        """
+        The (developer_id, is_done) task counter that holds this request's count, or
+        None when the list is narrowed beyond what the counters track.
+        """
+        if request.query_params.get('q', '').strip():
+            return None
+        if request.user.role == 'lead':
+            developer_id = request.query_params.get('developer') or None
+            if developer_id is not None:
+                try:
+                    developer_id = int(developer_id)
+                except ValueError:
+                    return None
+        else:
+            developer_id = request.user.id
+        is_done = request.query_params.get('is_done', None)
+        return developer_id, None if is_done is None else is_done.lower() == 'true'
+
+    def get_page_stats(self, request, tasks):
+        # Count and last change of the scope from its counter row, not a COUNT(*)
+        scope = self.get_counter_scope(request)
+        if scope is None:
+            return tasks.aggregate(**self.page_stats)
+        return task_counters.page_stats(*scope)
+
+    def get_page_etag(self, request, stats, version):
+        # The scope version moves on task writes and on renames of their developers,
+        # which change developer_username without touching the tasks
+        return make_etag(request.user.id, request.get_full_path(), stats['count'], stats['last_modified'], version)
+
+    def get_cursor_etag(self, request, rows):
+        return make_etag(
+            request.user.id, request.get_full_path(),
+            *((row.id, row.updated_at, getattr(row, 'developer_username', None)) for row in rows)
+        )
+
+    def get(self, request):
+        try:
+            fields = get_task_fields(request)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        version = task_list_cache.request_version(request)
+        cache_key = task_list_cache.key(request, version)
+        cached = task_list_cache.get(cache_key)
+        if cached:
+            etag, data = cached
+            return not_modified(request, etag) or set_validators(Response(data), etag)
+
+        tasks = self.get_queryset(request)
+
+        # ?cursor= opts into keyset pagination. Its ETag comes from the fetched page,
+        # so polling never adds a COUNT(*) to the cursor path.
+        if self.cursor_pagination_class.cursor_query_param in request.query_params:
+            paginator = self.cursor_pagination_class()
+            paginated_tasks = paginator.paginate_queryset(
+                TaskReadSerializer.rows(tasks, fields, self.cursor_columns), request
+            )
+            etag = self.get_cursor_etag(request, paginated_tasks)
+            response = not_modified(request, etag)
+            if response:
+                return response
+        else:
+            stats = self.get_page_stats(request, tasks)
+            etag = self.get_page_etag(request, stats, version)
+            response = not_modified(request, etag)
+            if response:
+                return response
+            paginator = self.pagination_class()
+            # Value rows carry developer_username through a join, so the page is one query
+            paginated_tasks = paginator.paginate_queryset(
+                TaskReadSerializer.rows(tasks, fields), request, count=stats['count']
+            )
 
-        # Initialize paginator
-        paginator = self.pagination_class()
-        paginated_tasks = paginator.paginate_queryset(tasks, request)
-        
-        serializer = TaskSerializer(paginated_tasks, many=True)
-        
-        return paginator.get_paginated_response(serializer.data)
+        serializer = TaskReadSerializer(paginated_tasks, many=True, fields=fields)
+        response = paginator.get_paginated_response(serializer.data)
+        task_list_cache.set(cache_key, etag, response.data)
+        return set_validators(response, etag)
 
     def post(self, request):
         if request.user.role == 'lead':
@@ -151,20 +274,56 @@ class TaskListCreateAPIView(APIView):
 class TaskDetailAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
+    # Read for the ownership check and the validators, whatever the fieldset
+    detail_columns = ('id', 'updated_at', 'developer_id')
+
+    def get_task_queryset(self, fields=None):
+        # The ownership check and developer_username both need the developer row
+        if fields is None:
+            return Task.objects.select_related('developer')
+        # A sparse fieldset loads its columns only, and joins the developer for
+        # developer_username alone
+        columns = TaskReadSerializer.get_columns(fields, self.detail_columns)
+        names = ['developer' if column == 'developer_id' else column for column in columns if column != 'developer_username']
+        if 'developer_username' in columns:
+            return Task.objects.select_related('developer').only(*names, 'developer__username')
+        return Task.objects.only(*names)
+
+    def get_task(self, pk):
+        return self.get_task_queryset().get(pk=pk)
+
     def get(self, request, pk):
         try:
-            task = Task.objects.get(pk=pk)
-            if request.user.role == 'developer' and task.developer != request.user:
-                return Response({"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN)
+            fields = get_task_fields(request)
+            task = self.get_task_queryset(fields).get(pk=pk)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         except Task.DoesNotExist:
             return Response({"error": "Task not found"}, status=status.HTTP_404_NOT_FOUND)
+        return self.retrieve(request, task, fields)
 
-        serializer = TaskSerializer(task)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def retrieve(self, request, task, fields=None):
+        if request.user.role == 'developer' and task.developer_id != request.user.id:
+            return Response({"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN)
+
+        with_username = task.developer_id and (fields is None or 'developer_username' in fields)
+        etag = make_etag(task.id, task.updated_at, task.developer_id, task.developer.username if with_username else None)
+        response = not_modified(request, etag, task.updated_at)
+        if response:
+            return response
+
+        serializer = TaskReadSerializer(task, fields=fields)
+        return set_validators(Response(serializer.data, status=status.HTTP_200_OK), etag, task.updated_at)
 
     def put(self, request, pk):
+        return self.update(request, pk, partial=False)
+
+    def patch(self, request, pk):
+        return self.update(request, pk, partial=True)
+
+    def update(self, request, pk, partial):
         try:
-            task = Task.objects.get(pk=pk)
+            task = self.get_task(pk)
             if request.user.role == 'lead':
                 return Response({"error": "Leads cannot update tasks"}, status=status.HTTP_403_FORBIDDEN)
             if request.user.role == 'developer' and task.developer != request.user:
@@ -172,7 +331,7 @@ class TaskDetailAPIView(APIView):
         except Task.DoesNotExist:
             return Response({"error": "Task not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = TaskSerializer(task, data=request.data)
+        serializer = TaskSerializer(task, data=request.data, partial=partial)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -180,7 +339,7 @@ class TaskDetailAPIView(APIView):
 
     def delete(self, request, pk):
         try:
-            task = Task.objects.get(pk=pk)
+            task = self.get_task(pk)
             if request.user.role == 'lead':
                 return Response({"error": "Leads cannot delete tasks"}, status=status.HTTP_403_FORBIDDEN)
             if request.user.role == 'developer' and task.developer != request.user:
@@ -190,3 +349,386 @@ class TaskDetailAPIView(APIView):
 
         task.delete()
         return Response({"message": "Task deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
+
+
+# Delta sync: tasks of the user's scope (?developer= for leads) changed after ?since=,
+# ids of tasks deleted from it, and the watermark to pass next time. Without ?since=
+# the whole scope is returned; follow the watermark while has_more is true.
+class TaskChangesAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    default_page_size = 100
+    max_page_size = 1000
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get('page_size', self.default_page_size))
+        except ValueError:
+            return self.default_page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get(self, request):
+        developer_id = request.user.id
+        if request.user.role == 'lead':
+            developer_id = request.query_params.get('developer') or None
+            if developer_id is not None and not developer_id.isdigit():
+                return Response({"error": "Invalid developer"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            data = task_changes(developer_id, request.query_params.get('since') or None, self.get_page_size(request))
+        except InvalidWatermark:
+            return Response({"error": "Invalid watermark"}, status=status.HTTP_400_BAD_REQUEST)
+        except ExpiredWatermark:
+            return Response(
+                {"error": "Watermark expired; sync again without since"},
+                status=status.HTTP_410_GONE
+            )
+        return Response(data, status=status.HTTP_200_OK)
+
+
+# Full export of the task list (same scoping and filters) as CSV or NDJSON, picked by
+# ?format= or the Accept header. Rows stream from a server-side cursor in chunks, so
+# neither the page size cap nor the export size matters.
+class TaskExportAPIView(TaskListCreateAPIView):
+    http_method_names = ['get', 'options']
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+    chunk_size = 2000
+
+    def get(self, request):
+        tasks = self.get_queryset(request).order_by('-created_at', '-id')
+        # The rows are read after the view returns; keep the database chosen for this request
+        tasks = tasks.using(tasks.db)
+        renderer = request.accepted_renderer
+        stream = renderer.astream if isinstance(request._request, ASGIRequest) else renderer.stream
+        response = StreamingHttpResponse(
+            stream(TaskReadSerializer.rows(tasks), self.chunk_size),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = f'attachment; filename="tasks.{renderer.format}"'
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Errors and OPTIONS are JSON like the rest of the API
+        if isinstance(response, Response):
+            request.accepted_renderer = JSONRenderer()
+            request.accepted_media_type = JSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+# Imports the developer's own tasks from CSV or NDJSON (columns title, description,
+# is_done), sent as the request body or as a multipart "file". The input is read as a
+# stream and inserted in batches of ?batch_size= rows; the response reports the
+# created rows, row-level errors and rows/second.
+class TaskImportAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    content_formats = {'text/csv': 'csv', 'application/x-ndjson': 'ndjson'}
+    default_batch_size = 1000
+    max_batch_size = 5000
+
+    def get_input(self, request):
+        content_type = request.content_type.split(';')[0].strip().lower()
+        if content_type in self.content_formats:
+            return request.stream or [], self.content_formats[content_type]
+        if content_type == 'multipart/form-data':
+            upload = request.FILES.get('file')
+            extension = upload.name.rsplit('.', 1)[-1].lower() if upload else None
+            if extension in import_formats:
+                return upload, extension
+        return None, None
+
+    def get_batch_size(self, request):
+        try:
+            batch_size = int(request.query_params.get('batch_size', self.default_batch_size))
+        except ValueError:
+            return self.default_batch_size
+        return min(max(batch_size, 1), self.max_batch_size)
+
+    def post(self, request):
+        if request.user.role == 'lead':
+            return Response({"error": "Leads cannot create tasks"}, status=status.HTTP_403_FORBIDDEN)
+        lines, format = self.get_input(request)
+        if lines is None:
+            return Response(
+                {"error": "Send text/csv or application/x-ndjson, or a multipart 'file' named *.csv or *.ndjson"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+        importer = TaskImporter(self.get_batch_size(request), developer=request.user)
+        return Response(importer.run(read_rows(lines, format)), status=status.HTTP_200_OK)
+
+
+# Dashboard numbers computed in the database: per-developer totals and completion-time
+# percentiles, and daily created/completed counts between ?start= and ?end= (the last
+# 30 days by default). Takes the task list's scoping and filters.
+class TaskStatsAPIView(TaskListCreateAPIView):
+    http_method_names = ['get', 'options']
+    default_days = 30
+    max_days = 366
+
+    def get_date_range(self, request):
+        try:
+            end = self.parse_date_param(request, 'end') or localdate()
+            start = self.parse_date_param(request, 'start') or end - timedelta(days=self.default_days - 1)
+        except ValueError:
+            return None
+        if start > end or (end - start).days >= self.max_days:
+            return None
+        return start, end
+
+    def parse_date_param(self, request, name):
+        value = request.query_params.get(name)
+        if not value:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise ValueError(value)
+        return parsed
+
+    def get(self, request):
+        date_range = self.get_date_range(request)
+        if date_range is None:
+            return Response(
+                {"error": f"start and end must be YYYY-MM-DD dates, start <= end, at most {self.max_days} days apart"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        start, end = date_range
+        tasks = self.get_queryset(request)
+        return Response({
+            'developers': developer_stats(tasks),
+            'daily': {
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'days': daily_histogram(tasks, start, end),
+            },
+        }, status=status.HTTP_200_OK)
+
+
+# Task totals from the counter rows: every developer's plus the overall row for leads,
+# the developer's own row otherwise. Reads no task rows at all.
+class TaskCountsAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        counters = TaskCounter.objects.select_related('developer').order_by('key')
+        if request.user.role != 'lead':
+            counters = counters.filter(key=task_counters.developer_key(request.user.id))
+        data = [
+            {
+                'developer': counter.developer_id,
+                'developer_username': counter.developer.username if counter.developer else None,
+                'total': counter.total,
+                'done': counter.done,
+                'open': counter.open,
+                'changed_at': counter.changed_at,
+            }
+            for counter in counters
+        ]
+        return Response(data, status=status.HTTP_200_OK)
+
+
+# Hit/miss counters of the task list cache in this worker process
+class TaskListCacheStatsAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsLead]
+
+    def get(self, request):
+        return Response(task_list_cache.stats(), status=status.HTTP_200_OK)
+
+
+# Database connection pool usage in this worker process, for sizing the pool
+class DatabasePoolStatsAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsLead]
+
+    def get(self, request):
+        return Response(pool_stats(), status=status.HTTP_200_OK)
+
+
+# Sets is_done (or flips it when no value is given) with one conditional UPDATE,
+# keeping the completed_at rules of Task.save().
+class TaskToggleDoneAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        if request.user.role == 'lead':
+            return Response({"error": "Leads cannot update tasks"}, status=status.HTTP_403_FORBIDDEN)
+
+        is_done = request.data.get('is_done') if isinstance(request.data, dict) else None
+        if is_done is not None and not isinstance(is_done, bool):
+            return Response({"is_done": ["Must be a boolean."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        timestamp = now()
+        tasks = Task.objects.filter(pk=pk, developer_id=request.user.id)
+        with transaction.atomic():
+            if is_done is None:
+                updated = tasks.update(
+                    is_done=Case(When(is_done=True, then=Value(False)), default=Value(True)),
+                    completed_at=Case(When(is_done=True, then=Value(None)), default=Value(timestamp)),
+                    updated_at=timestamp,
+                )
+            else:
+                updated = tasks.exclude(is_done=is_done).update(
+                    is_done=is_done,
+                    completed_at=timestamp if is_done else None,
+                    updated_at=timestamp,
+                )
+
+            # Read back inside the transaction: the row is still locked by the UPDATE
+            rows = list(TaskReadSerializer.rows(Task.objects.filter(pk=pk)))
+            if updated:
+                # QuerySet.update() doesn't send post_save
+                task_list_cache.invalidate([request.user.id])
+                task_counters.record((request.user.id, not rows[0].is_done), (request.user.id, rows[0].is_done))
+                task_events.record('updated', rows[0].id, request.user.id)
+
+        if not rows:
+            return Response({"error": "Task not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not updated and rows[0].developer_id != request.user.id:
+            return Response({"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN)
+        return Response(TaskReadSerializer(rows[0]).data, status=status.HTTP_200_OK)
+
+
+# Bulk create (POST), update (PATCH) and delete (DELETE) with the same rules as the
+# single-task views. Each write is one bulk_create / UPDATE / DELETE inside a single
+# transaction, and every item gets its own status in the 207 response.
+class TaskBulkAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    max_batch_size = 500
+
+    def get_items(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return None, Response({"error": "Expected a list of items"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.max_batch_size:
+            return None, Response(
+                {"error": f"At most {self.max_batch_size} items per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return items, None
+
+    def get_item_id(self, item):
+        value = item.get('id') if isinstance(item, dict) else item
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def bulk_response(self, results, written, item_status):
+        # Re-read the written rows in one query so every item gets the stored representation
+        rows = TaskReadSerializer.rows(Task.objects.filter(pk__in=[task.id for _, task in written]))
+        data = {item['id']: item for item in TaskReadSerializer(rows, many=True).data}
+        for index, task in written:
+            results[index] = {"index": index, "id": task.id, "status": item_status, "data": data[task.id]}
+        return Response({"results": results}, status=status.HTTP_207_MULTI_STATUS)
+
+    def post(self, request):
+        if request.user.role == 'lead':
+            return Response({"error": "Leads cannot create tasks"}, status=status.HTTP_403_FORBIDDEN)
+        items, error = self.get_items(request)
+        if error:
+            return error
+
+        results = [None] * len(items)
+        written = []
+        for index, item in enumerate(items):
+            serializer = TaskBulkSerializer(data=item)
+            if not serializer.is_valid():
+                results[index] = {"index": index, "status": status.HTTP_400_BAD_REQUEST, "errors": serializer.errors}
+                continue
+            task = Task(developer_id=request.user.id, **serializer.validated_data)
+            task.update_completed_at()
+            written.append((index, task))
+
+        with transaction.atomic():
+            Task.objects.bulk_create([task for _, task in written])
+            # bulk_create doesn't send post_save
+            task_list_cache.invalidate([request.user.id])
+            with task_counters.batch(), task_events.batch():
+                for _, task in written:
+                    task_counters.record(None, (task.developer_id, task.is_done))
+                    task_events.record('created', task.id, task.developer_id)
+        return self.bulk_response(results, written, status.HTTP_201_CREATED)
+
+    def patch(self, request):
+        if request.user.role == 'lead':
+            return Response({"error": "Leads cannot update tasks"}, status=status.HTTP_403_FORBIDDEN)
+        items, error = self.get_items(request)
+        if error:
+            return error
+
+        ids = [self.get_item_id(item) for item in items]
+        results = [None] * len(items)
+        written, seen = [], set()
+        fields = {'updated_at', 'completed_at'}
+        with transaction.atomic():
+            # Locked until the bulk_update commits, so concurrent toggles and PATCHes
+            # can't be overwritten with the stale values read here, and the counters
+            # move from the stored state. Locked in id order, so batches don't deadlock.
+            existing = Task.objects.select_for_update().order_by('pk').in_bulk([pk for pk in ids if pk is not None])
+            for index, (pk, item) in enumerate(zip(ids, items)):
+                result = self.check_item(index, pk, existing, seen, request.user)
+                if result:
+                    results[index] = result
+                    continue
+                task = existing[pk]
+                serializer = TaskBulkSerializer(task, data=item, partial=True)
+                if not serializer.is_valid():
+                    results[index] = {"index": index, "id": pk, "status": status.HTTP_400_BAD_REQUEST, "errors": serializer.errors}
+                    continue
+                for field, value in serializer.validated_data.items():
+                    setattr(task, field, value)
+                    fields.add(field)
+                task.update_completed_at()
+                task.updated_at = now()
+                written.append((index, task))
+
+            if written:
+                Task.objects.bulk_update([task for _, task in written], sorted(fields))
+                task_list_cache.invalidate([request.user.id])
+                with task_counters.batch(), task_events.batch():
+                    for _, task in written:
+                        task_counters.record(
+                            (task._loaded_developer_id, task._loaded_is_done), (task.developer_id, task.is_done)
+                        )
+                        task_events.record('updated', task.id, task.developer_id)
+        return self.bulk_response(results, written, status.HTTP_200_OK)
+
+    def delete(self, request):
+        if request.user.role == 'lead':
+            return Response({"error": "Leads cannot delete tasks"}, status=status.HTTP_403_FORBIDDEN)
+        items, error = self.get_items(request)
+        if error:
+            return error
+
+        ids = [self.get_item_id(item) for item in items]
+        results, deletable, seen = [], [], set()
+        # One counter update, tombstone insert, event message and cache invalidation for
+        # the whole batch instead of one of each per deleted task
+        with transaction.atomic(), task_counters.batch(), task_tombstones.batch(), task_events.batch(), \
+                task_list_cache.batch():
+            # Locked like in patch(), so a task reassigned after the ownership check
+            # can't be deleted
+            existing = Task.objects.select_for_update().order_by('pk').only('id', 'developer_id').in_bulk(
+                [pk for pk in ids if pk is not None]
+            )
+            for index, pk in enumerate(ids):
+                result = self.check_item(index, pk, existing, seen, request.user)
+                if not result:
+                    deletable.append(pk)
+                    result = {"index": index, "id": pk, "status": status.HTTP_204_NO_CONTENT}
+                results.append(result)
+
+            if deletable:
+                Task.objects.filter(pk__in=deletable).delete()
+        return Response({"results": results}, status=status.HTTP_207_MULTI_STATUS)
+
+    # Per-item version of the TaskDetailAPIView checks
+    def check_item(self, index, pk, existing, seen, user):
+        if pk is None:
+            return {"index": index, "status": status.HTTP_400_BAD_REQUEST, "errors": {"id": ["A valid task id is required."]}}
+        if pk in seen:
+            return {"index": index, "id": pk, "status": status.HTTP_400_BAD_REQUEST, "errors": {"id": ["Duplicate task id."]}}
+        seen.add(pk)
+        task = existing.get(pk)
+        if task is None:
+            return {"index": index, "id": pk, "status": status.HTTP_404_NOT_FOUND, "error": "Task not found"}
+        if task.developer_id != user.id:
+            return {"index": index, "id": pk, "status": status.HTTP_403_FORBIDDEN, "error": "Access denied"}
+        return None
+
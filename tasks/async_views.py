@@ -0,0 +1,217 @@
+import asyncio
+import time
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import exceptions, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .api_views import TaskDetailAPIView, TaskListCreateAPIView, UserListAPIView, get_task_fields
+from .cache import task_list_cache
+from .conditional import not_modified, set_validators
+from .counters import task_counters
+from .events import event_options, task_event_hub
+from .models import Task
+from .renderers import EventStreamRenderer
+from .serializers import TaskReadSerializer, UserSerializer
+
+
+# Mixin for APIViews whose handlers are coroutines. Under ASGI a request waiting on
+# the database or the cache holds no worker thread, so one process can keep many slow
+# requests in flight. Authentication runs through the authenticator's aauthenticate()
+# when it has one; permissions, content negotiation and exception handling are DRF's.
+class AsyncAPIView:
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.aperform_authentication(request)
+            self.initial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aperform_authentication(self, request):
+        # Same as Request._authenticate(), awaiting async authenticators
+        for authenticator in request.authenticators:
+            aauthenticate = getattr(authenticator, 'aauthenticate', None)
+            try:
+                if aauthenticate is not None:
+                    user_auth_tuple = await aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+
+# Read-only async variants of the task list, task detail and user list endpoints.
+# They reuse the sync views' querysets, pagination and permission rules; writes
+# stay on the sync endpoints.
+class AsyncTaskListAPIView(AsyncAPIView, TaskListCreateAPIView):
+    http_method_names = ['get', 'options']
+
+    async def get(self, request):
+        try:
+            fields = get_task_fields(request)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        version = await task_list_cache.arequest_version(request)
+        cache_key = task_list_cache.key(request, version)
+        cached = await task_list_cache.aget(cache_key)
+        if cached:
+            etag, data = cached
+            return not_modified(request, etag) or set_validators(Response(data), etag)
+
+        tasks = self.get_queryset(request)
+
+        if self.cursor_pagination_class.cursor_query_param in request.query_params:
+            paginator = self.cursor_pagination_class()
+            paginated_tasks = await paginator.apaginate_queryset(
+                TaskReadSerializer.rows(tasks, fields, self.cursor_columns), request
+            )
+            etag = self.get_cursor_etag(request, paginated_tasks)
+            response = not_modified(request, etag)
+            if response:
+                return response
+        else:
+            scope = self.get_counter_scope(request)
+            if scope is None:
+                stats = await tasks.aaggregate(**self.page_stats)
+            else:
+                stats = await task_counters.apage_stats(*scope)
+            etag = self.get_page_etag(request, stats, version)
+            response = not_modified(request, etag)
+            if response:
+                return response
+            paginator = self.pagination_class()
+            paginated_tasks = await paginator.apaginate_queryset(
+                TaskReadSerializer.rows(tasks, fields), request, count=stats['count']
+            )
+
+        serializer = TaskReadSerializer(paginated_tasks, many=True, fields=fields)
+        response = paginator.get_paginated_response(serializer.data)
+        await task_list_cache.aset(cache_key, etag, response.data)
+        return set_validators(response, etag)
+
+
+class AsyncTaskDetailAPIView(AsyncAPIView, TaskDetailAPIView):
+    http_method_names = ['get', 'options']
+
+    async def get(self, request, pk):
+        try:
+            fields = get_task_fields(request)
+            task = await self.get_task_queryset(fields).aget(pk=pk)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except Task.DoesNotExist:
+            return Response({"error": "Task not found"}, status=status.HTTP_404_NOT_FOUND)
+        return self.retrieve(request, task, fields)
+
+
+class AsyncUserListAPIView(AsyncAPIView, UserListAPIView):
+    http_method_names = ['get', 'options']
+
+    async def get(self, request):
+        users = self.get_queryset(request)
+        if self.paginates(request):
+            paginator = self.pagination_class()
+            page = await paginator.apaginate_queryset(users, request, count=await users.acount())
+            return paginator.get_paginated_response(UserSerializer(page, many=True).data)
+        users = [user async for user in users]
+        serializer = UserSerializer(users, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+# Server-sent events for the task list: tasks created, updated and deleted in the
+# user's scope (all tasks or ?developer= for leads, own tasks for developers) as the
+# writes commit, so pages update in place instead of polling. Only served by the ASGI
+# application; the stream ends when the access token expires, and the client
+# reconnects with a fresh one.
+class AsyncTaskEventsAPIView(AsyncAPIView, APIView):
+    permission_classes = [IsAuthenticated]
+    http_method_names = ['get', 'options']
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+    retry_ms = 5000
+
+    def get_scope(self, request):
+        if request.user.role != 'lead':
+            return request.user.id
+        developer_id = request.query_params.get('developer')
+        return int(developer_id) if developer_id and developer_id.isdigit() else None
+
+    async def get(self, request):
+        if not isinstance(request._request, ASGIRequest):
+            return Response(
+                {"error": "Task events are only served by the ASGI application"},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        expires_at = request.auth.get('exp') if request.auth is not None else None
+        response = StreamingHttpResponse(
+            self.stream(self.get_scope(request), expires_at), content_type='text/event-stream; charset=utf-8'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Tells nginx not to buffer the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self, scope, expires_at):
+        renderer = EventStreamRenderer()
+        heartbeat = event_options().get('HEARTBEAT_SECONDS', 15)
+        # Subscribe when the stream starts, before the first chunk is sent, so a client
+        # that disconnects before then never leaves a subscriber behind
+        subscriber = task_event_hub.subscribe(scope)
+        try:
+            yield f'retry: {self.retry_ms}\n' + renderer.comment('connected')
+            while True:
+                timeout = heartbeat
+                if expires_at is not None:
+                    timeout = min(timeout, expires_at - time.time())
+                    if timeout <= 0:
+                        break
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    if timeout == heartbeat:
+                        # Keeps proxies from closing an idle connection
+                        yield renderer.comment('keepalive')
+                    continue
+                yield renderer.encode(event['type'], event)
+        finally:
+            task_event_hub.unsubscribe(subscriber)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Errors and OPTIONS are JSON like the rest of the API
+        if isinstance(response, Response):
+            request.accepted_renderer = JSONRenderer()
+            request.accepted_media_type = JSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
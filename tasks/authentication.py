@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router, transaction
+from django.db.models import Model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .batching import bump_version
+
+
+class LRUCache:
+    """Thread-safe, size-bounded in-process cache whose entries expire after a timeout."""
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+user_cache_options = getattr(settings, 'JWT_USER_CACHE', {})
+user_cache = LRUCache(user_cache_options.get('MAX_SIZE', 10000), user_cache_options.get('TIMEOUT', 60))
+user_version_prefix = 'users:auth:version:'
+
+
+def user_versions():
+    return caches[user_cache_options.get('ALIAS', 'default')]
+
+
+# JWTAuthentication that keeps the few user columns the API needs in an in-process
+# cache instead of loading the User row on every request. Each entry remembers the
+# user's version in the shared cache, which invalidate_user() bumps when the user
+# changes, so every worker reloads the user on its next request. With a per-process
+# cache backend other workers only pick changes up within the cache timeout.
+# aauthenticate() is the same check for the async views.
+class CachedJWTAuthentication(JWTAuthentication):
+    user_fields = ('id', 'username', 'role', 'is_active')
+
+    def get_user_fields(self):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return self.user_fields + ('password',)
+        return self.user_fields
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def get_user_queryset(self, user_id):
+        return self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values_list(*self.get_user_fields())
+
+    def get_cached_values(self, user_id, version):
+        entry = user_cache.get(user_id)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        version = user_versions().get(f'{user_version_prefix}{user_id}')
+        values = self.get_cached_values(user_id, version)
+        if values is None:
+            values = self.get_user_queryset(user_id).first()
+            if values is not None:
+                user_cache.set(user_id, (version, values))
+        return self.build_user(validated_token, values)
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        version = await user_versions().aget(f'{user_version_prefix}{user_id}')
+        values = self.get_cached_values(user_id, version)
+        if values is None:
+            values = await self.get_user_queryset(user_id).afirst()
+            if values is not None:
+                user_cache.set(user_id, (version, values))
+        return self.build_user(validated_token, values)
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    def build_user(self, validated_token, values):
+        if values is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        # A deferred instance: the cached columns are set, anything else loads on access
+        user = self.user_model.from_db(router.db_for_read(self.user_model), self.get_user_fields(), values)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+def invalidate_user(user_id):
+    """
+    Drop the user's cached columns in this process now, and in every worker once the
+    change commits. Bumping earlier would let another worker cache the old row under
+    the new version.
+    """
+    user_cache.delete(user_id)
+
+    def changed():
+        user_cache.delete(user_id)
+        bump_version(user_versions(), f'{user_version_prefix}{user_id}')
+
+    transaction.on_commit(changed)
+
+
+# Request user for the stateless mode (JWT_STATELESS_AUTH): everything the views and
+# permissions check comes from the access token's claims, with no database lookup.
+class RoleTokenUser(TokenUser):
+    @cached_property
+    def role(self):
+        return self.token.get('role', '')
+
+    @cached_property
+    def is_active(self):
+        return True
+
+    # Compares equal to the User row with the same id, so ownership checks such as
+    # `task.developer != request.user` behave as with a model instance
+    def __eq__(self, other):
+        if isinstance(other, (TokenUser, Model)):
+            return other.pk is not None and str(self.pk) == str(other.pk)
+        return False
+
+    def __hash__(self):
+        return hash(self.id)
+
@@ -0,0 +1,41 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Work recorded by task writes (counter changes, tombstones, events, invalidated list
+# scopes) that a batch collects and applies once. Outside a batch, get() is None and
+# the caller applies each piece of work at once.
+class PendingWork:
+    def __init__(self, name, factory):
+        self.var = ContextVar(name, default=None)
+        self.factory = factory
+
+    def get(self):
+        return self.var.get()
+
+    @contextmanager
+    def batch(self, apply):
+        """
+        Collect the work recorded inside the block and pass it to apply() when it ends.
+        A nested batch adds to the enclosing one. Use inside the transaction.atomic()
+        of the writes.
+        """
+        if self.var.get() is not None:
+            yield
+            return
+        pending = self.factory()
+        token = self.var.set(pending)
+        try:
+            yield
+        finally:
+            self.var.reset(token)
+        apply(pending)
+
+
+def bump_version(cache, key):
+    # Restart from the clock when the key was evicted, so old versions never come back
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
@@ -0,0 +1,215 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .batching import PendingWork, bump_version
+from .routers import request_replica, use_primary
+
+# Scopes collected by TaskListCache.batch(), bumped when the batch ends
+pending_scopes = PendingWork('pending_task_list_scopes', set)
+
+
+# Caches rendered task list pages per scope. Every scope (one developer's tasks, or
+# all tasks for leads) has a version number that is part of the entry key; changing a
+# task bumps the versions it belongs to, so stale entries are never read again and
+# simply expire. The versions are kept even with the cache disabled, since list page
+# ETags include them.
+class TaskListCache:
+    version_prefix = 'tasks:version:'
+    entry_prefix = 'tasks:list:'
+    all_scope = 'all'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def options(self):
+        return getattr(settings, 'TASK_LIST_CACHE', {})
+
+    @property
+    def enabled(self):
+        return self.options.get('ENABLED', True)
+
+    @property
+    def cache(self):
+        return caches[self.options.get('ALIAS', 'default')]
+
+    def developer_scope(self, developer_id):
+        return f'developer:{developer_id}'
+
+    def scope(self, request):
+        if request.user.role != 'lead':
+            return self.developer_scope(request.user.id)
+        developer_id = request.query_params.get('developer')
+        if developer_id and developer_id.isdigit():
+            return self.developer_scope(int(developer_id))
+        return self.all_scope
+
+    def get_version(self, scope):
+        key = self.version_prefix + scope
+        version = self.cache.get(key)
+        if version is None:
+            # Start from the clock, not 1, so an evicted version can't resurrect old entries
+            version = time.time_ns()
+            if not self.cache.add(key, version, timeout=None):
+                version = self.cache.get(key, version)
+        return version
+
+    async def aget_version(self, scope):
+        key = self.version_prefix + scope
+        version = await self.cache.aget(key)
+        if version is None:
+            version = time.time_ns()
+            if not await self.cache.aadd(key, version, timeout=None):
+                version = await self.cache.aget(key, version)
+        return version
+
+    def make_key(self, scope, version, request):
+        digest = hashlib.md5(
+            '|'.join([scope, str(version), request.get_full_path()]).encode(),
+            usedforsecurity=False
+        ).hexdigest()
+        return self.entry_prefix + digest
+
+    def request_version(self, request):
+        """
+        The version of a list request's scope. Read it before the queryset is
+        evaluated, so data read during a concurrent write lands under the old version.
+        """
+        return self.get_version(self.scope(request))
+
+    async def arequest_version(self, request):
+        return await self.aget_version(self.scope(request))
+
+    def key(self, request, version):
+        """The entry key for a list request at `version`, or None when disabled."""
+        if not self.enabled:
+            return None
+        return self.make_key(self.scope(request), version, request)
+
+    def get(self, key):
+        if key is None:
+            return None
+        return self.record(self.cache.get(key))
+
+    async def aget(self, key):
+        if key is None:
+            return None
+        return self.record(await self.cache.aget(key))
+
+    def record(self, entry):
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def cacheable(self, key):
+        # A page read from a replica may be older than the version in its key, so only
+        # pages read from the primary are shared
+        return key is not None and request_replica.get() is None
+
+    def set(self, key, etag, data):
+        if self.cacheable(key):
+            self.cache.set(key, (etag, data), timeout=self.options.get('TIMEOUT', 300))
+
+    async def aset(self, key, etag, data):
+        if self.cacheable(key):
+            await self.cache.aset(key, (etag, data), timeout=self.options.get('TIMEOUT', 300))
+
+    def invalidate(self, developer_ids=()):
+        scopes = {self.all_scope} | {self.developer_scope(pk) for pk in developer_ids if pk is not None}
+        pending = pending_scopes.get()
+        if pending is None:
+            self.invalidate_scopes(scopes)
+        else:
+            pending.update(scopes)
+
+    def invalidate_scopes(self, scopes):
+        if not scopes:
+            return
+        # Bump now for readers inside this transaction, and again after commit to
+        # drop anything cached from a concurrent read of the pre-commit data
+        self.bump(scopes)
+        transaction.on_commit(lambda: self.bump(scopes))
+
+    def batch(self):
+        # Each scope invalidated inside the block is bumped once
+        return pending_scopes.batch(self.invalidate_scopes)
+
+    def bump(self, scopes):
+        for scope in scopes:
+            bump_version(self.cache, self.version_prefix + scope)
+
+    def stats(self):
+        with self.lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'enabled': self.enabled,
+            'backend': self.cache.__class__.__name__,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else None,
+        }
+
+
+task_list_cache = TaskListCache()
+
+
+# Caches the developer directory (id and username of every developer) that fills the
+# developer filter of the task page. The entry key carries a version that any user
+# change bumps, like the task list scopes, and the ETag is derived from the version,
+# so a client with the current list gets a 304 after one cache read.
+class DeveloperDirectoryCache:
+    version_key = 'users:developers:version'
+    entry_prefix = 'users:developers:'
+
+    @property
+    def options(self):
+        return getattr(settings, 'DEVELOPER_DIRECTORY_CACHE', {})
+
+    @property
+    def cache(self):
+        return caches[self.options.get('ALIAS', 'default')]
+
+    def get_version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            version = time.time_ns()
+            if not self.cache.add(self.version_key, version, timeout=None):
+                version = self.cache.get(self.version_key, version)
+        return version
+
+    def get(self, version, load):
+        """
+        The directory at `version`, from the cache or from load(). Read the version
+        first, so a list loaded during a concurrent change lands under the old one.
+        load() reads from the primary, since a replica may not have caught up with
+        the version yet.
+        """
+        key = self.entry_prefix + str(version)
+        data = self.cache.get(key)
+        if data is None:
+            with use_primary():
+                data = load()
+            self.cache.set(key, data, timeout=self.options.get('TIMEOUT', 300))
+        return data
+
+    def invalidate(self):
+        # Now and again after commit, like TaskListCache.invalidate()
+        self.bump()
+        transaction.on_commit(self.bump)
+
+    def bump(self):
+        bump_version(self.cache, self.version_key)
+
+
+developer_directory = DeveloperDirectoryCache()
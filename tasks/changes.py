@@ -0,0 +1,138 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.timezone import now
+
+from .batching import PendingWork
+from .models import Task, TaskTombstone
+from .serializers import TaskReadSerializer
+
+# Tombstones collected by TaskTombstones.batch(), written when the batch ends
+pending_tombstones = PendingWork('pending_task_tombstones', list)
+
+epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class InvalidWatermark(ValueError):
+    pass
+
+
+class ExpiredWatermark(Exception):
+    pass
+
+
+def sync_options():
+    return getattr(settings, 'TASK_SYNC', {})
+
+
+# Writes a tombstone whenever a task leaves a scope, in the transaction that removes it
+class TaskTombstones:
+    def record(self, task_id, developer_id, deleted=True):
+        tombstone = TaskTombstone(task_id=task_id, developer_id=developer_id, deleted=deleted)
+        tombstones = pending_tombstones.get()
+        if tombstones is None:
+            tombstone.save()
+        else:
+            tombstones.append(tombstone)
+
+    def batch(self):
+        # One bulk_create for all the tombstones recorded inside the block
+        return pending_tombstones.batch(TaskTombstone.objects.bulk_create)
+
+    def purge(self, days=None):
+        days = sync_options().get('TOMBSTONE_DAYS', 30) if days is None else days
+        return TaskTombstone.objects.filter(removed_at__lt=now() - timedelta(days=days)).delete()[0]
+
+
+task_tombstones = TaskTombstones()
+
+
+# A watermark is the (updated_at, id) of the last task change and the (removed_at, id)
+# of the last tombstone a client has seen, opaque to the client.
+def encode_watermark(task_position, tombstone_position):
+    token = '|'.join(
+        part for timestamp, pk in (task_position, tombstone_position) for part in (timestamp.isoformat(), str(pk))
+    )
+    return urlsafe_b64encode(token.encode('ascii')).decode('ascii')
+
+
+def decode_watermark(watermark):
+    try:
+        task_time, task_id, tombstone_time, tombstone_id = urlsafe_b64decode(watermark.encode('ascii')).decode('ascii').split('|')
+        positions = (
+            (datetime.fromisoformat(task_time), int(task_id)),
+            (datetime.fromisoformat(tombstone_time), int(tombstone_id)),
+        )
+    except (TypeError, ValueError):
+        raise InvalidWatermark(watermark)
+    # encode_watermark() only writes aware timestamps; naive ones can't be compared
+    if any(timestamp.tzinfo is None for timestamp, _ in positions):
+        raise InvalidWatermark(watermark)
+    return positions
+
+
+def after(queryset, field, position):
+    timestamp, pk = position
+    return queryset.filter(Q(**{f'{field}__gt': timestamp}) | Q(**{field: timestamp, 'id__gt': pk}))
+
+
+def task_changes(developer_id=None, watermark=None, limit=100):
+    """
+    Tasks of a scope (one developer's, or all tasks when developer_id is None) changed
+    after the watermark, the ids of tasks that left the scope, and the next watermark.
+    Both lists are read in index order from the watermark, so a sync costs
+    O(changes). Without a watermark every task is returned and no tombstones.
+
+    Changes younger than TASK_SYNC['SETTLE_SECONDS'] wait for the next call: a write
+    that is still committing may carry an earlier timestamp than rows already visible.
+    """
+    options = sync_options()
+    until = now() - timedelta(seconds=options.get('SETTLE_SECONDS', 2))
+
+    if watermark is None:
+        task_position, tombstone_position = (epoch, 0), (until, 0)
+    else:
+        task_position, tombstone_position = decode_watermark(watermark)
+        if tombstone_position[0] < now() - timedelta(days=options.get('TOMBSTONE_DAYS', 30)):
+            # Tombstones that old are purged; the client has to start over
+            raise ExpiredWatermark(watermark)
+
+    tasks = Task.objects.filter(updated_at__lte=until)
+    tombstones = TaskTombstone.objects.filter(removed_at__lte=until)
+    if developer_id is not None:
+        tasks = tasks.filter(developer_id=developer_id)
+        tombstones = tombstones.filter(developer_id=developer_id)
+    else:
+        # Reassignments don't take a task out of the full list
+        tombstones = tombstones.filter(deleted=True)
+
+    rows = list(TaskReadSerializer.rows(after(tasks, 'updated_at', task_position).order_by('updated_at', 'id'))[:limit + 1])
+    removed = []
+    if watermark is not None:
+        removed = list(
+            after(tombstones, 'removed_at', tombstone_position)
+            .order_by('removed_at', 'id')
+            .values_list('removed_at', 'id', 'task_id')[:limit + 1]
+        )
+    has_more = len(rows) > limit or len(removed) > limit
+    rows, removed = rows[:limit], removed[:limit]
+
+    if rows:
+        task_position = (rows[-1].updated_at, rows[-1].id)
+    if removed:
+        tombstone_position = removed[-1][:2]
+
+    # A task removed and then changed again in this window is still there
+    changed_since = {row.id: row.updated_at for row in rows}
+    deleted = [
+        task_id for removed_at, _, task_id in removed
+        if task_id not in changed_since or changed_since[task_id] < removed_at
+    ]
+    return {
+        'changes': TaskReadSerializer(rows, many=True).data,
+        'deleted': deleted,
+        'watermark': encode_watermark(task_position, tombstone_position),
+        'has_more': has_more,
+    }
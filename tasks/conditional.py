@@ -0,0 +1,32 @@
+import hashlib
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode(), usedforsecurity=False)
+    return quote_etag(digest.hexdigest())
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    Return a 304 (or 412) response when the request's validators match,
+    so the caller can skip serialization entirely. Returns None otherwise.
+    """
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(timegm(last_modified.utctimetuple()))
+    # Responses are per user: let clients keep them, but always revalidate
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
+    return response
@@ -0,0 +1,142 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.utils.timezone import now
+
+from .batching import PendingWork
+from .models import Task, TaskCounter
+
+fields = ('total', 'done', 'open')
+
+# Changes collected by TaskCounters.batch(), written when the batch ends
+pending_changes = PendingWork('pending_task_counter_changes', dict)
+
+
+# Keeps TaskCounter rows in step with task writes. Every change is applied as relative
+# UPDATEs (total = total + 1, ...) in the writer's transaction, so concurrent writers
+# never lose each other's changes and a rolled back write leaves the counts alone.
+# A task's state is its (developer_id, is_done) pair, or None when it doesn't exist.
+class TaskCounters:
+    all_key = 'all'
+
+    def developer_key(self, developer_id):
+        return f'developer:{developer_id}'
+
+    def keys(self, developer_id):
+        keys = [(self.all_key, None)]
+        if developer_id is not None:
+            keys.append((self.developer_key(developer_id), developer_id))
+        return keys
+
+    def record(self, before, after):
+        """
+        Count a task moving from state `before` to state `after`. Applied at once, or
+        at the end of the enclosing batch(). Must run inside the transaction of the write.
+        """
+        changes = pending_changes.get()
+        if changes is None:
+            changes = {}
+            self.add(changes, before, -1)
+            self.add(changes, after, 1)
+            self.apply(changes)
+        else:
+            self.add(changes, before, -1)
+            self.add(changes, after, 1)
+
+    def add(self, changes, state, sign):
+        if state is None or state[1] is None:
+            return
+        developer_id, is_done = state
+        for key, key_developer_id in self.keys(developer_id):
+            change = changes.setdefault(key, {'developer_id': key_developer_id, 'total': 0, 'done': 0, 'open': 0})
+            change['total'] += sign
+            change['done' if is_done else 'open'] += sign
+
+    def batch(self):
+        # One UPDATE per counter row for all the changes recorded inside the block
+        return pending_changes.batch(self.apply)
+
+    def apply(self, changes):
+        timestamp = now()
+        # Fixed order, so concurrent writers lock the rows in the same order
+        for key in sorted(changes):
+            change = changes[key]
+            values = {name: F(name) + change[name] for name in fields if change[name]}
+            if TaskCounter.objects.filter(key=key).update(changed_at=timestamp, **values):
+                continue
+            # A row is only created by a task arriving; a missing row otherwise means
+            # its developer is being deleted
+            if change['total'] <= 0:
+                continue
+            try:
+                with transaction.atomic():
+                    TaskCounter.objects.create(
+                        key=key, developer_id=change['developer_id'], changed_at=timestamp,
+                        **{name: change[name] for name in fields}
+                    )
+            except IntegrityError:
+                # Created by a concurrent writer since the UPDATE
+                TaskCounter.objects.filter(key=key).update(changed_at=timestamp, **values)
+
+    def get_key(self, developer_id=None):
+        return self.all_key if developer_id is None else self.developer_key(developer_id)
+
+    def page_stats(self, developer_id=None, is_done=None):
+        """
+        The task count of a list scope, optionally only done or open tasks, and the
+        time of the scope's last change: one primary key lookup.
+        """
+        counter = TaskCounter.objects.filter(key=self.get_key(developer_id)).first()
+        return self.make_page_stats(counter, is_done)
+
+    async def apage_stats(self, developer_id=None, is_done=None):
+        counter = await TaskCounter.objects.filter(key=self.get_key(developer_id)).afirst()
+        return self.make_page_stats(counter, is_done)
+
+    def make_page_stats(self, counter, is_done):
+        if counter is None:
+            return {'count': 0, 'last_modified': None}
+        count = counter.total if is_done is None else counter.done if is_done else counter.open
+        return {'count': count, 'last_modified': counter.changed_at}
+
+    def actual_counts(self):
+        rows = Task.objects.order_by().values('developer_id').annotate(
+            total=Count('id'), done=Count('id', filter=Q(is_done=True)), open=Count('id', filter=Q(is_done=False))
+        )
+        counts = {self.all_key: {'developer_id': None, 'total': 0, 'done': 0, 'open': 0}}
+        for row in rows:
+            for key, developer_id in self.keys(row['developer_id']):
+                counts.setdefault(key, {'developer_id': developer_id, 'total': 0, 'done': 0, 'open': 0})
+                for name in fields:
+                    counts[key][name] += row[name]
+        return counts
+
+    def reconcile(self, dry_run=False):
+        """
+        Recount every scope from the task table and repair the counter rows that
+        drifted. Returns (key, stored, actual) for each of them.
+        """
+        drift = []
+        with transaction.atomic():
+            # Lock the counters first: writers that already counted a change hold
+            # these rows until they commit, and later ones wait for the repair, so
+            # the recount below neither misses nor doubles a change
+            stored = {counter.key: counter for counter in TaskCounter.objects.select_for_update().order_by('key')}
+            actual = self.actual_counts()
+            for key in sorted(set(stored) | set(actual)):
+                counter = stored.get(key)
+                counts = actual.get(key, {'total': 0, 'done': 0, 'open': 0})
+                stored_counts = {name: getattr(counter, name) for name in fields} if counter else None
+                expected = {name: counts[name] for name in fields}
+                if stored_counts == expected or (counter is None and not expected['total']):
+                    continue
+                drift.append((key, stored_counts, expected))
+                if dry_run:
+                    continue
+                if counter is None:
+                    TaskCounter.objects.create(key=key, developer_id=counts['developer_id'], **expected)
+                else:
+                    TaskCounter.objects.filter(key=key).update(changed_at=now(), **expected)
+        return drift
+
+
+task_counters = TaskCounters()
@@ -0,0 +1,38 @@
+from django.db import connections
+
+
+def pool_stats():
+    """
+    Connection pool usage of every database alias in this worker process. Aliases
+    without a pool report their persistent-connection setting instead.
+    """
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        pool = getattr(connection, 'pool', None)
+        if pool is None:
+            stats[alias] = {'pooled': False, 'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE', 0)}
+            continue
+
+        raw = pool.get_stats()
+        size = raw.get('pool_size', 0)
+        idle = raw.get('pool_available', 0)
+        queued = raw.get('requests_queued', 0)
+        wait_ms = raw.get('requests_wait_ms', 0)
+        stats[alias] = {
+            'pooled': True,
+            'open': not pool.closed,
+            'min_size': raw.get('pool_min'),
+            'max_size': raw.get('pool_max'),
+            'size': size,
+            'in_use': size - idle,
+            'idle': idle,
+            'waiting': raw.get('requests_waiting', 0),
+            'requests': raw.get('requests_num', 0),
+            'queued': queued,
+            'wait_ms_total': wait_ms,
+            'wait_ms_avg': wait_ms / queued if queued else None,
+            'timeouts': raw.get('requests_errors', 0),
+            'connections_lost': raw.get('connections_lost', 0),
+        }
+    return stats
@@ -0,0 +1,217 @@
+import asyncio
+import json
+from collections import defaultdict
+from itertools import islice
+
+import psycopg
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.module_loading import import_string
+from psycopg import sql
+
+from .batching import PendingWork
+from .models import Task
+from .serializers import TaskReadSerializer
+
+# Events collected by TaskEvents.batch(), sent when the batch ends
+pending_events = PendingWork('pending_task_events', list)
+
+
+def event_options():
+    return getattr(settings, 'TASK_EVENTS', {})
+
+
+# A stream's queue of events. A client that falls QUEUE_SIZE events behind gets a
+# single reload event instead of the backlog.
+class TaskEventSubscriber:
+    def __init__(self, developer_id, queue_size):
+        # developer_id: the scope, or None for all tasks
+        self.developer_id = developer_id
+        self.queue = asyncio.Queue(queue_size)
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'type': 'reload'})
+
+
+# Fans task events out to the event streams of this process. The backend hands it
+# messages, lists of (kind, task_id, developer_id, previous_developer_id) events; the
+# changed tasks of a message are read with one query and every subscriber gets the
+# events of its scope. Runs on the event loop of the first subscriber.
+class TaskEventHub:
+    def __init__(self):
+        self.loop = None
+        self.inbox = None
+        self.scopes = defaultdict(set)
+
+    def start(self, loop):
+        self.loop = loop
+        self.inbox = asyncio.Queue()
+        self.scopes = defaultdict(set)
+        loop.create_task(self.pump())
+        task_events.backend.start(self)
+
+    def subscribe(self, developer_id=None):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.start(loop)
+        subscriber = TaskEventSubscriber(developer_id, event_options().get('QUEUE_SIZE', 100))
+        self.scopes[developer_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.scopes[subscriber.developer_id].discard(subscriber)
+
+    def dispatch(self, events):
+        """
+        Queue a message for delivery. Safe to call from any thread; a no-op in
+        processes without streams.
+        """
+        loop = self.loop
+        if loop is None or loop.is_closed() or not any(self.scopes.values()):
+            return
+        try:
+            loop.call_soon_threadsafe(self.inbox.put_nowait, events)
+        except RuntimeError:
+            # The loop closed in the meantime
+            pass
+
+    async def pump(self):
+        # One message at a time, so events reach the streams in commit order
+        while True:
+            events = await self.inbox.get()
+            try:
+                await self.deliver(events)
+            except Exception:
+                # The changes can't be shown; have every client read its list again
+                self.send(None, {'type': 'reload'}, everyone=True)
+
+    async def deliver(self, events):
+        ids = [task_id for kind, task_id, *_ in events if kind in ('created', 'updated')]
+        tasks = {}
+        if ids:
+            rows = [row async for row in TaskReadSerializer.rows(Task.objects.using(DEFAULT_DB_ALIAS).filter(pk__in=ids))]
+            tasks = {task['id']: task for task in TaskReadSerializer(rows, many=True).data}
+
+        for kind, task_id, developer_id, previous_developer_id in events:
+            if kind == 'reload':
+                self.send(developer_id, {'type': 'reload'}, everyone=developer_id is None)
+            elif kind == 'deleted':
+                self.send(developer_id, {'type': 'deleted', 'id': task_id})
+            elif task_id in tasks:
+                # A task missing here was deleted since; its own event follows
+                task = tasks[task_id]
+                self.send(task['developer'], {'type': kind, 'task': task})
+                if previous_developer_id is not None and previous_developer_id != task['developer']:
+                    # Reassigned: gone from the previous developer's list
+                    self.send(previous_developer_id, {'type': 'deleted', 'id': task_id}, leads=False)
+
+    def send(self, developer_id, event, leads=True, everyone=False):
+        if everyone:
+            subscribers = set().union(*self.scopes.values())
+        else:
+            subscribers = set(self.scopes.get(developer_id, ()))
+            if leads:
+                subscribers |= self.scopes.get(None, set())
+        for subscriber in subscribers:
+            subscriber.put(event)
+
+
+task_event_hub = TaskEventHub()
+
+
+# Hands a committed transaction's events to the hub of this process only. Enough for a
+# single worker process, and for tests.
+class LocalTaskEventBackend:
+    def send(self, events, using):
+        transaction.on_commit(lambda: task_event_hub.dispatch(events), using=using)
+
+    def start(self, hub):
+        pass
+
+
+# Sends events with pg_notify() inside the writing transaction: PostgreSQL delivers
+# them to the LISTEN connection of every process with streams when, and only if, the
+# transaction commits.
+class PostgresTaskEventBackend:
+    # NOTIFY payloads must stay under 8000 bytes
+    events_per_notification = 100
+    retry_seconds = 5
+
+    @property
+    def channel(self):
+        return event_options().get('CHANNEL', 'task_events')
+
+    def send(self, events, using):
+        events = iter(events)
+        with connections[using].cursor() as cursor:
+            while chunk := list(islice(events, self.events_per_notification)):
+                cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, json.dumps(chunk)])
+
+    def start(self, hub):
+        hub.loop.create_task(self.listen(hub))
+
+    async def listen(self, hub):
+        params = connections[DEFAULT_DB_ALIAS].get_connection_params()
+        # Django's cursor class is for sync connections
+        params.pop('cursor_factory', None)
+        reconnecting = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(**params, autocommit=True) as connection:
+                    await connection.execute(sql.SQL('LISTEN {}').format(sql.Identifier(self.channel)))
+                    if reconnecting:
+                        # Notifications sent while disconnected are lost
+                        hub.dispatch([('reload', None, None, None)])
+                    async for notification in connection.notifies():
+                        hub.dispatch(json.loads(notification.payload))
+            except (psycopg.Error, OSError):
+                pass
+            reconnecting = True
+            await asyncio.sleep(self.retry_seconds)
+
+
+# Records task creates, updates and deletes for the event streams. Like the counters,
+# events are sent from the writing transaction, at once or at the end of a batch().
+class TaskEvents:
+    def __init__(self):
+        self.backends = {}
+
+    @property
+    def backend(self):
+        path = event_options().get('BACKEND', 'tasks.events.LocalTaskEventBackend')
+        if path not in self.backends:
+            self.backends[path] = import_string(path)()
+        return self.backends[path]
+
+    def record(self, kind, task_id, developer_id, previous_developer_id=None, using=DEFAULT_DB_ALIAS):
+        event = (kind, task_id, developer_id, previous_developer_id)
+        events = pending_events.get()
+        if events is None:
+            self.send([event], using)
+        else:
+            events.append(event)
+
+    def batch(self, using=DEFAULT_DB_ALIAS):
+        # One message for all the events recorded inside the block
+        return pending_events.batch(lambda events: self.send(events, using))
+
+    def send(self, events, using):
+        if not events:
+            return
+        limit = event_options().get('MAX_BATCH_EVENTS', 100)
+        if len(events) > limit:
+            # Cheaper for the clients to reload their lists than to push every row
+            developers = {developer_id for _, _, *developer_ids in events for developer_id in developer_ids}
+            developers.discard(None)
+            if not developers or len(developers) > limit:
+                developers = {None}
+            events = [('reload', None, developer_id, None) for developer_id in developers]
+        self.backend.send(events, using)
+
+
+task_events = TaskEvents()
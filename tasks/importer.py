@@ -0,0 +1,129 @@
+import codecs
+import csv
+import json
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .cache import task_list_cache
+from .counters import task_counters
+from .events import task_events
+from .models import Task
+from .serializers import TaskImportSerializer
+
+import_formats = ('csv', 'ndjson')
+
+
+def read_rows(lines, format):
+    """
+    Yield (row number, data) for each record of CSV or NDJSON input, given as an
+    iterable of byte lines. data is a dict, or a ValidationError for a record that
+    can't be parsed.
+    """
+    lines = codecs.iterdecode(lines, 'utf-8-sig', errors='replace')
+    if format == 'csv':
+        for number, record in enumerate(csv.DictReader(lines), start=1):
+            # Empty cells are missing values, so the field defaults apply
+            yield number, {field: value for field, value in record.items() if field and value != ''}
+        return
+
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            data = ValidationError({'non_field_errors': [f'Invalid JSON: {exc}']})
+        if not isinstance(data, (dict, ValidationError)):
+            data = ValidationError({'non_field_errors': ['Expected a JSON object.']})
+        yield number, data
+
+
+# Validates and inserts imported tasks a batch at a time: rows are checked against one
+# reusable TaskImportSerializer, the batch's developer usernames are resolved with one
+# query, and the valid rows go in with one bulk_create in their own transaction.
+class TaskImporter:
+    max_errors = 1000
+
+    def __init__(self, batch_size=1000, developer=None):
+        # developer: assign every task to this user instead of the rows' developer column
+        self.batch_size = batch_size
+        self.developer = developer
+        self.serializer = TaskImportSerializer()
+        self.rows = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.seconds = 0
+
+    def run(self, rows):
+        started = time.perf_counter()
+        rows = iter(rows)
+        while batch := list(islice(rows, self.batch_size)):
+            self.import_batch(batch)
+        self.seconds = time.perf_counter() - started
+        return self.report()
+
+    def import_batch(self, batch):
+        self.rows += len(batch)
+        valid = []
+        for number, data in batch:
+            try:
+                if isinstance(data, ValidationError):
+                    raise data
+                valid.append((number, self.serializer.run_validation(data)))
+            except ValidationError as exc:
+                self.add_error(number, exc.detail)
+
+        developers = self.get_developers({values.get('developer') for _, values in valid} - {None, ''})
+        tasks = []
+        for number, values in valid:
+            username = values.pop('developer', None)
+            if self.developer is not None:
+                developer_id = self.developer.id
+            elif username:
+                developer_id = developers.get(username)
+                if developer_id is None:
+                    self.add_error(number, {'developer': [f'Unknown username "{username}".']})
+                    continue
+            else:
+                developer_id = None
+            task = Task(developer_id=developer_id, **values)
+            task.update_completed_at()
+            tasks.append(task)
+
+        if not tasks:
+            return
+        with transaction.atomic(), task_counters.batch(), task_events.batch():
+            Task.objects.bulk_create(tasks)
+            # bulk_create doesn't send post_save
+            task_list_cache.invalidate({task.developer_id for task in tasks})
+            for task in tasks:
+                task_counters.record(None, (task.developer_id, task.is_done))
+                task_events.record('created', task.id, task.developer_id)
+        self.created += len(tasks)
+
+    def get_developers(self, usernames):
+        if self.developer is not None or not usernames:
+            return {}
+        return dict(get_user_model().objects.filter(username__in=usernames).values_list('username', 'id'))
+
+    def add_error(self, number, detail):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': number, 'errors': detail})
+
+    def report(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': round(self.rows / self.seconds) if self.seconds else None,
+        }
@@ -0,0 +1,123 @@
+import asyncio
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks.management.seeding import rolled_back, seed_tasks
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Send concurrent requests through the ASGI application to the sync and async "
+        "task endpoints and compare throughput and latency. Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=2000)
+        parser.add_argument('--developers', type=int, default=20)
+        parser.add_argument('--requests', type=int, default=400, help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=100, help='Requests in flight at once')
+        parser.add_argument('--cache', action='store_true', help='Keep the task list cache enabled')
+
+    def handle(self, *args, **options):
+        from tasklist.asgi import application
+
+        # Requests share this thread's connection (thread-sensitive code runs on the
+        # thread that called async_to_sync), so they see the seeded rows. As in the
+        # test client, the connection must not be closed between requests.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            with rolled_back():
+                lead, developers = seed_tasks(options['tasks'], options['developers'])
+                cache_settings = {} if options['cache'] else {'TASK_LIST_CACHE': {'ENABLED': False}}
+                with override_settings(**cache_settings):
+                    self.run_all(application, lead, developers, options)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+    def scenarios(self, lead, developer):
+        task = Task.objects.filter(developer=developer).first() or Task.objects.first()
+        yield 'developer: own tasks', developer, 'api-task-list-create', 'api-async-task-list', [], ''
+        yield 'lead: all tasks [cursor]', lead, 'api-task-list-create', 'api-async-task-list', [], '?cursor='
+        yield 'lead: task detail', lead, 'api-task-detail', 'api-async-task-detail', [task.id], ''
+        yield 'developer: user list', developer, 'api-user-list', 'api-async-user-list', [], '?role=developer'
+
+    def run_all(self, application, lead, developers, options):
+        self.stdout.write(f"{options['requests']} requests per endpoint, {options['concurrency']} in flight")
+        for name, user, sync_name, async_name, args, query in self.scenarios(lead, developers[0]):
+            token = str(AccessToken.for_user(user))
+            for variant, url_name in (('sync', sync_name), ('async', async_name)):
+                path = reverse(url_name, args=args)
+                elapsed, latencies = async_to_sync(self.bench)(
+                    application, path, query, token, options['requests'], options['concurrency']
+                )
+                latencies.sort()
+                self.stdout.write('{:<28} {:<6} {:>8,.0f} req/s   p50 {:>7.1f} ms   p95 {:>7.1f} ms'.format(
+                    name, variant, len(latencies) / elapsed,
+                    statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.95) - 1] * 1000,
+                ))
+
+    async def bench(self, application, path, query, token, count, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded():
+            async with semaphore:
+                return await self.request(application, path, query, token)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded() for _ in range(count)))
+        elapsed = time.perf_counter() - start
+
+        failed = [status for status, _ in results if status != 200]
+        if failed:
+            raise CommandError(f'{path}{query}: {len(failed)} requests failed (status {failed[0]})')
+        return elapsed, [latency for _, latency in results]
+
+    async def request(self, application, path, query, token):
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.lstrip('?').encode(),
+            'root_path': '',
+            'headers': [(b'host', b'localhost'), (b'authorization', f'Bearer {token}'.encode())],
+            'client': ('127.0.0.1', 0),
+            'server': ('localhost', 80),
+        }
+        done = asyncio.Event()
+        received = False
+        status = None
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # The client stays connected until the response is complete
+            await done.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif not message.get('more_body'):
+                done.set()
+
+        start = time.perf_counter()
+        await application(scope, receive, send)
+        return status, time.perf_counter() - start
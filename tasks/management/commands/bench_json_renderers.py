@@ -0,0 +1,83 @@
+import io
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from tasks.api_views import TaskListCreateAPIView
+from tasks.management.seeding import rolled_back
+from tasks.models import Task, User
+from tasks.parsers import FastJSONParser, MessagePackParser
+from tasks.renderers import FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare encode and decode throughput of DRF's JSON classes, the orjson-backed "
+        "FastJSON classes and MessagePack on a real task list page, checking that both "
+        "JSON renderers give identical bytes. Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--iterations', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.run(options['page_size'], options['iterations'])
+
+    def run(self, page_size, iterations):
+        lead = User.objects.create(username=f'bench-lead-{random.randint(0, 10 ** 6)}', role='lead')
+        developers = User.objects.bulk_create(
+            User(username=f'bench-dev-{random.randint(0, 10 ** 6)}-{i}', role='developer') for i in range(10)
+        )
+        for i in range(page_size):
+            Task.objects.create(
+                title=f'Task {i} – café',
+                description='Benchmark task description ' * 4,
+                developer=random.choice(developers + [None]),
+                is_done=i % 2 == 0,
+            )
+
+        # The page as the list endpoint builds it, before rendering
+        request = APIRequestFactory().get('/api/tasks/', {'page_size': page_size})
+        force_authenticate(request, user=lead)
+        data = TaskListCreateAPIView.as_view()(request).data
+
+        if FastJSONRenderer().render(data) != JSONRenderer().render(data):
+            raise CommandError('FastJSONRenderer output differs from JSONRenderer')
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; FastJSON falls back to json'))
+
+        codecs = [('JSON (json)', JSONRenderer(), JSONParser()), ('FastJSON (orjson)', FastJSONRenderer(), FastJSONParser())]
+        if msgpack is not None:
+            codecs.append(('MessagePack', MessagePackRenderer(), MessagePackParser()))
+        else:
+            self.stdout.write(self.style.WARNING('msgpack is not installed; skipping MessagePack'))
+
+        expected = JSONParser().parse(io.BytesIO(JSONRenderer().render(data)))
+        results = []
+        for name, renderer, parser in codecs:
+            payload = renderer.render(data)
+            if parser.parse(io.BytesIO(payload), parser_context={}) != expected:
+                raise CommandError(f'{name} does not round-trip the page')
+            encode = self.rate(lambda: renderer.render(data), iterations)
+            decode = self.rate(lambda: parser.parse(io.BytesIO(payload), parser_context={}), iterations)
+            results.append((name, encode, decode))
+            self.stdout.write(
+                f'{name:<20} encode {encode:>10,.0f} pages/s   decode {decode:>10,.0f} pages/s   {len(payload):>9,} bytes'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'FastJSON speedup: {:.1f}x encode, {:.1f}x decode'.format(
+                results[1][1] / results[0][1], results[1][2] / results[0][2]
+            )
+        ))
+
+    def rate(self, func, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return iterations / (time.perf_counter() - start)
@@ -0,0 +1,70 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from tasks.management.seeding import rolled_back
+from tasks.models import Task, User
+from tasks.serializers import TaskReadSerializer, TaskSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rows/second of TaskSerializer and TaskReadSerializer on a task page, "
+        "checking that both render byte-identical JSON. Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.run(options['page_size'], options['iterations'])
+
+    def run(self, page_size, iterations):
+        developers = User.objects.bulk_create(
+            User(username=f'bench-dev-{random.randint(0, 10 ** 6)}-{i}', role='developer') for i in range(10)
+        )
+        for i in range(page_size):
+            Task.objects.create(
+                title=f'Task {i}',
+                description='Benchmark task description ' * 4,
+                developer=random.choice(developers + [None]),
+                is_done=i % 2 == 0,
+            )
+        queryset = Task.objects.order_by('-created_at')
+        renderer = JSONRenderer()
+
+        def drf():
+            return renderer.render(TaskSerializer(list(queryset.select_related('developer')), many=True).data)
+
+        def fast():
+            return renderer.render(TaskReadSerializer(list(TaskReadSerializer.rows(queryset)), many=True).data)
+
+        if drf() != fast():
+            raise CommandError('TaskReadSerializer output differs from TaskSerializer')
+
+        # Serialization only, on rows that are already loaded
+        tasks = list(queryset.select_related('developer'))
+        rows = list(TaskReadSerializer.rows(queryset))
+        results = [
+            ('TaskSerializer', self.rate(lambda: TaskSerializer(tasks, many=True).data, page_size, iterations)),
+            ('TaskReadSerializer', self.rate(lambda: TaskReadSerializer(rows, many=True).data, page_size, iterations)),
+            ('TaskSerializer + query + render', self.rate(drf, page_size, iterations)),
+            ('TaskReadSerializer + query + render', self.rate(fast, page_size, iterations)),
+        ]
+        for name, rate in results:
+            self.stdout.write(f'{name:<40} {rate:>12,.0f} rows/s')
+        self.stdout.write(self.style.SUCCESS(
+            'Speedup: {:.1f}x serialize, {:.1f}x end to end'.format(
+                results[1][1] / results[0][1], results[3][1] / results[2][1]
+            )
+        ))
+
+    def rate(self, func, page_size, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return page_size * iterations / (time.perf_counter() - start)
@@ -0,0 +1,115 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from tasks.api_views import TaskListCreateAPIView
+from tasks.management.seeding import rolled_back, seed_tasks
+from tasks.models import Task, User
+from tasks.pagination import TaskCursorPagination
+from tasks.serializers import TaskReadSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed the task table and print EXPLAIN output for the querysets built by "
+        "TaskListCreateAPIView. Seeded rows are rolled back unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000, help='Number of tasks to seed (0 to use existing rows)')
+        parser.add_argument('--developers', type=int, default=50, help='Number of developers to spread seeded tasks over')
+        parser.add_argument('--page-size', type=int, default=TaskCursorPagination.page_size)
+        parser.add_argument('--analyze', action='store_true', help='Use EXPLAIN ANALYZE (PostgreSQL only)')
+        parser.add_argument('--check', action='store_true', help='Fail if any plan scans the whole task table')
+        parser.add_argument('--keep', action='store_true', help='Commit the seeded rows instead of rolling them back')
+
+    def handle(self, *args, **options):
+        with rolled_back(keep=options['keep']):
+            if options['tasks']:
+                lead, developer = self.seed(options['tasks'], options['developers'])
+            else:
+                lead, developer = self.existing()
+            failures = self.explain_all(lead, developer, options)
+
+        if failures:
+            raise CommandError('Full table scan in: {}'.format(', '.join(failures)))
+
+    def seed(self, task_count, developer_count):
+        lead, developers = seed_tasks(task_count, developer_count, prefix='explain')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        return lead, developers[0]
+
+    def existing(self):
+        # --tasks 0: plan against the real rows, as the developer with the most tasks
+        developer = (
+            User.objects.filter(role='developer').annotate(task_count=Count('tasks'))
+            .order_by('-task_count', 'id').first()
+        )
+        if developer is None:
+            raise CommandError('No developer to explain the queries for; seed tasks with --tasks')
+        # Only the role is read, so the lead needn't exist
+        lead = User.objects.filter(role='lead').first() or User(username='explain-lead', role='lead')
+        return lead, developer
+
+    def scenarios(self, lead, developer):
+        yield 'lead: all tasks', lead, {}
+        yield 'lead: by developer', lead, {'developer': developer.id}
+        yield 'lead: by status', lead, {'is_done': 'true'}
+        yield 'lead: by developer and status', lead, {'developer': developer.id, 'is_done': 'false'}
+        yield 'developer: own tasks', developer, {}
+        yield 'developer: own tasks by status', developer, {'is_done': 'true'}
+        yield 'lead: search', lead, {'q': 'task 7'}
+        yield 'developer: search own tasks', developer, {'q': 'task 7'}
+
+    def explain_all(self, lead, developer, options):
+        factory = APIRequestFactory()
+        view = TaskListCreateAPIView()
+        page_size = options['page_size']
+        explain_options = {'analyze': True} if options['analyze'] and connection.vendor == 'postgresql' else {}
+        failures = []
+
+        for name, user, params in self.scenarios(lead, developer):
+            request = Request(factory.get('/api/tasks/', params))
+            request.user = user
+            tasks = view.get_queryset(request)
+            queryset = TaskReadSerializer.rows(tasks)
+            plans = [
+                ('page count', self.explain_page_stats(view, request, tasks, explain_options)),
+                ('page', queryset[:page_size].explain(**explain_options)),
+                ('cursor', queryset.order_by('-created_at', '-id')[:page_size + 1].explain(**explain_options)),
+            ]
+            for mode, plan in plans:
+                label = f'{name} [{mode}]'
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                self.stdout.write(plan)
+                self.stdout.write('')
+                if options['check'] and self.is_full_scan(plan):
+                    failures.append(label)
+        return failures
+
+    def explain_page_stats(self, view, request, tasks, explain_options):
+        # The count of a page-number request: the counter row lookup, or the
+        # COUNT(*) aggregate for searches. Explained as the SQL the view runs.
+        with CaptureQueriesContext(connection) as queries:
+            view.get_page_stats(request, tasks)
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                cursor.execute(f"{connection.ops.explain_query_prefix(**explain_options)} {query['sql']}")
+                plans.extend(str(row[-1]) for row in cursor.fetchall())
+        return '\n'.join(plans)
+
+    def is_full_scan(self, plan):
+        table = re.escape(Task._meta.db_table)
+        for line in plan.splitlines():
+            if re.search(rf'Seq Scan on {table}\b', line):
+                return True
+            if re.search(rf'SCAN {table}\b', line) and 'USING' not in line:
+                return True
+        return False
@@ -0,0 +1,53 @@
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importer import TaskImporter, import_formats, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Import tasks from a CSV or NDJSON file (columns title, description, is_done "
+        "and developer, a username). Rows are validated and inserted in batches; each "
+        "batch commits on its own, and invalid rows are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or - for standard input")
+        parser.add_argument('--format', choices=import_formats,
+                            help='Input format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows validated and inserted per transaction')
+        parser.add_argument('--developer', help='Assign every task to this username, ignoring the developer column')
+
+    def handle(self, *args, **options):
+        format = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        if format not in import_formats:
+            raise CommandError('Cannot tell the input format; pass --format csv or --format ndjson')
+
+        developer = None
+        if options['developer']:
+            try:
+                developer = get_user_model().objects.get(username=options['developer'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"Unknown username \"{options['developer']}\"")
+
+        importer = TaskImporter(max(options['batch_size'], 1), developer=developer)
+        if options['path'] == '-':
+            report = importer.run(read_rows(sys.stdin.buffer, format))
+        else:
+            try:
+                with open(options['path'], 'rb') as lines:
+                    report = importer.run(read_rows(lines, format))
+            except OSError as exc:
+                raise CommandError(str(exc))
+
+        for error in report['errors']:
+            self.stdout.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+        if report['error_count'] > len(report['errors']):
+            self.stdout.write(f"... {report['error_count'] - len(report['errors'])} more errors")
+        self.stdout.write(
+            f"Imported {report['created']} of {report['rows']} rows ({report['error_count']} errors) "
+            f"in {report['seconds']:.2f}s, {report['rows_per_second'] or 0} rows/s"
+        )
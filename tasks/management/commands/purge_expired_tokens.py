@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding refresh tokens, and their blacklist entries, in "
+        "batches. With --every the purge repeats until the process is stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches')
+        parser.add_argument('--every', type=float, default=0, help='Repeat the purge every N seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = self.purge(options['batch_size'], options['pause'])
+            self.stdout.write(f"Deleted {deleted} expired tokens")
+            if not options['every']:
+                break
+            time.sleep(options['every'])
+
+    def purge(self, batch_size, pause):
+        now = timezone.now()
+        deleted = 0
+        while True:
+            # Tokens share one lifetime, so the oldest ids expire first and walking
+            # the primary key finds a batch without scanning the whole table
+            ids = list(
+                OutstandingToken.objects
+                .filter(expires_at__lte=now)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted
+            # Django emulates the cascade in Python: it reads the batch's tokens, then
+            # deletes their BlacklistedToken rows with one DELETE ... IN before them
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+            if pause:
+                time.sleep(pause)
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.changes import task_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete delta sync tombstones older than TASK_SYNC['TOMBSTONE_DAYS'] (or --days). "
+        "Clients holding an older watermark get 410 and resync. With --every the purge "
+        "repeats until the process is stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Keep tombstones this many days')
+        parser.add_argument('--every', type=float, default=0, help='Repeat the purge every N seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = task_tombstones.purge(options['days'])
+            self.stdout.write(f"Deleted {deleted} task tombstones")
+            if not options['every']:
+                break
+            time.sleep(options['every'])
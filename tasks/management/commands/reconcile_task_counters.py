@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.counters import task_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount tasks per developer and overall, and repair the task counter rows "
+        "that drifted (for example after raw SQL writes). With --every the check "
+        "repeats until the process is stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without repairing it')
+        parser.add_argument('--every', type=float, default=0, help='Repeat the check every N seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            drift = task_counters.reconcile(dry_run=options['dry_run'])
+            for key, stored, actual in drift:
+                self.stdout.write(f"{key}: stored {stored}, actual {actual}")
+            verb = 'Found' if options['dry_run'] else 'Repaired'
+            self.stdout.write(f"{verb} {len(drift)} drifted task counters")
+            if not options['every']:
+                break
+            time.sleep(options['every'])
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from gunicorn.app.base import BaseApplication
+
+from tasks.warmup import warm_code, warm_worker
+
+
+class Server(BaseApplication):
+    def __init__(self, application, options):
+        self.application = application
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the project with gunicorn: the application is imported and warmed once, "
+        "then forked into --workers processes that each warm their database connections "
+        "before accepting requests. SIGTERM drains in-flight requests before exiting."
+    )
+
+    def add_arguments(self, parser):
+        options = getattr(settings, 'SERVER', {})
+        parser.add_argument('--bind', default=options.get('BIND', '0.0.0.0:8000'))
+        parser.add_argument('--workers', type=int, default=options.get('WORKERS', 2))
+        parser.add_argument('--threads', type=int, default=options.get('THREADS', 4),
+                            help='Request threads per worker (WSGI only)')
+        parser.add_argument('--asgi', action='store_true', default=options.get('ASGI', False),
+                            help='Serve tasklist.asgi with uvicorn workers instead of tasklist.wsgi')
+        parser.add_argument('--timeout', type=int, default=options.get('TIMEOUT', 30))
+        parser.add_argument('--graceful-timeout', type=int, default=options.get('GRACEFUL_TIMEOUT', 30),
+                            help='Seconds workers get to finish in-flight requests on shutdown')
+        parser.add_argument('--max-requests', type=int, default=options.get('MAX_REQUESTS', 0),
+                            help='Restart a worker after this many requests (0 to disable)')
+        parser.add_argument('--no-warmup', action='store_false', dest='warmup')
+
+    def handle(self, *args, **options):
+        from tasklist.wsgi import application as wsgi_application
+        if options['asgi']:
+            from tasklist.asgi import application
+        else:
+            application = wsgi_application
+
+        if options['warmup']:
+            warm_code()
+        # Nothing opened here may be shared with the forked workers
+        connections.close_all()
+
+        def post_fork(server, worker):
+            if options['warmup']:
+                # The warmup requests are WSGI calls; uvicorn workers skip them
+                warm_worker(None if options['asgi'] else wsgi_application)
+
+        def worker_exit(server, worker):
+            connections.close_all()
+
+        config = {
+            'bind': options['bind'],
+            'workers': options['workers'],
+            'timeout': options['timeout'],
+            'graceful_timeout': options['graceful_timeout'],
+            'max_requests': options['max_requests'],
+            'max_requests_jitter': options['max_requests'] // 10,
+            'preload_app': True,
+            'accesslog': '-',
+            'post_fork': post_fork,
+            'worker_exit': worker_exit,
+        }
+        if options['asgi']:
+            config['worker_class'] = 'uvicorn.workers.UvicornWorker'
+        else:
+            config['worker_class'] = 'gthread'
+            config['threads'] = options['threads']
+
+        Server(application, config).run()
@@ -0,0 +1,49 @@
+import random
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from tasks.counters import task_counters
+from tasks.models import Task, User
+
+
+class RollbackSeed(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back(keep=False):
+    """
+    Run the block in a transaction that is rolled back when it ends, so the rows a
+    command seeds never outlive it. keep=True commits them instead.
+    """
+    try:
+        with transaction.atomic():
+            yield
+            if not keep:
+                raise RollbackSeed
+    except RollbackSeed:
+        pass
+
+
+def seed_tasks(task_count, developer_count, prefix='bench'):
+    """
+    Create a lead and developer_count developers, and task_count tasks spread over
+    the developers. Returns the lead and the developers.
+    """
+    suffix = random.randint(0, 10 ** 6)
+    lead = User.objects.create_user(username=f'{prefix}-lead-{suffix}', role='lead', is_active=True)
+    developers = User.objects.bulk_create(
+        User(username=f'{prefix}-dev-{suffix}-{i}', role='developer', is_active=True)
+        for i in range(max(developer_count, 1))
+    )
+    Task.objects.bulk_create(
+        (
+            Task(title=f'Task {i}', developer=random.choice(developers), is_done=random.random() < 0.5)
+            for i in range(task_count)
+        ),
+        batch_size=1000,
+    )
+    # bulk_create bypasses the counter signals
+    task_counters.reconcile()
+    return lead, developers
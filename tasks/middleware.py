@@ -0,0 +1,98 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import OperationalError
+from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .routers import choose_replica, replica_weights, request_replica
+
+try:
+    from psycopg_pool import PoolTimeout
+except ImportError:  # pooling needs psycopg 3
+    PoolTimeout = None
+
+
+# Answers 503 with Retry-After when no pooled database connection frees up within
+# the pool timeout, instead of a generic 500, so clients and load balancers back off.
+class PoolTimeoutMiddleware(MiddlewareMixin):
+    retry_after = 1
+
+    def process_exception(self, request, exception):
+        if PoolTimeout is None or not isinstance(exception, OperationalError):
+            return None
+        if not isinstance(exception.__cause__, PoolTimeout):
+            return None
+        response = JsonResponse({'error': 'Database busy, retry shortly'}, status=503)
+        response['Retry-After'] = str(self.retry_after)
+        return response
+
+
+# Sends the reads of safe requests to a read replica (see tasks.routers). A user who
+# made a write request stays on the primary for PIN_SECONDS afterwards, so they read
+# their own writes despite replication lag. The user comes from the access token,
+# without a database lookup. Pins live in the cache, which must be shared by all
+# workers for pins to follow users across them.
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+    pin_prefix = 'db:pinned:'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    @property
+    def options(self):
+        return getattr(settings, 'READ_REPLICAS', {})
+
+    @property
+    def cache(self):
+        return caches[self.options.get('CACHE_ALIAS', 'default')]
+
+    def get_user_id(self, request):
+        parts = request.META.get('HTTP_AUTHORIZATION', '').split()
+        if len(parts) != 2 or parts[0] not in jwt_settings.AUTH_HEADER_TYPES:
+            return None
+        try:
+            return AccessToken(parts[1])[jwt_settings.USER_ID_CLAIM]
+        except (TokenError, KeyError):
+            return None
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not replica_weights():
+            return self.get_response(request)
+
+        user_id = self.get_user_id(request)
+        safe = request.method in SAFE_METHODS
+        pinned = safe and user_id is not None and self.cache.get(f'{self.pin_prefix}{user_id}')
+        token = request_replica.set(choose_replica() if safe and not pinned else None)
+        try:
+            return self.get_response(request)
+        finally:
+            request_replica.reset(token)
+            if not safe and user_id is not None:
+                self.cache.set(f'{self.pin_prefix}{user_id}', True, timeout=self.options.get('PIN_SECONDS', 5))
+
+    async def __acall__(self, request):
+        if not replica_weights():
+            return await self.get_response(request)
+
+        user_id = self.get_user_id(request)
+        safe = request.method in SAFE_METHODS
+        pinned = safe and user_id is not None and await self.cache.aget(f'{self.pin_prefix}{user_id}')
+        token = request_replica.set(choose_replica() if safe and not pinned else None)
+        try:
+            return await self.get_response(request)
+        finally:
+            request_replica.reset(token)
+            if not safe and user_id is not None:
+                await self.cache.aset(f'{self.pin_prefix}{user_id}', True, timeout=self.options.get('PIN_SECONDS', 5))
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_alter_user_is_active'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['developer', 'is_done', '-created_at', '-id'], name='task_dev_done_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['developer', '-created_at', '-id'], name='task_dev_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['is_done', '-created_at', '-id'], name='task_done_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-created_at', '-id'], name='task_created_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models.functions import Upper
+
+# Backend-specific search indexes used by tasks.search.search_tasks(). On SQLite the
+# triggers belong to tasks_task: a later migration that rebuilds the table drops them
+# and must recreate them.
+
+postgres_indexes = [
+    # Same expression as tasks.search.search_vector, so the planner can use it
+    GinIndex(SearchVector('title', 'description', config='english'), name='task_search_idx'),
+    # Serves title__icontains, which compares UPPER(title) with LIKE
+    GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='task_title_trgm_idx'),
+]
+
+sqlite_create = [
+    "CREATE VIRTUAL TABLE tasks_task_fts USING fts5("
+    "title, description, content='tasks_task', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN "
+    "INSERT INTO tasks_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN "
+    "INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER tasks_task_fts_update AFTER UPDATE OF title, description ON tasks_task BEGIN "
+    "INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+]
+
+sqlite_drop = [
+    "DROP TRIGGER IF EXISTS tasks_task_fts_insert",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_delete",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_update",
+    "DROP TABLE IF EXISTS tasks_task_fts",
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for index in postgres_indexes:
+            schema_editor.add_index(Task, index)
+    elif vendor == 'sqlite':
+        for statement in sqlite_create:
+            schema_editor.execute(statement)
+
+
+def drop_search_indexes(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for index in postgres_indexes:
+            schema_editor.remove_index(Task, index)
+    elif vendor == 'sqlite':
+        for statement in sqlite_drop:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
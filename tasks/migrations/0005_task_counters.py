@@ -0,0 +1,50 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:22
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_existing_tasks(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskCounter = apps.get_model('tasks', 'TaskCounter')
+    db_alias = schema_editor.connection.alias
+    rows = Task.objects.using(db_alias).order_by().values('developer_id').annotate(
+        total=Count('id'), done=Count('id', filter=Q(is_done=True)), open=Count('id', filter=Q(is_done=False))
+    )
+    counters = {'all': TaskCounter(key='all')}
+    for row in rows:
+        counter = counters['all']
+        counter.total += row['total']
+        counter.done += row['done']
+        counter.open += row['open']
+        if row['developer_id'] is not None:
+            key = f"developer:{row['developer_id']}"
+            counters[key] = TaskCounter(
+                key=key, developer_id=row['developer_id'], total=row['total'], done=row['done'], open=row['open']
+            )
+    TaskCounter.objects.using(db_alias).bulk_create(counters.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('key', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('total', models.IntegerField(default=0)),
+                ('done', models.IntegerField(default=0)),
+                ('open', models.IntegerField(default=0)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('developer', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='task_counter', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(count_existing_tasks, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils.timezone import now
 from django.contrib.auth.models import AbstractUser
 
@@ -10,6 +10,13 @@ class User(AbstractUser):
     ]
     role = models.CharField(max_length=10, choices=ROLE_CHOICES)
     is_active = models.BooleanField(default=False)
+
+    class Meta(AbstractUser.Meta):
+        # User lists are filtered by role and ordered by username
+        indexes = [
+            models.Index(fields=['role', 'username'], name='user_role_username_idx'),
+        ]
+
     def __str__(self):
         return self.username
 
@@ -22,12 +29,79 @@ class Task(models.Model):
     completed_at = models.DateTimeField(blank=True, null=True)
     developer = models.ForeignKey('User', on_delete=models.CASCADE, related_name='tasks', null=True, blank=True)
 
-    def save(self, *args, **kwargs):
+    class Meta:
+        # Match the task list access patterns: scoped by developer and/or is_done,
+        # always newest first (id breaks ties for cursor pagination)
+        indexes = [
+            models.Index(fields=['developer', 'is_done', '-created_at', '-id'], name='task_dev_done_created_idx'),
+            models.Index(fields=['developer', '-created_at', '-id'], name='task_dev_created_idx'),
+            models.Index(fields=['is_done', '-created_at', '-id'], name='task_done_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='task_created_idx'),
+            # Delta sync walks changes in (updated_at, id) order
+            models.Index(fields=['developer', 'updated_at', 'id'], name='task_dev_updated_idx'),
+            models.Index(fields=['updated_at', 'id'], name='task_updated_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        task = super().from_db(db, field_names, values)
+        # Remember the stored developer so a reassignment can invalidate both scopes
+        task._loaded_developer_id = task.__dict__.get('developer_id')
+        # and the stored status, which the task counters move between
+        if 'is_done' in task.__dict__:
+            task._loaded_is_done = task.is_done
+        return task
+
+    # Also used by bulk writes, which bypass save()
+    def update_completed_at(self):
         if self.is_done and not self.completed_at:
             self.completed_at = now()
         elif not self.is_done:
             self.completed_at = None
-        super().save(*args, **kwargs)
+
+    def save(self, *args, **kwargs):
+        self.update_completed_at()
+        # The post_save handlers update the task counters in the same transaction
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+        self._loaded_developer_id = self.developer_id
+        self._loaded_is_done = self.is_done
 
     def __str__(self):
         return self.title
+
+
+# Denormalized task counts: one row per developer plus the 'all' row, changed in the
+# same transaction as the tasks they count (see tasks.counters). changed_at moves on
+# every write in the row's scope, so it also serves as the scope's last-modified time.
+class TaskCounter(models.Model):
+    key = models.CharField(max_length=32, primary_key=True)
+    developer = models.OneToOneField(
+        'User', on_delete=models.CASCADE, related_name='task_counter', null=True, blank=True
+    )
+    total = models.IntegerField(default=0)
+    done = models.IntegerField(default=0)
+    open = models.IntegerField(default=0)
+    changed_at = models.DateTimeField(default=now)
+
+    def __str__(self):
+        return self.key
+
+
+# Records a task leaving a scope, for delta sync clients: deleted, or (deleted=False)
+# reassigned away from developer_id. Plain ids rather than foreign keys, so the record
+# outlives the task and the developer.
+class TaskTombstone(models.Model):
+    task_id = models.BigIntegerField()
+    developer_id = models.BigIntegerField(null=True, blank=True)
+    deleted = models.BooleanField(default=True)
+    removed_at = models.DateTimeField(default=now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['developer_id', 'removed_at', 'id'], name='tombstone_dev_removed_idx'),
+            models.Index(fields=['removed_at', 'id'], name='tombstone_removed_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task_id} @ {self.removed_at}'
@@ -0,0 +1,148 @@
+from base64 import b64decode, b64encode
+from datetime import datetime
+from functools import partial
+
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KnownCountPaginator(Paginator):
+    # Lets the caller pass a total it already has, saving the COUNT(*) query
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
+
+# Pagination class with 10 items per page
+class TaskPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None, count=None):
+        self.django_paginator_class = partial(KnownCountPaginator, count=count)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None, count=None):
+        # Paginator slices lazily, so with a known count only the page fetch touches the DB
+        self.request = request
+        page_size = self.get_page_size(request)
+        paginator = KnownCountPaginator(queryset, page_size, count=count)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+
+# Pages of the user list, used when ?page= or ?page_size= is passed
+class UserPagination(TaskPagination):
+    page_size = 100
+    max_page_size = 1000
+
+
+# Keyset pagination on (created_at, id): every page is a single indexed range
+# scan with no COUNT(*) and no OFFSET, so page 10,000 costs the same as page 1.
+# Enabled by passing ?cursor= (empty for the first page).
+class TaskCursorPagination(BasePagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self.get_page_queryset(queryset, request)
+        return self.set_page(list(queryset), position, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self.get_page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset], position, reverse)
+
+    def get_page_queryset(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        encoded = request.query_params.get(self.cursor_query_param, '')
+        position, reverse = self.decode_cursor(encoded) if encoded else (None, False)
+
+        if reverse:
+            queryset = queryset.order_by('created_at', 'id')
+            if position is not None:
+                created_at, pk = position
+                queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+        else:
+            queryset = queryset.order_by('-created_at', '-id')
+            if position is not None:
+                created_at, pk = position
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+        # Fetch one extra row to find out whether there is another page
+        return queryset[:self.page_size + 1], position, reverse
+
+    def set_page(self, results, position, reverse):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, task, reverse):
+        token = '{}|{}|{}'.format(task.created_at.isoformat(), task.id, int(reverse))
+        encoded = b64encode(token.encode('ascii')).decode('ascii')
+        return replace_query_param(remove_query_param(self.base_url, 'page'), self.cursor_query_param, encoded)
+
+    def decode_cursor(self, encoded):
+        try:
+            token = b64decode(encoded.encode('ascii')).decode('ascii')
+            created_at, pk, reverse = token.split('|')
+            position, reverse = (datetime.fromisoformat(created_at), int(pk)), bool(int(reverse))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        # encode_cursor() only writes aware timestamps; a naive one can't be compared
+        # with created_at, like a naive watermark
+        if position[0].tzinfo is None:
+            raise ParseError(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
@@ -0,0 +1,162 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .serializers import TaskReadSerializer
+
+try:
+    import orjson
+except ImportError:  # FastJSONRenderer falls back to the json module
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # MessagePack is only offered when msgpack is installed
+    msgpack = None
+
+
+# The project's JSON renderer: orjson for compact, unescaped-unicode, unindented
+# output, JSONRenderer otherwise. Values orjson doesn't know, datetimes included, go
+# through DRF's encoder, so they are spelled the same. The output matches
+# JSONRenderer's except for floats: exponents are written 1e20 rather than 1e+20,
+# and NaN and Infinity become null where strict JSONRenderer raises.
+class FastJSONRenderer(JSONRenderer):
+    options = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson is not None else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            # e.g. integers over 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer does, so the output stays a JavaScript subset
+        if b'\xe2\x80' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+# application/msgpack for service clients: the same data as the JSON responses, with
+# values MessagePack has no type for converted by DRF's JSON encoder. Integers over
+# 64 bits, which MessagePack can't hold, are sent as strings.
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder_class = JSONRenderer.encoder_class
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.default, use_bin_type=True)
+
+    def default(self, obj):
+        if isinstance(obj, int):
+            return str(obj)
+        return self.encoder_class().default(obj)
+
+
+# Export formats. As renderers they let DRF's content negotiation pick the format
+# from ?format= or the Accept header; the export itself is written by stream(), a
+# chunk of rows at a time, so memory stays flat however many rows there are.
+class TaskExportRenderer(BaseRenderer):
+    charset = 'utf-8'
+    fields = [
+        'id', 'title', 'description', 'is_done', 'developer', 'developer_username',
+        'created_at', 'updated_at', 'completed_at',
+    ]
+
+    def stream(self, rows, chunk_size):
+        """
+        Yield the export of a TaskReadSerializer.rows() queryset, read through a
+        server-side cursor `chunk_size` rows at a time.
+        """
+        header = self.header()
+        if header:
+            yield header
+        iterator = rows.iterator(chunk_size=chunk_size)
+        while batch := list(islice(iterator, chunk_size)):
+            yield self.encode(TaskReadSerializer(batch, many=True).data)
+
+    async def astream(self, rows, chunk_size):
+        # For ASGI servers, which would otherwise read a sync iterator to the end
+        # before sending anything
+        header = self.header()
+        if header:
+            yield header
+        batch = []
+        async for row in rows.aiterator(chunk_size=chunk_size):
+            batch.append(row)
+            if len(batch) == chunk_size:
+                yield self.encode(TaskReadSerializer(batch, many=True).data)
+                batch = []
+        if batch:
+            yield self.encode(TaskReadSerializer(batch, many=True).data)
+
+    def header(self):
+        return ''
+
+    def encode(self, items):
+        raise NotImplementedError
+
+
+class CSVRenderer(TaskExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    # Spreadsheets read cells starting with these as formulas
+    formula_prefixes = ('=', '+', '-', '@', '\t', '\r')
+
+    def header(self):
+        return self.encode([dict(zip(self.fields, self.fields))])
+
+    def encode(self, items):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for item in items:
+            writer.writerow(self.cell(item[field]) for field in self.fields)
+        return buffer.getvalue()
+
+    def cell(self, value):
+        # Same spelling as the JSON API
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        # Titles and descriptions come from developers: keep them from running as
+        # formulas when a lead opens the export
+        if isinstance(value, str) and value.startswith(self.formula_prefixes):
+            return "'" + value
+        return value
+
+
+class NDJSONRenderer(TaskExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def encode(self, items):
+        return ''.join(
+            json.dumps({field: item[field] for field in self.fields}, ensure_ascii=False) + '\n'
+            for item in items
+        )
+
+
+# Lets content negotiation accept `Accept: text/event-stream` for the task event
+# stream, and formats its messages
+class EventStreamRenderer(BaseRenderer):
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def encode(self, name, data):
+        return f'event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+    def comment(self, text):
+        return f': {text}\n\n'
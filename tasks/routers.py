@@ -0,0 +1,61 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Set by ReplicaRoutingMiddleware for the duration of a request. Outside requests
+# (management commands, shells, signals run at startup) everything uses the primary.
+request_replica = ContextVar('request_replica', default=None)
+
+
+def replica_weights():
+    return getattr(settings, 'READ_REPLICAS', {}).get('WEIGHTS', {})
+
+
+def choose_replica():
+    """Pick a replica alias by weight, or None when no replica is configured."""
+    weights = {alias: weight for alias, weight in replica_weights().items() if weight > 0}
+    if not weights:
+        return None
+    return random.choices(list(weights), weights=list(weights.values()))[0]
+
+
+@contextmanager
+def use_primary():
+    """
+    Send the reads of the block to the primary, for data that is cached under a
+    version newer than a lagging replica may have.
+    """
+    token = request_replica.set(None)
+    try:
+        yield
+    finally:
+        request_replica.reset(token)
+
+
+# Sends reads to the replica chosen for the current request, and everything else to
+# the primary. The middleware chooses one replica per request, so a page and its count
+# come from the same server, and leaves it unset for writes and pinned users.
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replica = request_replica.get()
+        if replica is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return replica
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *replica_weights()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        if db in replica_weights():
+            return False
+        return None
@@ -0,0 +1,39 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Must match the expression of the GIN index created in 0004_task_search_indexes
+search_config = 'english'
+search_vector = SearchVector('title', 'description', config=search_config)
+
+# SQLite keeps an FTS5 table in sync with tasks_task through triggers
+fts_table = 'tasks_task_fts'
+
+
+def search_tasks(queryset, query):
+    """
+    Filter a task queryset to tasks matching the search query, using the search
+    indexes of the current database. On PostgreSQL that is the full-text index over
+    title and description plus a trigram index for substrings of the title; on
+    SQLite an FTS5 index matching words by prefix.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        return queryset.alias(search=search_vector).filter(
+            Q(search=SearchQuery(query, config=search_config, search_type='websearch')) | Q(title__icontains=query)
+        )
+
+    words = re.findall(r'\w+', query)
+    if not words:
+        return queryset.none()
+    if vendor == 'sqlite':
+        match = ' '.join('"{}"*'.format(word) for word in words)
+        return queryset.filter(id__in=RawSQL(f'SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s', [match]))
+
+    # Other databases have no search index; match every word anywhere
+    for word in words:
+        queryset = queryset.filter(Q(title__icontains=word) | Q(description__icontains=word))
+    return queryset
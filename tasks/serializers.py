@@ -1,7 +1,12 @@
 from rest_framework import serializers
-from django.utils.timezone import localtime
+from django.db.models import F
+from django.utils.timezone import localtime, get_current_timezone
 from .models import Task
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .tokens import CachedBlacklistRefreshToken
 
 
 
@@ -15,6 +20,54 @@ class UserSerializer(serializers.ModelSerializer):
         user = get_user_model().objects.create_user(**validated_data)
         return user
 
+# Adds username and role claims to the tokens, so authorization can work from the
+# token alone, and returns the authenticated user with the token pair.
+class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['username'] = user.username
+        token['role'] = user.role
+        return token
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        data['user'] = {
+            'id': self.user.id,
+            'username': self.user.username,
+            'role': self.user.role
+        }
+        return data
+
+# Checks the blacklist through the in-process blacklist cache, and copies the user's
+# current username and role into the new tokens, so a role change or deactivation
+# reaches stateless authentication at the next refresh
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = CachedBlacklistRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        refresh['username'] = user.username
+        refresh['role'] = user.role
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+
+        return data
+
 class TaskSerializer(serializers.ModelSerializer):
     created_at = serializers.SerializerMethodField()
     updated_at = serializers.SerializerMethodField()
@@ -39,4 +92,155 @@ class TaskSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Task
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+
+# Validates one item of a bulk request. The developer is always the requesting
+# user, so there is no per-item foreign key lookup.
+class TaskBulkSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = ['title', 'description', 'is_done']
+
+
+# Validates one imported row. The developer is a username, resolved by the importer
+# for a whole batch at once.
+class TaskImportSerializer(serializers.ModelSerializer):
+    developer = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    class Meta:
+        model = Task
+        fields = ['title', 'description', 'is_done', 'developer']
+
+
+def format_timestamps(values):
+    # Same output as localtime(value).strftime('%Y-%m-%d %H:%M:%S'), with the
+    # timezone looked up once for the whole batch
+    tz = get_current_timezone()
+    return [
+        value.astimezone(tz).isoformat(' ', 'seconds')[:19] if value is not None else None
+        for value in values
+    ]
+
+
+# Read-only counterpart of TaskSerializer for the list and detail GETs. Rows come
+# from values_list() instead of model instances, and the field machinery is skipped,
+# but the representation is identical.
+class TaskReadSerializer:
+    columns = (
+        'id', 'created_at', 'updated_at', 'completed_at', 'developer_username',
+        'title', 'description', 'is_done', 'developer_id',
+    )
+    # Output fields and the column each one comes from
+    sources = {
+        'id': 'id', 'created_at': 'created_at', 'updated_at': 'updated_at', 'completed_at': 'completed_at',
+        'developer_username': 'developer_username', 'title': 'title', 'description': 'description',
+        'is_done': 'is_done', 'developer': 'developer_id',
+    }
+    fields = tuple(sources)
+    timestamp_fields = ('created_at', 'updated_at', 'completed_at')
+
+    def __init__(self, instance, many=False, fields=None):
+        # fields: output only these (see select_fields()), in the usual order
+        self.instance = instance
+        self.many = many
+        if fields is not None:
+            self.fields = tuple(field for field in self.fields if field in fields)
+
+    @classmethod
+    def select_fields(cls, fields=None, exclude=None):
+        """
+        The fields picked by comma-separated ?fields= and ?exclude= values, or None for
+        all of them. Raises ValueError for unknown names or an empty selection.
+        """
+        if not fields and not exclude:
+            return None
+        picked = cls.split_names(fields) if fields else list(cls.fields)
+        excluded = cls.split_names(exclude)
+        unknown = [name for name in picked + excluded if name not in cls.sources]
+        if unknown:
+            raise ValueError(f"Unknown task fields: {', '.join(unknown)}")
+        selected = tuple(field for field in cls.fields if field in picked and field not in excluded)
+        if not selected:
+            raise ValueError("No task fields selected")
+        return selected
+
+    @staticmethod
+    def split_names(value):
+        # Blank names, as in ?fields=id, or ?fields=id,,title, are skipped
+        return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+    @classmethod
+    def get_columns(cls, fields=None, extra=()):
+        if fields is None:
+            return cls.columns
+        needed = {cls.sources[field] for field in fields} | set(extra)
+        return tuple(column for column in cls.columns if column in needed)
+
+    @classmethod
+    def rows(cls, queryset, fields=None, extra=()):
+        """
+        values_list() rows with the columns of `fields` (all by default) plus the
+        `extra` columns the caller needs itself. developer__username is only joined
+        when developer_username is among them.
+        """
+        columns = cls.get_columns(fields, extra)
+        if 'developer_username' in columns:
+            queryset = queryset.annotate(developer_username=F('developer__username'))
+        return queryset.values_list(*columns, named=True)
+
+    @staticmethod
+    def to_row(task):
+        developer_username = task.developer.username if task.developer_id else None
+        return (
+            task.id, task.created_at, task.updated_at, task.completed_at, developer_username,
+            task.title, task.description, task.is_done, task.developer_id,
+        )
+
+    @staticmethod
+    def get_value(row, column):
+        if isinstance(row, tuple) or column != 'developer_username':
+            return getattr(row, column)
+        return row.developer.username if row.developer_id else None
+
+    def select(self, rows):
+        # Sparse fieldsets: rows from rows(fields=...) or instances loaded with only()
+        sources = [(field, self.sources[field]) for field in self.fields]
+        timestamp_columns = [column for field, column in sources if field in self.timestamp_fields]
+        timestamps = iter(format_timestamps(
+            [getattr(row, column) for row in rows for column in timestamp_columns]
+        ))
+        return [
+            {
+                field: next(timestamps) if field in self.timestamp_fields else self.get_value(row, column)
+                for field, column in sources
+            }
+            for row in rows
+        ]
+
+    @property
+    def data(self):
+        rows = self.instance if self.many else [self.instance]
+        if self.fields != type(self).fields:
+            data = self.select(rows)
+            return data if self.many else data[0]
+        rows = [row if isinstance(row, tuple) else self.to_row(row) for row in rows]
+
+        # Convert all three timestamp columns of the batch in one pass
+        timestamps = format_timestamps([value for row in rows for value in row[1:4]])
+
+        data = [
+            {
+                'id': row[0],
+                'created_at': timestamps[i * 3],
+                'updated_at': timestamps[i * 3 + 1],
+                'completed_at': timestamps[i * 3 + 2],
+                'developer_username': row[4],
+                'title': row[5],
+                'description': row[6],
+                'is_done': row[7],
+                'developer': row[8],
+            }
+            for i, row in enumerate(rows)
+        ]
+        return data if self.many else data[0]
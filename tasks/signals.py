@@ -0,0 +1,112 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .authentication import CachedJWTAuthentication, invalidate_user
+from .cache import developer_directory, task_list_cache
+from .changes import task_tombstones
+from .counters import task_counters
+from .events import task_events
+from .models import Task
+from .tokens import blacklist_cache
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_lists(sender, instance, **kwargs):
+    # A reassigned task leaves its previous developer's scope too
+    task_list_cache.invalidate([instance.developer_id, getattr(instance, '_loaded_developer_id', None)])
+
+
+@receiver(pre_save, sender=Task)
+def load_stored_task_state(sender, instance, raw, **kwargs):
+    # Tasks not read from the database (or read without is_done) don't know what they
+    # are replacing; look it up so the counters can move the task between buckets
+    if raw or instance.pk is None or hasattr(instance, '_loaded_is_done'):
+        return
+    stored = Task.objects.filter(pk=instance.pk).values_list('developer_id', 'is_done').first()
+    if stored:
+        instance._loaded_developer_id, instance._loaded_is_done = stored
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    before = None if created else (getattr(instance, '_loaded_developer_id', None), getattr(instance, '_loaded_is_done', None))
+    task_counters.record(before, (instance.developer_id, instance.is_done))
+
+
+@receiver(post_delete, sender=Task)
+def count_deleted_task(sender, instance, **kwargs):
+    if 'is_done' in instance.__dict__:
+        task_counters.record((instance.developer_id, instance.is_done), None)
+
+
+@receiver(post_delete, sender=Task)
+def record_deleted_task(sender, instance, **kwargs):
+    task_tombstones.record(instance.id, instance.developer_id)
+
+
+@receiver(post_save, sender=Task)
+def record_reassigned_task(sender, instance, created, raw, **kwargs):
+    # Delta sync clients of the previous developer have to drop the task
+    previous = getattr(instance, '_loaded_developer_id', None)
+    if not created and not raw and previous is not None and previous != instance.developer_id:
+        task_tombstones.record(instance.id, previous, deleted=False)
+
+
+@receiver(post_save, sender=Task)
+def publish_saved_task(sender, instance, created, raw, using, **kwargs):
+    if not raw:
+        kind = 'created' if created else 'updated'
+        task_events.record(kind, instance.id, instance.developer_id, getattr(instance, '_loaded_developer_id', None), using)
+
+
+@receiver(post_delete, sender=Task)
+def publish_deleted_task(sender, instance, using, **kwargs):
+    task_events.record('deleted', instance.id, instance.developer_id, using=using)
+
+
+@receiver(pre_save, sender=get_user_model())
+def load_stored_username(sender, instance, raw, update_fields=None, **kwargs):
+    # Saves that can't change the username, like last_login on login, skip the lookup
+    if raw or instance.pk is None or (update_fields and 'username' not in update_fields):
+        return
+    instance._stored_username = (
+        sender.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_task_lists(sender, instance, created, **kwargs):
+    # Cached pages embed developer_username, and nothing else of the user
+    stored = instance.__dict__.pop('_stored_username', None)
+    if not created and stored is not None and stored != instance.username:
+        task_list_cache.invalidate([instance.id])
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, update_fields=None, **kwargs):
+    # Covers deactivation (is_active) and role changes for JWT-authenticated requests.
+    # Saves of uncached columns only, like last_login on login, keep the cached user.
+    if update_fields and not set(CachedJWTAuthentication.user_fields + ('password',)) & set(update_fields):
+        return
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_developer_directory(sender, instance, update_fields=None, **kwargs):
+    # Saves of other columns only, like last_login on login, leave the directory as is
+    if update_fields and not {'username', 'role'} & set(update_fields):
+        return
+    developer_directory.invalidate()
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_blacklisted_token(sender, instance, created, **kwargs):
+    if created:
+        blacklist_cache.add(instance.token.jti)
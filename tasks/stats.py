@@ -0,0 +1,127 @@
+from datetime import datetime, time, timedelta
+
+from django.db import connections
+from django.db.models import Aggregate, Count, DurationField, ExpressionWrapper, F, IntegerField, Q, Value, Window
+from django.db.models.functions import RowNumber, TruncDate
+from django.utils.timezone import make_aware
+
+# Completion-time percentiles reported per developer
+percentiles = (50, 90, 95)
+
+completion_time = ExpressionWrapper(F('completed_at') - F('created_at'), output_field=DurationField())
+
+
+# Nearest-rank percentile: the smallest value with at least `percentile`% of the
+# group at or below it. An ordered-set aggregate, so PostgreSQL only.
+class PercentileDisc(Aggregate):
+    function = 'PERCENTILE_DISC'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, percentile, **extra):
+        super().__init__(expression, fraction=percentile / 100, **extra)
+
+
+def developer_stats(queryset):
+    """
+    Task totals and completion-time percentiles per developer, in one GROUP BY query.
+    Databases without ordered-set aggregates get the percentiles from one extra
+    window-function query.
+    """
+    queryset = queryset.order_by()
+    totals = {
+        'total': Count('id'),
+        'done': Count('id', filter=Q(is_done=True)),
+        'open': Count('id', filter=Q(is_done=False)),
+    }
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        totals.update({f'p{p}': PercentileDisc(completion_time, p) for p in percentiles})
+
+    rows = list(
+        queryset.values('developer_id', developer_username=F('developer__username'))
+        .annotate(**totals)
+        .order_by('developer_username', 'developer_id')
+    )
+
+    if vendor != 'postgresql':
+        by_developer = completion_percentiles(queryset)
+        for row in rows:
+            row.update(by_developer.get(row['developer_id'], {}))
+
+    return [
+        {
+            'developer': row['developer_id'],
+            'developer_username': row['developer_username'],
+            'total': row['total'],
+            'done': row['done'],
+            'open': row['open'],
+            'completion_seconds': {f'p{p}': seconds(row.get(f'p{p}')) for p in percentiles},
+        }
+        for row in rows
+    ]
+
+
+def completion_percentiles(queryset):
+    """
+    Nearest-rank completion-time percentiles per developer from a window query: each
+    completed task is numbered within its developer by completion time, and only the
+    rows at a percentile's rank are fetched.
+    """
+    partition = F('developer_id')
+    ranked = queryset.filter(completed_at__isnull=False).annotate(
+        duration=completion_time,
+        position=Window(RowNumber(), partition_by=partition, order_by=[completion_time.copy(), F('id')]),
+        completed=Window(Count('id'), partition_by=partition),
+    )
+    # rank = ceil(count * p / 100), in integer arithmetic
+    ranks = {
+        p: ExpressionWrapper((F('completed') * p + 99) / 100, output_field=IntegerField())
+        for p in percentiles
+    }
+    ranked = ranked.annotate(**{f'rank_p{p}': rank for p, rank in ranks.items()})
+    condition = Q()
+    for p in percentiles:
+        condition |= Q(position=F(f'rank_p{p}'))
+
+    result = {}
+    for row in ranked.filter(condition).values('developer_id', 'position', 'duration', *(f'rank_p{p}' for p in percentiles)):
+        values = result.setdefault(row['developer_id'], {})
+        for p in percentiles:
+            if row['position'] == row[f'rank_p{p}']:
+                values[f'p{p}'] = row['duration']
+    return result
+
+
+def daily_histogram(queryset, start, end):
+    """
+    Tasks created and completed per day from start to end (inclusive dates, in the
+    current time zone). Both counts come from one UNION of two GROUP BY queries.
+    """
+    queryset = queryset.order_by()
+    # Datetime bounds rather than __date lookups, so the created_at indexes apply
+    since = make_aware(datetime.combine(start, time.min))
+    until = make_aware(datetime.combine(end + timedelta(days=1), time.min))
+    created = (
+        queryset.filter(created_at__gte=since, created_at__lt=until)
+        .values(day=TruncDate('created_at'))
+        .annotate(created=Count('id'), completed=Value(0))
+    )
+    completed = (
+        queryset.filter(completed_at__gte=since, completed_at__lt=until)
+        .values(day=TruncDate('completed_at'))
+        .annotate(created=Value(0), completed=Count('id'))
+    )
+
+    days = {start + timedelta(days=offset): [0, 0] for offset in range((end - start).days + 1)}
+    for row in created.union(completed, all=True):
+        days[row['day']][0] += row['created']
+        days[row['day']][1] += row['completed']
+
+    return [
+        {'date': day.isoformat(), 'created': counts[0], 'completed': counts[1]}
+        for day, counts in days.items()
+    ]
+
+
+def seconds(duration):
+    return None if duration is None else duration.total_seconds()
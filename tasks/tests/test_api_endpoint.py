@@ -4,13 +4,24 @@ from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from unittest.mock import patch, Mock, PropertyMock, MagicMock
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
 from ..models import Task
 from ..serializers import TaskSerializer, UserSerializer
+import csv
+from base64 import b64encode
+import io
 import json
 from rest_framework.response import Response
 from tasks.serializers import TaskSerializer
 from rest_framework.test import APIRequestFactory
 from tasks.permissions import IsLead, IsDeveloper
+from tasks.counters import task_counters
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
 
 User = get_user_model()
@@ -65,25 +76,25 @@ class TestCustomTokenObtainPairView(APITestCase):
             "password": "testpass123"
         }
 
-    @patch('tasks.api_views.TokenObtainPairView.post')
-    @patch('tasks.api_views.get_user_model')
-    def test_successful_login(self, mock_get_user_model, mock_token_view_post):
-        mock_response_data = {
-            'access': 'dummy_token',
-            'refresh': 'dummy_refresh'
-        }
-        mock_response = Response(data=mock_response_data, status=status.HTTP_200_OK)
-        mock_token_view_post.return_value = mock_response
+    def test_successful_login(self):
+        user = User.objects.create_user(role='developer', is_active=True, **self.user_data)
 
-        mock_user = MockUser()
-        mock_user_model = Mock()
-        mock_user_model.objects.get.return_value = mock_user
-        mock_get_user_model.return_value = mock_user_model
+        # Authenticating the user and recording the outstanding refresh token; no second user lookup
+        with self.assertNumQueries(2):
+            response = self.client.post(self.login_url, self.user_data, format='json')
 
-        response = self.client.post(self.login_url, self.user_data, format='json')
-        
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('user', response.data)
+        self.assertEqual(response.data['user'], {'id': user.id, 'username': 'testuser', 'role': 'developer'})
+
+        access = AccessToken(response.data['access'])
+        self.assertEqual(access['username'], 'testuser')
+        self.assertEqual(access['role'], 'developer')
+        self.assertEqual(RefreshToken(response.data['refresh'])['role'], 'developer')
+
+    def test_invalid_login(self):
+        response = self.client.post(self.login_url, self.user_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 class TestLogoutView(APITestCase):
     def setUp(self):
@@ -121,6 +132,7 @@ class TestLogoutView(APITestCase):
         
 class TestTaskListCreateAPIView(APITestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.tasks_url = reverse('api-task-list-create')
         self.mock_task_data = {
@@ -128,7 +140,7 @@ class TestTaskListCreateAPIView(APITestCase):
             "description": "Test Description"
         }
 
-    @patch('tasks.api_views.TaskSerializer')
+    @patch('tasks.api_views.TaskReadSerializer')
     @patch('tasks.models.Task.objects')
     def test_get_tasks_as_lead(self, mock_task_objects, mock_serializer_class):
         lead_user = MockUser(role="lead")
@@ -140,6 +152,7 @@ class TestTaskListCreateAPIView(APITestCase):
         ]
         
         mock_queryset = MagicMock()
+        mock_queryset.aggregate.return_value = {'count': len(mock_tasks), 'last_modified': None}
         mock_queryset.order_by.return_value = mock_queryset
         mock_queryset.__iter__.return_value = iter(mock_tasks)
         type(mock_queryset).count = PropertyMock(return_value=len(mock_tasks))
@@ -158,7 +171,7 @@ class TestTaskListCreateAPIView(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         mock_task_objects.all.assert_called_once()
 
-    @patch('tasks.api_views.TaskSerializer')
+    @patch('tasks.api_views.TaskReadSerializer')
     @patch('tasks.models.Task.objects')
     def test_get_tasks_as_developer(self, mock_task_objects, mock_serializer_class):
         dev_user = MockUser(role="developer")
@@ -169,6 +182,7 @@ class TestTaskListCreateAPIView(APITestCase):
         ]
         
         mock_queryset = MagicMock()
+        mock_queryset.aggregate.return_value = {'count': len(mock_tasks), 'last_modified': None}
         mock_queryset.order_by.return_value = mock_queryset
         mock_queryset.__iter__.return_value = iter(mock_tasks)
         type(mock_queryset).count = PropertyMock(return_value=len(mock_tasks))
@@ -182,7 +196,7 @@ class TestTaskListCreateAPIView(APITestCase):
         response = self.client.get(self.tasks_url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        mock_task_objects.filter.assert_called_once_with(developer=dev_user)
+        mock_task_objects.filter.assert_called_once_with(developer_id=dev_user.id)
 
 
     @patch('tasks.api_views.TaskSerializer')
@@ -215,7 +229,7 @@ class TestTaskListCreateAPIView(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(response.data, {"error": "Leads cannot create tasks"})
     
-    @patch('tasks.api_views.TaskSerializer')
+    @patch('tasks.api_views.TaskReadSerializer')
     @patch('tasks.models.Task.objects')
     def test_get_task_filter_by_status(self, mock_task_objects, mock_serializer_class):
         lead_user = MockUser(role="lead")
@@ -223,6 +237,7 @@ class TestTaskListCreateAPIView(APITestCase):
 
         mock_tasks = [Mock(id=1, title='Task 1', is_done=True)]
         mock_queryset = MagicMock()
+        mock_queryset.aggregate.return_value = {'count': len(mock_tasks), 'last_modified': None}
         mock_queryset.filter.return_value = mock_queryset
         mock_queryset.order_by.return_value = mock_queryset
         mock_queryset.__iter__.return_value = iter(mock_tasks)
@@ -238,7 +253,7 @@ class TestTaskListCreateAPIView(APITestCase):
         mock_task_objects.all.assert_called_once()
         mock_queryset.filter.assert_called_with(is_done=True)
     
-    @patch('tasks.api_views.TaskSerializer')
+    @patch('tasks.api_views.TaskReadSerializer')
     @patch('tasks.models.Task.objects')
     def test_pagination(self, mock_task_objects, mock_serializer_class):
         lead_user = MockUser(role="lead")
@@ -246,6 +261,7 @@ class TestTaskListCreateAPIView(APITestCase):
 
         mock_tasks = [Mock(id=i, title=f'Task {i}') for i in range(1, 15)]
         mock_queryset = MagicMock()
+        mock_queryset.aggregate.return_value = {'count': len(mock_tasks), 'last_modified': None}
         mock_queryset.order_by.return_value = mock_queryset
         mock_queryset.__iter__.return_value = iter(mock_tasks[:10])
         mock_task_objects.all.return_value = mock_queryset
@@ -259,7 +275,7 @@ class TestTaskListCreateAPIView(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 10)
 
-    @patch('tasks.api_views.TaskSerializer')
+    @patch('tasks.api_views.TaskReadSerializer')
     @patch('tasks.models.Task.objects')
     def test_get_task_filter_by_developer(self, mock_task_objects, mock_serializer_class):
         lead_user = MockUser(role="lead")
@@ -267,6 +283,7 @@ class TestTaskListCreateAPIView(APITestCase):
 
         mock_tasks = [Mock(id=1, title='Task 1', developer_id=5)]
         mock_queryset = MagicMock()
+        mock_queryset.aggregate.return_value = {'count': len(mock_tasks), 'last_modified': None}
         mock_queryset.filter.return_value = mock_queryset
         mock_queryset.order_by.return_value = mock_queryset
         mock_queryset.__iter__.return_value = iter(mock_tasks)
@@ -282,7 +299,7 @@ class TestTaskListCreateAPIView(APITestCase):
         mock_task_objects.all.assert_called_once()
         mock_queryset.filter.assert_called_with(developer_id='5')
 
-    @patch('tasks.api_views.TaskSerializer')
+    @patch('tasks.api_views.TaskReadSerializer')
     @patch('tasks.models.Task.objects')
     def test_get_task_filter_by_lead(self, mock_task_objects, mock_serializer_class):
         lead_user = MockUser(role="lead")
@@ -290,6 +307,7 @@ class TestTaskListCreateAPIView(APITestCase):
 
         mock_tasks = [Mock(id=1, title='Task 1')]
         mock_queryset = MagicMock()
+        mock_queryset.aggregate.return_value = {'count': len(mock_tasks), 'last_modified': None}
         mock_queryset.order_by.return_value = mock_queryset
         mock_queryset.__iter__.return_value = iter(mock_tasks)
         mock_task_objects.all.return_value = mock_queryset
@@ -312,6 +330,7 @@ class TestTaskDetailAPIView(APITestCase):
 
     @patch('tasks.models.Task.objects')
     def test_delete_task_as_lead(self, mock_task_objects):
+        mock_task_objects.select_related.return_value = mock_task_objects
         lead_user = MockUser(role="lead")
         self.client.force_authenticate(user=lead_user)
 
@@ -333,6 +352,7 @@ class TestTaskDetailAPIView(APITestCase):
     @patch('tasks.api_views.TaskSerializer')
     @patch('tasks.models.Task.objects')
     def test_update_task_as_developer(self, mock_task_objects, mock_serializer_class):
+        mock_task_objects.select_related.return_value = mock_task_objects
         dev_user = MockUser(role="developer")
         self.client.force_authenticate(user=dev_user)
 
@@ -356,6 +376,7 @@ class TestTaskDetailAPIView(APITestCase):
 
     @patch('tasks.models.Task.objects')
     def test_task_not_found(self, mock_task_objects):
+        mock_task_objects.select_related.return_value = mock_task_objects
         lead_user = MockUser(role="lead")
         self.client.force_authenticate(user=lead_user)
 
@@ -367,6 +388,7 @@ class TestTaskDetailAPIView(APITestCase):
 
     @patch('tasks.models.Task.objects')
     def test_developer_access_denied(self, mock_task_objects):
+        mock_task_objects.select_related.return_value = mock_task_objects
         dev_user = MockUser(role="developer")
         self.client.force_authenticate(user=dev_user)
 
@@ -383,6 +405,7 @@ class TestTaskDetailAPIView(APITestCase):
     
     @patch('tasks.models.Task.objects')
     def test_get_others_tasks_as_developer(self, mock_task_objects):
+        mock_task_objects.select_related.return_value = mock_task_objects
         dev_user = MockUser(role="developer")
         self.client.force_authenticate(user=dev_user)
 
@@ -396,9 +419,10 @@ class TestTaskDetailAPIView(APITestCase):
         mock_task_objects.get.assert_called_once_with(pk=self.task_id)
     
 
-    @patch('tasks.api_views.TaskSerializer')
+    @patch('tasks.api_views.TaskReadSerializer')
     @patch('tasks.models.Task.objects')
     def test_get_task_as_lead(self, mock_task_objects, mock_serializer_class):
+        mock_task_objects.select_related.return_value = mock_task_objects
         lead_user = MockUser(role="lead")
         self.client.force_authenticate(user=lead_user)
 
@@ -408,6 +432,7 @@ class TestTaskDetailAPIView(APITestCase):
         mock_task.title = "Task for Lead"
         mock_task.description = "Test description"
         mock_task.status = "open"
+        mock_task.updated_at = timezone.now()
         mock_task_objects.get.return_value = mock_task
 
         # Setup serializer mock
@@ -419,6 +444,7 @@ class TestTaskDetailAPIView(APITestCase):
             'status': "open"
         }
         mock_serializer_class.return_value = mock_serializer
+        mock_serializer_class.select_fields.return_value = None
 
         response = self.client.get(self.task_url)
 
@@ -433,6 +459,7 @@ class TestTaskDetailAPIView(APITestCase):
     @patch('tasks.api_views.TaskSerializer')
     @patch('tasks.models.Task.objects')
     def test_update_others_task_as_developer(self, mock_task_objects, mock_serializer_class):
+        mock_task_objects.select_related.return_value = mock_task_objects
         dev_user = MockUser(role="developer")
         self.client.force_authenticate(user=dev_user)
 
@@ -448,6 +475,7 @@ class TestTaskDetailAPIView(APITestCase):
 
     @patch('tasks.models.Task.objects')
     def test_update_task_as_lead_forbidden(self, mock_task_objects):
+        mock_task_objects.select_related.return_value = mock_task_objects
         lead_user = MockUser(role="lead")
         self.client.force_authenticate(user=lead_user)
 
@@ -462,6 +490,7 @@ class TestTaskDetailAPIView(APITestCase):
 
     @patch('tasks.models.Task.objects')
     def test_delete_own_task_as_developer(self, mock_task_objects):
+        mock_task_objects.select_related.return_value = mock_task_objects
         dev_user = MockUser(role="developer")
         self.client.force_authenticate(user=dev_user)
 
@@ -476,6 +505,7 @@ class TestTaskDetailAPIView(APITestCase):
 
     @patch('tasks.models.Task.objects')
     def test_delete_other_task_as_developer(self, mock_task_objects):
+        mock_task_objects.select_related.return_value = mock_task_objects
         dev_user = MockUser(role="developer")
         self.client.force_authenticate(user=dev_user)
 
@@ -490,6 +520,7 @@ class TestTaskDetailAPIView(APITestCase):
 
     @patch('tasks.models.Task.objects')
     def test_delete_task_as_lead_forbidden(self, mock_task_objects):
+        mock_task_objects.select_related.return_value = mock_task_objects
         lead_user = MockUser(role="lead")
         self.client.force_authenticate(user=lead_user)
 
@@ -504,6 +535,43 @@ class TestTaskDetailAPIView(APITestCase):
 
 
 
+class TestDeveloperDirectory(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('api-developer-directory')
+        User = get_user_model()
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead')
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer')
+        self.client.force_authenticate(user=self.lead)
+
+    def test_lists_developers_with_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{'id': self.dev.id, 'username': 'dev'}])
+
+        # Served from the cache, and not at all when the client has the current list
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).data, response.data)
+            cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_user_changes_replace_the_directory(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.dev.last_login = timezone.now()
+        self.dev.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get(self.url)['ETag'], etag)
+
+        get_user_model().objects.create_user(username='another', password='testpass123', role='developer')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user['username'] for user in response.data], ['another', 'dev'])
+
+        self.dev.role = 'lead'
+        self.dev.save()
+        self.assertEqual([user['username'] for user in self.client.get(self.url).data], ['another'])
+
+
 class TestUserListAPIView(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -533,7 +601,7 @@ class TestUserListAPIView(TestCase):
 
         mock_users = [mock_user1, mock_user2]
 
-        mock_user_objects.all.return_value = mock_users  
+        mock_user_objects.only.return_value.order_by.return_value = mock_users
 
         mock_serializer = Mock()
         mock_serializer.data = [
@@ -547,7 +615,8 @@ class TestUserListAPIView(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)
 
-        mock_user_objects.all.assert_called_once()
+        mock_user_objects.only.assert_called_once_with('id', 'username', 'role')
+        mock_user_objects.only.return_value.order_by.assert_called_once_with('username', 'id')
         mock_serializer_class.assert_called_once_with(mock_users, many=True)
 
     @patch('tasks.api_views.UserSerializer')
@@ -559,7 +628,8 @@ class TestUserListAPIView(TestCase):
         mock_user = Mock(id=1, username='user1', role='developer')
         mock_users = [mock_user]
         
-        mock_user_objects.filter.return_value = mock_users
+        users = mock_user_objects.only.return_value.order_by.return_value
+        users.filter.return_value = mock_users
 
         mock_serializer = Mock()
         mock_serializer.data = [
@@ -572,7 +642,7 @@ class TestUserListAPIView(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
         
-        mock_user_objects.filter.assert_called_once_with(role='developer')
+        users.filter.assert_called_once_with(role='developer')
         mock_serializer_class.assert_called_once_with(mock_users, many=True)
 
 
@@ -583,7 +653,8 @@ class TestUserListAPIView(TestCase):
         self.client.force_authenticate(user=self.user)
 
         mock_users = []
-        mock_user_objects.filter.return_value = mock_users  # No users found
+        users = mock_user_objects.only.return_value.order_by.return_value
+        users.filter.return_value = mock_users  # No users found
 
         mock_serializer = Mock()
         mock_serializer.data = []
@@ -594,10 +665,31 @@ class TestUserListAPIView(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 0)
 
-        mock_user_objects.filter.assert_called_once_with(role='nonexistent')
+        users.filter.assert_called_once_with(role='nonexistent')
         mock_serializer_class.assert_called_once_with(mock_users, many=True)
 
 
+    def test_get_users_paginated(self):
+        User = get_user_model()
+        for name in ['carol', 'alice', 'bob']:
+            User.objects.create_user(username=name, password='testpass123', role='developer')
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(f"{self.users_url}?role=developer&page_size=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual([user['username'] for user in response.data['results']], ['alice', 'bob'])
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(f"{self.users_url}?role=developer&page_size=2&page=2")
+        self.assertEqual([user['username'] for user in response.data['results']], ['carol', 'testuser'])
+
+    def test_get_users_reads_only_serialized_columns(self):
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.users_url)
+        self.assertEqual(response.data, [{'id': self.user.id, 'username': 'testuser', 'role': 'developer'}])
+        self.assertNotIn('password', queries.captured_queries[-1]['sql'])
 
     def test_get_users_invalid_method(self):
         """Test that only GET method is allowed"""
@@ -613,3 +705,724 @@ class TestUserListAPIView(TestCase):
         self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
+
+
+class TestTaskCursorPagination(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.tasks_url = reverse('api-task-list-create')
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead')
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer')
+        self.other_dev = User.objects.create_user(username='other', password='testpass123', role='developer')
+        for i in range(25):
+            Task.objects.create(title=f'Task {i}', developer=self.dev, is_done=i % 2 == 0)
+        for i in range(5):
+            Task.objects.create(title=f'Other {i}', developer=self.other_dev)
+
+    def collect_pages(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(task['id'] for task in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_cursor_walks_all_tasks_as_lead(self):
+        self.client.force_authenticate(user=self.lead)
+        ids = self.collect_pages(f'{self.tasks_url}?cursor=')
+        expected = list(Task.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_cursor_respects_developer_scope(self):
+        self.client.force_authenticate(user=self.dev)
+        ids = self.collect_pages(f'{self.tasks_url}?cursor=&page_size=7')
+        self.assertEqual(len(ids), 25)
+        self.assertFalse(Task.objects.filter(id__in=ids).exclude(developer=self.dev).exists())
+
+    def test_cursor_keeps_filters(self):
+        self.client.force_authenticate(user=self.lead)
+        ids = self.collect_pages(f'{self.tasks_url}?cursor=&developer={self.dev.id}&is_done=true')
+        expected = list(
+            Task.objects.filter(developer=self.dev, is_done=True)
+            .order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_cursor_previous_link(self):
+        self.client.force_authenticate(user=self.lead)
+        first = self.client.get(f'{self.tasks_url}?cursor=')
+        self.assertIsNone(first.data['previous'])
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [task['id'] for task in back.data['results']],
+            [task['id'] for task in first.data['results']]
+        )
+        self.assertIsNone(back.data['previous'])
+
+    def test_invalid_cursor(self):
+        self.client.force_authenticate(user=self.lead)
+        response = self.client.get(f'{self.tasks_url}?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_naive_cursor_is_rejected(self):
+        self.client.force_authenticate(user=self.lead)
+        cursor = b64encode(b'2024-01-01T00:00:00|1|0').decode('ascii')
+        for url in (self.tasks_url, reverse('api-async-task-list')):
+            response = self.client.get(url, {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestTaskQueryCount(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.tasks_url = reverse('api-task-list-create')
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead')
+        self.devs = [
+            User.objects.create_user(username=f'dev{i}', password='testpass123', role='developer')
+            for i in range(3)
+        ]
+
+    def create_tasks(self, count):
+        for i in range(count):
+            Task.objects.create(title=f'Task {i}', developer=self.devs[i % len(self.devs)])
+
+    def test_list_query_count_independent_of_page_size(self):
+        self.client.force_authenticate(user=self.lead)
+        self.create_tasks(30)
+
+        # One COUNT(*) and one SELECT joined to the developer
+        with self.assertNumQueries(2):
+            small = self.client.get(f'{self.tasks_url}?page_size=2')
+        with self.assertNumQueries(2):
+            large = self.client.get(f'{self.tasks_url}?page_size=30')
+
+        self.assertEqual(len(small.data['results']), 2)
+        self.assertEqual(len(large.data['results']), 30)
+        self.assertEqual(large.data['results'][0]['developer_username'], 'dev2')
+
+    def test_cursor_list_query_count(self):
+        self.client.force_authenticate(user=self.lead)
+        self.create_tasks(30)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f'{self.tasks_url}?cursor=&page_size=30')
+        self.assertEqual(len(response.data['results']), 30)
+
+    def test_detail_is_single_query(self):
+        self.client.force_authenticate(user=self.devs[0])
+        self.create_tasks(1)
+        task = Task.objects.get()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('api-task-detail', args=[task.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['developer_username'], 'dev0')
+
+
+
+class TestSparseFieldsets(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.tasks_url = reverse('api-task-list-create')
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead')
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer')
+        self.other = User.objects.create_user(username='other', password='testpass123', role='developer')
+        for i in range(3):
+            Task.objects.create(title=f'Task {i}', description='Long text', developer=self.dev)
+        self.task = Task.objects.create(title='Other task', developer=self.other)
+
+    def test_fields_select_keys_and_columns(self):
+        self.client.force_authenticate(user=self.lead)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{self.tasks_url}?fields=id,title,is_done')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data['results'][0]), ['id', 'title', 'is_done'])
+        select = queries.captured_queries[-1]['sql']
+        self.assertNotIn('JOIN', select)
+        self.assertNotIn('description', select)
+
+    def test_exclude_drops_fields(self):
+        self.client.force_authenticate(user=self.dev)
+
+        response = self.client.get(f'{self.tasks_url}?exclude=description,developer_username')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            list(response.data['results'][0]),
+            ['id', 'created_at', 'updated_at', 'completed_at', 'title', 'is_done', 'developer'],
+        )
+
+    def test_fields_on_cursor_pages(self):
+        self.client.force_authenticate(user=self.lead)
+
+        response = self.client.get(f'{self.tasks_url}?cursor=&page_size=2&fields=title,developer_username')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0], {'developer_username': 'other', 'title': 'Other task'})
+        following = self.client.get(response.data['next'])
+        self.assertEqual([task['title'] for task in following.data['results']], ['Task 1', 'Task 0'])
+
+    def test_unknown_or_empty_fieldset(self):
+        self.client.force_authenticate(user=self.lead)
+
+        response = self.client.get(f'{self.tasks_url}?fields=title,secret')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'error': 'Unknown task fields: secret'})
+
+        response = self.client.get(f'{self.tasks_url}?fields=title&exclude=title')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_blank_names_are_skipped(self):
+        self.client.force_authenticate(user=self.lead)
+
+        for query in ['?fields=id,', '?fields=id,,title', '?fields=id&exclude=,']:
+            with self.subTest(query=query):
+                response = self.client.get(f'{self.tasks_url}{query}')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertIn('id', response.data['results'][0])
+
+    def test_detail_fields(self):
+        self.client.force_authenticate(user=self.other)
+        url = reverse('api-task-detail', args=[self.task.id])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{url}?fields=title,updated_at')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data), ['updated_at', 'title'])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('JOIN', queries[0]['sql'])
+        self.assertNotIn('description', queries[0]['sql'])
+
+        response = self.client.get(f'{url}?fields=developer_username')
+        self.assertEqual(response.data, {'developer_username': 'other'})
+
+    def test_detail_fields_keep_ownership_check(self):
+        self.client.force_authenticate(user=self.dev)
+
+        response = self.client.get(reverse('api-task-detail', args=[self.task.id]) + '?fields=title')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestTaskBulkAPIView(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.bulk_url = reverse('api-task-bulk')
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead')
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer')
+        self.other_dev = User.objects.create_user(username='other', password='testpass123', role='developer')
+
+    def test_bulk_create(self):
+        self.client.force_authenticate(user=self.dev)
+        items = [{'title': f'Task {i}', 'is_done': i == 0} for i in range(3)] + [{'description': 'no title'}]
+
+        response = self.client.post(self.bulk_url, items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data['results']
+        self.assertEqual([r['status'] for r in results], [201, 201, 201, 400])
+        self.assertIn('title', results[3]['errors'])
+        self.assertEqual(results[0]['data']['developer_username'], 'dev')
+        self.assertIsNotNone(results[0]['data']['completed_at'])
+        self.assertIsNone(results[1]['data']['completed_at'])
+        self.assertEqual(Task.objects.filter(developer=self.dev).count(), 3)
+
+    def test_bulk_create_query_count_independent_of_batch_size(self):
+        Task.objects.create(title='Existing', developer=self.dev)
+        self.client.force_authenticate(user=self.dev)
+        # INSERT and re-read, one UPDATE per counter row (developer and overall),
+        # plus the savepoint pair of the atomic block
+        with self.assertNumQueries(6):
+            self.client.post(self.bulk_url, [{'title': f'Task {i}'} for i in range(50)], format='json')
+        self.assertEqual(Task.objects.count(), 51)
+
+    def test_bulk_update(self):
+        self.client.force_authenticate(user=self.dev)
+        own = [Task.objects.create(title=f'Own {i}', developer=self.dev) for i in range(2)]
+        other = Task.objects.create(title='Other', developer=self.other_dev)
+        items = [
+            {'id': own[0].id, 'is_done': True},
+            {'id': own[1].id, 'title': 'Renamed'},
+            {'id': other.id, 'is_done': True},
+            {'id': 999999, 'is_done': True},
+            {'id': own[0].id, 'is_done': False},
+            {'title': 'missing id'},
+        ]
+
+        response = self.client.patch(self.bulk_url, items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r['status'] for r in response.data['results']], [200, 200, 403, 404, 400, 400])
+        own[0].refresh_from_db()
+        own[1].refresh_from_db()
+        other.refresh_from_db()
+        self.assertTrue(own[0].is_done)
+        self.assertIsNotNone(own[0].completed_at)
+        self.assertEqual(own[1].title, 'Renamed')
+        self.assertFalse(other.is_done)
+
+    def test_bulk_writes_read_rows_locked_in_their_transaction(self):
+        self.client.force_authenticate(user=self.dev)
+        task = Task.objects.create(title='Own', developer=self.dev)
+
+        for method, data in (('patch', [{'id': task.id, 'title': 'Renamed'}]), ('delete', [task.id])):
+            with self.subTest(method=method), CaptureQueriesContext(connection) as queries:
+                getattr(self.client, method)(self.bulk_url, data, format='json')
+
+                statements = [query['sql'] for query in queries]
+                read = next(i for i, sql in enumerate(statements) if sql.startswith('SELECT') and 'tasks_task' in sql)
+                # The savepoint of the atomic block comes first
+                self.assertTrue(any(sql.startswith('SAVEPOINT') for sql in statements[:read]))
+                if connection.features.has_select_for_update:
+                    self.assertIn('FOR UPDATE', statements[read])
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+
+    def test_bulk_update_clears_completed_at(self):
+        self.client.force_authenticate(user=self.dev)
+        task = Task.objects.create(title='Done', developer=self.dev, is_done=True)
+
+        self.client.patch(self.bulk_url, [{'id': task.id, 'is_done': False}], format='json')
+
+        task.refresh_from_db()
+        self.assertIsNone(task.completed_at)
+
+    def test_bulk_delete(self):
+        self.client.force_authenticate(user=self.dev)
+        own = Task.objects.create(title='Own', developer=self.dev)
+        other = Task.objects.create(title='Other', developer=self.other_dev)
+
+        response = self.client.delete(self.bulk_url, [own.id, {'id': other.id}, 999999], format='json')
+
+        self.assertEqual([r['status'] for r in response.data['results']], [204, 403, 404])
+        self.assertFalse(Task.objects.filter(pk=own.pk).exists())
+        self.assertTrue(Task.objects.filter(pk=other.pk).exists())
+
+    def test_lead_cannot_write(self):
+        self.client.force_authenticate(user=self.lead)
+        task = Task.objects.create(title='Task', developer=self.dev)
+
+        create = self.client.post(self.bulk_url, [{'title': 'Task'}], format='json')
+        update = self.client.patch(self.bulk_url, [{'id': task.id, 'is_done': True}], format='json')
+        delete = self.client.delete(self.bulk_url, [task.id], format='json')
+
+        self.assertEqual(create.data, {"error": "Leads cannot create tasks"})
+        self.assertEqual(update.data, {"error": "Leads cannot update tasks"})
+        self.assertEqual(delete.data, {"error": "Leads cannot delete tasks"})
+        for response in (create, update, delete):
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_rejects_non_list_and_oversized_batches(self):
+        self.client.force_authenticate(user=self.dev)
+        response = self.client.post(self.bulk_url, {'title': 'Task'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        items = [{'title': 'Task'}] * 501
+        response = self.client.post(self.bulk_url, items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestTaskPatchAndToggle(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead')
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer')
+        self.other_dev = User.objects.create_user(username='other', password='testpass123', role='developer')
+        self.task = Task.objects.create(title='Task', description='Keep me', developer=self.dev)
+
+    def toggle_url(self, task):
+        return reverse('api-task-toggle', args=[task.id])
+
+    def test_patch_updates_only_given_fields(self):
+        self.client.force_authenticate(user=self.dev)
+        response = self.client.patch(reverse('api-task-detail', args=[self.task.id]), {'is_done': True}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.task.refresh_from_db()
+        self.assertTrue(self.task.is_done)
+        self.assertIsNotNone(self.task.completed_at)
+        self.assertEqual(self.task.description, 'Keep me')
+
+    def test_patch_others_task_forbidden(self):
+        self.client.force_authenticate(user=self.other_dev)
+        response = self.client.patch(reverse('api-task-detail', args=[self.task.id]), {'is_done': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_toggle_sets_status_with_single_update(self):
+        self.client.force_authenticate(user=self.dev)
+        # UPDATE and reading the row back for the response, the two counter rows,
+        # plus the savepoint pair of the atomic block
+        with self.assertNumQueries(6):
+            response = self.client.post(self.toggle_url(self.task), {'is_done': True}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['is_done'])
+        self.assertIsNotNone(response.data['completed_at'])
+        self.task.refresh_from_db()
+        self.assertTrue(self.task.is_done)
+        completed_at = self.task.completed_at
+
+        # Setting the same value again keeps the original completion time
+        self.client.post(self.toggle_url(self.task), {'is_done': True}, format='json')
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.completed_at, completed_at)
+
+    def test_toggle_without_value_flips_status(self):
+        self.client.force_authenticate(user=self.dev)
+        self.client.post(self.toggle_url(self.task))
+        self.task.refresh_from_db()
+        self.assertTrue(self.task.is_done)
+        self.assertIsNotNone(self.task.completed_at)
+
+        self.client.post(self.toggle_url(self.task))
+        self.task.refresh_from_db()
+        self.assertFalse(self.task.is_done)
+        self.assertIsNone(self.task.completed_at)
+
+    def test_toggle_permissions(self):
+        self.client.force_authenticate(user=self.lead)
+        self.assertEqual(self.client.post(self.toggle_url(self.task)).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.other_dev)
+        self.assertEqual(self.client.post(self.toggle_url(self.task)).status_code, status.HTTP_403_FORBIDDEN)
+
+        missing = self.client.post(reverse('api-task-toggle', args=[999999]))
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.task.refresh_from_db()
+        self.assertFalse(self.task.is_done)
+
+    def test_toggle_rejects_non_boolean(self):
+        self.client.force_authenticate(user=self.dev)
+        response = self.client.post(self.toggle_url(self.task), {'is_done': 'yes'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(TASK_LIST_CACHE={'ENABLED': False})
+class TestTaskConditionalGet(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tasks_url = reverse('api-task-list-create')
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead')
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer')
+        self.task = Task.objects.create(title='Task', developer=self.dev)
+        self.client.force_authenticate(user=self.lead)
+
+    def test_detail_etag_and_last_modified(self):
+        url = reverse('api-task-detail', args=[self.task.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached['ETag'], response['ETag'])
+        self.assertEqual(cached.content, b'')
+
+        self.task.title = 'Changed'
+        self.task.save()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+    def test_detail_if_modified_since(self):
+        url = reverse('api-task-detail', args=[self.task.id])
+        response = self.client.get(url)
+        cached = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_etag_changes_with_scope_contents(self):
+        response = self.client.get(self.tasks_url)
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.tasks_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Different filters are different representations
+        filtered = self.client.get(f'{self.tasks_url}?is_done=true', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(filtered.status_code, status.HTTP_200_OK)
+
+        Task.objects.create(title='New', developer=self.dev)
+        self.assertEqual(self.client.get(self.tasks_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+        etag = self.client.get(self.tasks_url)['ETag']
+        self.task.delete()
+        self.assertEqual(self.client.get(self.tasks_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_cursor_list_etag(self):
+        url = f'{self.tasks_url}?cursor='
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.task.is_done = True
+        self.task.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+
+class TestTaskSearch(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.tasks_url = reverse('api-task-list-create')
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead')
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer')
+        self.other_dev = User.objects.create_user(username='other', password='testpass123', role='developer')
+        self.login = Task.objects.create(title='Fix login page', description='Session cookie expires', developer=self.dev)
+        self.docs = Task.objects.create(title='Write docs', description='Explain the login flow', developer=self.dev, is_done=True)
+        self.other = Task.objects.create(title='Login rate limit', developer=self.other_dev)
+        Task.objects.create(title='Unrelated', description=None, developer=self.dev)
+
+    def search(self, user, query):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(self.tasks_url + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {task['id'] for task in response.data['results']}
+
+    def test_matches_title_and_description(self):
+        self.assertEqual(self.search(self.lead, '?q=login'), {self.login.id, self.docs.id, self.other.id})
+        self.assertEqual(self.search(self.lead, '?q=cookie'), {self.login.id})
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.search(self.lead, '?q=login page'), {self.login.id})
+
+    def test_respects_developer_scope(self):
+        self.assertEqual(self.search(self.dev, '?q=login'), {self.login.id, self.docs.id})
+        self.assertEqual(self.search(self.lead, f'?q=login&developer={self.other_dev.id}'), {self.other.id})
+
+    def test_combines_with_status_filter(self):
+        self.assertEqual(self.search(self.dev, '?q=login&is_done=true'), {self.docs.id})
+
+    def test_works_with_cursor_pagination(self):
+        self.assertEqual(self.search(self.lead, '?q=login&cursor=&page_size=2'), {self.other.id, self.docs.id})
+
+    def test_index_follows_updates_and_deletes(self):
+        self.docs.title = 'Write guide'
+        self.docs.description = 'Explain onboarding'
+        self.docs.save()
+        self.login.delete()
+        self.assertEqual(self.search(self.dev, '?q=login'), set())
+        self.assertEqual(self.search(self.dev, '?q=onboarding'), {self.docs.id})
+
+    def test_blank_query_is_ignored(self):
+        self.assertEqual(len(self.search(self.dev, '?q=%20')), 3)
+
+
+class TestTaskStats(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.stats_url = reverse('api-task-stats')
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead')
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer')
+        self.other_dev = User.objects.create_user(username='other', password='testpass123', role='developer')
+        self.today = timezone.localdate()
+        # dev completed tasks in 1..10 hours; one open task created yesterday
+        for hours in range(1, 11):
+            self.create_task(self.dev, created_days_ago=2, completed_hours=hours)
+        self.create_task(self.dev, created_days_ago=1)
+        self.create_task(self.other_dev, created_days_ago=0, completed_hours=0.5)
+
+    def create_task(self, developer, created_days_ago, completed_hours=None):
+        task = Task.objects.create(title='Task', developer=developer)
+        created_at = timezone.localtime().replace(hour=0, minute=30) - timezone.timedelta(days=created_days_ago)
+        completed_at = created_at + timezone.timedelta(hours=completed_hours) if completed_hours is not None else None
+        Task.objects.filter(pk=task.pk).update(
+            created_at=created_at, completed_at=completed_at, is_done=completed_at is not None
+        )
+
+    def get_stats(self, user, query=''):
+        self.client.force_authenticate(user=user)
+        return self.client.get(self.stats_url + query)
+
+    def test_developer_totals_and_percentiles(self):
+        response = self.get_stats(self.lead)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        developers = {row['developer_username']: row for row in response.data['developers']}
+        self.assertEqual(
+            (developers['dev']['total'], developers['dev']['done'], developers['dev']['open']), (11, 10, 1)
+        )
+        # Nearest rank over 1..10 hours
+        self.assertEqual(developers['dev']['completion_seconds'], {'p50': 5 * 3600, 'p90': 9 * 3600, 'p95': 10 * 3600})
+        self.assertEqual(developers['other']['completion_seconds']['p50'], 1800)
+
+    def test_daily_histogram(self):
+        response = self.get_stats(self.lead, f'?start={self.today - timezone.timedelta(days=2)}&end={self.today}')
+        days = [(day['created'], day['completed']) for day in response.data['daily']['days']]
+        # Tasks start at 00:30, so each one finishes on the day it was created
+        self.assertEqual(days, [(10, 10), (1, 0), (1, 1)])
+
+    def test_developer_sees_own_stats_only(self):
+        response = self.get_stats(self.other_dev)
+        self.assertEqual([row['developer_username'] for row in response.data['developers']], ['other'])
+        self.assertEqual(sum(day['created'] for day in response.data['daily']['days']), 1)
+
+    def test_lead_filters(self):
+        response = self.get_stats(self.lead, f'?developer={self.dev.id}&is_done=false')
+        self.assertEqual(
+            [(row['developer_username'], row['total'], row['completion_seconds']['p50']) for row in response.data['developers']],
+            [('dev', 1, None)],
+        )
+
+    def test_defaults_to_last_30_days(self):
+        daily = self.get_stats(self.lead).data['daily']
+        self.assertEqual((daily['end'], len(daily['days'])), (self.today.isoformat(), 30))
+
+    def test_invalid_date_range(self):
+        for query in ('?start=yesterday', '?start=2024-02-30', '?start=2024-02-01&end=2024-01-01', '?start=2020-01-01&end=2024-01-01'):
+            self.assertEqual(self.get_stats(self.lead, query).status_code, status.HTTP_400_BAD_REQUEST, query)
+
+    def test_query_count(self):
+        self.client.force_authenticate(user=self.lead)
+        # Totals with the percentiles on PostgreSQL, plus one percentile query
+        # elsewhere, and the histogram
+        with self.assertNumQueries(2 if connection.vendor == 'postgresql' else 3):
+            self.client.get(self.stats_url)
+
+
+class TestTaskExport(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.export_url = reverse('api-task-export')
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead')
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer')
+        self.other_dev = User.objects.create_user(username='other', password='testpass123', role='developer')
+        Task.objects.bulk_create(
+            Task(title=f'Task {i}', description='Line one\nLine "two"', developer=self.dev, is_done=i % 2 == 0)
+            for i in range(150)
+        )
+        # bulk_create bypasses the counters the list view pages with
+        task_counters.reconcile()
+        Task.objects.create(title='Other', developer=self.other_dev)
+
+    def export(self, user, query='', **kwargs):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(self.export_url + query, **kwargs)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_exports_every_row(self):
+        response, content = self.export(self.lead, '?format=csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="tasks.csv"')
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 151)
+        self.assertEqual(rows[0]['title'], 'Other')
+        self.assertEqual(rows[1]['description'], 'Line one\nLine "two"')
+        self.assertEqual({row['is_done'] for row in rows}, {'true', 'false'})
+        self.assertEqual(rows[0]['completed_at'], '')
+
+    def test_csv_escapes_formulas(self):
+        for i, title in enumerate(['=HYPERLINK("http://x")', '+1', '-1', '@SUM(A1)', '\tTab', '\rCR']):
+            Task.objects.create(title=title, description='=1+1' if i == 0 else 'Plain', developer=self.other_dev)
+        _, content = self.export(self.other_dev, '?format=csv')
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(
+            sorted(row['title'] for row in rows),
+            sorted(["'=HYPERLINK(\"http://x\")", "'+1", "'-1", "'@SUM(A1)", "'\tTab", "'\rCR", 'Other']),
+        )
+        self.assertIn("'=1+1", [row['description'] for row in rows])
+        # Timestamps are left alone
+        self.assertTrue(all(not row['created_at'].startswith("'") for row in rows))
+
+    def test_ndjson_matches_list_representation(self):
+        _, content = self.export(self.dev, '?format=ndjson&is_done=true')
+        items = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(items), 75)
+        self.client.force_authenticate(user=self.dev)
+        first = self.client.get(reverse('api-task-list-create'), {'is_done': 'true'}).data['results'][0]
+        self.assertEqual(items[0], first)
+
+    def test_format_from_accept_header(self):
+        response, content = self.export(self.other_dev, HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual(json.loads(content)['title'], 'Other')
+
+    def test_streams_in_chunks_from_one_query(self):
+        self.client.force_authenticate(user=self.lead)
+        with patch('tasks.api_views.TaskExportAPIView.chunk_size', 40):
+            response = self.client.get(self.export_url + '?format=ndjson')
+            with self.assertNumQueries(1):
+                chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 4)
+
+    def test_errors_are_json(self):
+        response = self.client.get(self.export_url + '?format=csv')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        self.client.force_authenticate(user=self.lead)
+        response = self.client.get(self.export_url + '?format=xml')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+
+class TestTaskImport(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.import_url = reverse('api-task-import')
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead')
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer')
+
+    def test_csv_body(self):
+        self.client.force_authenticate(user=self.dev)
+        body = (
+            'title,description,is_done,developer\n'
+            'First,"Two\nlines",true,lead\n'
+            ',missing title,false,\n'
+            'Second,,,\n'
+            'Third,,maybe,\n'
+        )
+        response = self.client.post(self.import_url, body, content_type='text/csv')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['rows'], response.data['created'], response.data['error_count']), (4, 2, 2))
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 4])
+        self.assertIn('title', response.data['errors'][0]['errors'])
+        self.assertIsNotNone(response.data['rows_per_second'])
+
+        # Imported tasks belong to the uploader; completed_at follows is_done
+        first = Task.objects.get(title='First')
+        self.assertEqual((first.developer, first.description, first.is_done), (self.dev, 'Two\nlines', True))
+        self.assertIsNotNone(first.completed_at)
+        self.assertIsNone(Task.objects.get(title='Second').completed_at)
+        self.assertEqual(task_counters.reconcile(dry_run=True), [])
+        self.assertEqual(self.client.get(reverse('api-task-list-create')).data['count'], 2)
+
+    def test_ndjson_file_upload_in_batches(self):
+        self.client.force_authenticate(user=self.dev)
+        lines = [json.dumps({'title': f'Task {i}', 'is_done': i % 2 == 0}) for i in range(25)]
+        upload = SimpleUploadedFile('tasks.ndjson', '\n'.join(lines + ['not json', '[1]']).encode())
+        Task.objects.create(title='Existing', developer=self.dev)
+        # 27 rows in 3 batches, each one INSERT, two counter UPDATEs and a savepoint pair
+        with self.assertNumQueries(3 * 5):
+            response = self.client.post(self.import_url + '?batch_size=10', {'file': upload}, format='multipart')
+        self.assertEqual((response.data['created'], response.data['error_count']), (25, 2))
+        self.assertEqual([error['row'] for error in response.data['errors']], [26, 27])
+        self.assertEqual(Task.objects.filter(developer=self.dev).count(), 26)
+
+    def test_rejects_leads_and_unknown_formats(self):
+        self.client.force_authenticate(user=self.lead)
+        response = self.client.post(self.import_url, 'title\nTask\n', content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.dev)
+        response = self.client.post(self.import_url, {'title': 'Task'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        self.assertEqual(Task.objects.count(), 0)
@@ -0,0 +1,98 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks.authentication import user_cache
+from tasks.models import Task, User
+
+
+class AsyncTaskViewsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead', is_active=True)
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer', is_active=True)
+        self.other = User.objects.create_user(username='other', password='testpass123', role='developer', is_active=True)
+        for i in range(15):
+            Task.objects.create(title=f'Task {i}', developer=self.dev, is_done=i % 3 == 0)
+        self.other_task = Task.objects.create(title='Other', developer=self.other)
+
+    def headers(self, user):
+        return {'authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    async def assertSameResponse(self, user, sync_url, async_url):
+        sync_response = await self.async_client.get(sync_url, headers=self.headers(user))
+        cache.clear()
+        async_response = await self.async_client.get(async_url, headers=self.headers(user))
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        # Pagination links point back at the endpoint that served them
+        self.assertEqual(async_response.content.replace(b'/api/async/', b'/api/'), sync_response.content)
+        return async_response
+
+    async def test_task_list_matches_sync_view(self):
+        sync_url, async_url = reverse('api-task-list-create'), reverse('api-async-task-list')
+        for user, query in [
+            (self.dev, ''),
+            (self.dev, '?page=2&page_size=5'),
+            (self.dev, '?is_done=true'),
+            (self.lead, f'?developer={self.other.id}'),
+            (self.lead, '?cursor=&page_size=4'),
+            (self.dev, '?page=9'),
+            (self.lead, '?cursor=&fields=id,title,developer_username'),
+            (self.dev, '?exclude=description'),
+            (self.dev, '?fields=nope'),
+        ]:
+            with self.subTest(user=user.username, query=query):
+                await self.assertSameResponse(user, sync_url + query, async_url + query)
+
+    async def test_task_list_conditional_get(self):
+        url = reverse('api-async-task-list')
+        response = await self.async_client.get(url, headers=self.headers(self.dev))
+        headers = {**self.headers(self.dev), 'if-none-match': response['ETag']}
+        response = await self.async_client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 304)
+
+    async def test_task_detail_permissions(self):
+        own = await Task.objects.filter(developer=self.dev).afirst()
+        for user, task in [(self.dev, own), (self.dev, self.other_task), (self.lead, self.other_task)]:
+            with self.subTest(user=user.username, task=task.id):
+                await self.assertSameResponse(
+                    user,
+                    reverse('api-task-detail', args=[task.id]),
+                    reverse('api-async-task-detail', args=[task.id]),
+                )
+        await self.assertSameResponse(
+            self.dev,
+            reverse('api-task-detail', args=[own.id]) + '?fields=title,is_done',
+            reverse('api-async-task-detail', args=[own.id]) + '?fields=title,is_done',
+        )
+        response = await self.async_client.get(reverse('api-async-task-detail', args=[0]), headers=self.headers(self.dev))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_user_list_matches_sync_view(self):
+        for query in ['', '?role=developer', '?page_size=2&page=2']:
+            with self.subTest(query=query):
+                await self.assertSameResponse(
+                    self.dev, reverse('api-user-list') + query, reverse('api-async-user-list') + query
+                )
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get(reverse('api-async-task-list'))
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(
+            reverse('api-async-task-list'), headers={'authorization': 'Bearer invalid'}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    async def test_writes_are_not_allowed(self):
+        response = await self.async_client.post(
+            reverse('api-async-task-list'), {'title': 'New'}, headers=self.headers(self.dev)
+        )
+        self.assertEqual(response.status_code, 405)
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        response = await self.async_client.get(reverse('api-task-export') + '?format=ndjson', headers=self.headers(self.dev))
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.splitlines()), 15)
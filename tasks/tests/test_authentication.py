@@ -0,0 +1,314 @@
+from unittest.mock import PropertyMock, patch
+
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from tasks.authentication import LRUCache, user_cache
+from tasks.models import Task, User
+from tasks.serializers import CustomTokenObtainPairSerializer
+from tasks.tokens import BlacklistCache, blacklist_cache
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.client = APIClient()
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer', is_active=True)
+        self.task = Task.objects.create(title='Task', developer=self.dev)
+        self.detail_url = reverse('api-task-detail', args=[self.task.id])
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.dev)}')
+
+    def test_user_is_loaded_once(self):
+        # User lookup plus the task
+        with self.assertNumQueries(2):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cached_user_passes_ownership_checks(self):
+        self.client.get(self.detail_url)
+        response = self.client.patch(self.detail_url, {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(reverse('api-task-list-create'))
+        self.assertEqual(response.data['count'], 1)
+
+    def test_deactivation_invalidates_cached_user(self):
+        self.client.get(self.detail_url)
+        self.dev.is_active = False
+        self.dev.save()
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_change_reaches_other_workers(self):
+        self.client.get(self.detail_url)
+        stale = user_cache.get(self.dev.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dev.is_active = False
+            self.dev.save()
+        # The entry another worker still holds
+        user_cache.set(self.dev.id, stale)
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_keeps_cached_user(self):
+        self.client.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            update_last_login(None, self.dev)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_200_OK)
+
+    def test_role_change_invalidates_cached_user(self):
+        self.client.get(self.detail_url)
+        self.dev.role = 'lead'
+        self.dev.save()
+
+        response = self.client.patch(self.detail_url, {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get(self.detail_url)
+        self.dev.delete()
+        response = self.client.get(reverse('api-task-list-create'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_inactive_user_is_rejected(self):
+        lead = User.objects.create_user(username='lead', password='testpass123', role='lead')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(lead)}')
+        response = self.client.get(reverse('api-task-list-create'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class LRUCacheTests(APITestCase):
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(max_size=2, timeout=60)
+        lru.set(1, 'a')
+        lru.set(2, 'b')
+        lru.get(1)
+        lru.set(3, 'c')
+        self.assertEqual(lru.get(1), 'a')
+        self.assertIsNone(lru.get(2))
+        self.assertEqual(len(lru), 2)
+
+    def test_entries_expire(self):
+        lru = LRUCache(max_size=2, timeout=-1)
+        lru.set(1, 'a')
+        self.assertIsNone(lru.get(1))
+
+
+# What JWT_STATELESS_AUTH=True configures; APIView reads the setting at import time
+@patch('rest_framework.views.APIView.authentication_classes', [JWTStatelessUserAuthentication])
+class StatelessAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead', is_active=True)
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer', is_active=True)
+        self.other_dev = User.objects.create_user(username='other', password='testpass123', role='developer', is_active=True)
+        self.task = Task.objects.create(title='Task', developer=self.dev)
+        self.unassigned = Task.objects.create(title='Unassigned')
+
+    def authenticate(self, user):
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_requests_do_not_load_the_user(self):
+        self.authenticate(self.dev)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('api-task-detail', args=[self.task.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_role_branches_use_claims(self):
+        self.authenticate(self.lead)
+        self.assertEqual(self.client.get(reverse('api-task-list-create')).data['count'], 2)
+        response = self.client.post(reverse('api-task-list-create'), {'title': 'New'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.authenticate(self.dev)
+        self.assertEqual(self.client.get(reverse('api-task-list-create')).data['count'], 1)
+        response = self.client.patch(reverse('api-task-detail', args=[self.task.id]), {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_ownership_checks_use_token_user_id(self):
+        self.authenticate(self.other_dev)
+        self.assertEqual(
+            self.client.get(reverse('api-task-detail', args=[self.task.id])).status_code,
+            status.HTTP_403_FORBIDDEN
+        )
+        self.assertEqual(
+            self.client.get(reverse('api-task-detail', args=[self.unassigned.id])).status_code,
+            status.HTTP_403_FORBIDDEN
+        )
+
+    def test_permission_classes_use_claims(self):
+        self.authenticate(self.lead)
+        self.assertEqual(self.client.get(reverse('api-task-cache-stats')).status_code, status.HTTP_200_OK)
+        self.authenticate(self.dev)
+        self.assertEqual(self.client.get(reverse('api-task-cache-stats')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_refresh_uses_current_role(self):
+        refresh = CustomTokenObtainPairSerializer.get_token(self.lead)
+        self.lead.role = 'developer'
+        self.lead.save()
+
+        response = self.client.post(reverse('api-token_refresh'), {'refresh': str(refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'])['role'], 'developer')
+        self.assertEqual(RefreshToken(response.data['refresh'])['role'], 'developer')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.client.get(reverse('api-task-cache-stats')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_refresh_rejects_inactive_user(self):
+        refresh = CustomTokenObtainPairSerializer.get_token(self.lead)
+        self.lead.is_active = False
+        self.lead.save()
+        response = self.client.post(reverse('api-token_refresh'), {'refresh': str(refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.lead.delete()
+        response = self.client.post(reverse('api-token_refresh'), {'refresh': str(refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class BlacklistCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        blacklist_cache.reset()
+        self.client = APIClient()
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer', is_active=True)
+        self.refresh_url = reverse('api-token_refresh')
+
+    def refresh(self, token):
+        return self.client.post(self.refresh_url, {'refresh': str(token)}, format='json')
+
+    def blacklist_queries(self, queries):
+        return [q['sql'] for q in queries if 'token_blacklist_blacklistedtoken' in q['sql']]
+
+    @patch.object(BlacklistCache, 'shared', new_callable=PropertyMock, return_value=True)
+    def test_refresh_skips_blacklist_query_once_warm(self, shared):
+        blacklist_cache.warm()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.refresh(RefreshToken.for_user(self.dev))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.blacklist_queries(queries.captured_queries), [])
+
+    def test_logout_blacklists_token_for_refresh(self):
+        token = RefreshToken.for_user(self.dev)
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(self.dev)
+        response = self.client.post(reverse('api-logout'), {'refresh': str(token)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @patch.object(BlacklistCache, 'shared', new_callable=PropertyMock, return_value=True)
+    def test_loads_existing_blacklist(self, shared):
+        token = RefreshToken.for_user(self.dev)
+        token.blacklist()
+        blacklist_cache.reset()
+        self.assertTrue(blacklist_cache.contains(token['jti']))
+        self.assertFalse(blacklist_cache.contains('unknown'))
+
+    @patch.object(BlacklistCache, 'shared', new_callable=PropertyMock, return_value=True)
+    def test_version_change_picks_up_other_processes(self, shared):
+        blacklist_cache.warm()
+        token = RefreshToken.for_user(self.dev)
+        # Blacklisted elsewhere: the row exists but this process never saw the signal
+        with patch.object(blacklist_cache, 'add'):
+            BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        self.assertFalse(blacklist_cache.contains(token['jti']))
+        blacklist_cache.bump()
+        self.assertTrue(blacklist_cache.contains(token['jti']))
+
+    def test_per_process_cache_checks_misses_in_database(self):
+        # LocMemCache: other workers' logouts can't bump this process's version
+        token = RefreshToken.for_user(self.dev)
+        blacklist_cache.warm()
+        with patch.object(blacklist_cache, 'add'):
+            BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+
+        self.assertIsNone(blacklist_cache.contains(token['jti']))
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        blacklist_cache.reset()
+        self.assertTrue(blacklist_cache.contains(token['jti']))
+
+    def test_reload_does_not_hold_the_lock(self):
+        blacklist_cache.warm()
+        token = RefreshToken.for_user(self.dev)
+        token.blacklist()
+        blacklist_cache.loaded_at = 0.0
+        real_filter = BlacklistedToken.objects.filter
+
+        def filter(*args, **kwargs):
+            # Another request checks while the reload query runs
+            self.assertFalse(blacklist_cache.lock.locked())
+            self.assertIsNone(blacklist_cache.contains('unknown'))
+            return real_filter(*args, **kwargs)
+
+        with patch.object(BlacklistedToken.objects, 'filter', side_effect=filter):
+            self.assertTrue(blacklist_cache.contains(token['jti']))
+        self.assertFalse(blacklist_cache.loading)
+
+    @patch.object(BlacklistCache, 'shared', new_callable=PropertyMock, return_value=True)
+    def test_sync_does_not_hold_the_lock(self, shared):
+        blacklist_cache.warm()
+        token = RefreshToken.for_user(self.dev)
+        with patch.object(blacklist_cache, 'add'):
+            BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        blacklist_cache.bump()
+        real_filter = BlacklistedToken.objects.filter
+
+        def filter(*args, **kwargs):
+            # Another request checks while the sync query runs, and can't rule the token out yet
+            self.assertFalse(blacklist_cache.lock.locked())
+            self.assertIsNone(blacklist_cache.contains('unknown'))
+            return real_filter(*args, **kwargs)
+
+        with patch.object(BlacklistedToken.objects, 'filter', side_effect=filter):
+            self.assertTrue(blacklist_cache.contains(token['jti']))
+        self.assertFalse(blacklist_cache.syncing)
+        self.assertFalse(blacklist_cache.contains('unknown'))
+
+    @patch.object(BlacklistCache, 'shared', new_callable=PropertyMock, return_value=True)
+    def test_rolled_back_blacklisting_is_not_cached(self, shared):
+        blacklist_cache.warm()
+        token = RefreshToken.for_user(self.dev)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    token.blacklist()
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+        self.assertFalse(blacklist_cache.contains(token['jti']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+        self.assertTrue(blacklist_cache.contains(token['jti']))
+
+    @override_settings(TOKEN_BLACKLIST_CACHE={'MAX_SIZE': 1})
+    def test_falls_back_to_database_when_full(self):
+        tokens = [RefreshToken.for_user(self.dev) for _ in range(2)]
+        for token in tokens:
+            token.blacklist()
+        blacklist_cache.reset()
+        self.assertIsNone(blacklist_cache.contains(tokens[0]['jti']))
+        self.assertEqual(self.refresh(tokens[0]).status_code, status.HTTP_401_UNAUTHORIZED)
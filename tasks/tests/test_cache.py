@@ -0,0 +1,175 @@
+from unittest.mock import patch
+
+from django.contrib import admin
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from tasks.admin import UserAdmin
+from tasks.cache import task_list_cache
+from tasks.models import Task, User
+
+
+class TaskListCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.tasks_url = reverse('api-task-list-create')
+        self.lead = User.objects.create_user(username='lead', password='testpass123', role='lead')
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer')
+        self.other_dev = User.objects.create_user(username='other', password='testpass123', role='developer')
+        self.task = Task.objects.create(title='Task', developer=self.dev)
+        self.other_task = Task.objects.create(title='Other', developer=self.other_dev)
+
+    def get_list(self, user, query=''):
+        self.client.force_authenticate(user=user)
+        return self.client.get(f'{self.tasks_url}{query}')
+
+    def assertCached(self, user, query=''):
+        with self.assertNumQueries(0):
+            return self.get_list(user, query)
+
+    def assertNotCached(self, user, query=''):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_list(user, query)
+        self.assertGreater(len(queries), 0)
+        return response
+
+    def test_repeated_request_is_served_from_cache(self):
+        hits = task_list_cache.hits
+        first = self.get_list(self.lead)
+        second = self.assertCached(self.lead)
+
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(task_list_cache.hits, hits + 1)
+
+    def test_cached_entry_answers_conditional_get(self):
+        etag = self.get_list(self.lead)['ETag']
+        self.client.force_authenticate(user=self.lead)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.tasks_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_filters_and_pages_are_cached_separately(self):
+        self.get_list(self.lead)
+        self.assertNotCached(self.lead, '?is_done=true')
+        self.assertNotCached(self.lead, '?page_size=1')
+
+    def test_task_change_invalidates_only_affected_scopes(self):
+        self.get_list(self.lead)
+        self.get_list(self.dev)
+        self.get_list(self.other_dev)
+
+        self.task.title = 'Changed'
+        self.task.save()
+
+        self.assertEqual(self.assertNotCached(self.lead).data['results'][1]['title'], 'Changed')
+        self.assertNotCached(self.dev)
+        self.assertCached(self.other_dev)
+
+    def test_lead_developer_filter_uses_developer_scope(self):
+        query = f'?developer={self.other_dev.id}'
+        self.get_list(self.lead, query)
+        self.task.delete()
+        self.assertCached(self.lead, query)
+
+        self.other_task.delete()
+        self.assertEqual(self.assertNotCached(self.lead, query).data['count'], 0)
+
+    def test_reassignment_invalidates_previous_developer(self):
+        self.get_list(self.dev)
+        self.task.developer = self.other_dev
+        self.task.save()
+        self.assertEqual(self.assertNotCached(self.dev).data['count'], 0)
+
+    def test_api_writes_invalidate(self):
+        self.get_list(self.dev)
+        self.client.post(self.tasks_url, {'title': 'New'}, format='json')
+        self.assertEqual(self.assertNotCached(self.dev).data['count'], 2)
+
+        self.client.post(reverse('api-task-bulk'), [{'title': 'Bulk'}], format='json')
+        self.assertEqual(self.assertNotCached(self.dev).data['count'], 3)
+
+        self.client.post(reverse('api-task-toggle', args=[self.task.id]), {'is_done': True}, format='json')
+        self.assertEqual(self.assertNotCached(self.dev, '?is_done=true').data['count'], 1)
+        self.get_list(self.dev, '?is_done=true')
+
+        self.client.patch(reverse('api-task-bulk'), [{'id': self.task.id, 'is_done': False}], format='json')
+        self.assertEqual(self.assertNotCached(self.dev, '?is_done=true').data['count'], 0)
+
+        self.client.delete(reverse('api-task-detail', args=[self.task.id]))
+        self.assertEqual(self.assertNotCached(self.dev).data['count'], 2)
+
+    def test_username_change_invalidates(self):
+        self.get_list(self.lead)
+        self.dev.username = 'renamed'
+        self.dev.save()
+        results = self.assertNotCached(self.lead).data['results']
+        self.assertIn('renamed', [task['developer_username'] for task in results])
+
+    def test_username_change_changes_list_etag(self):
+        for enabled in (True, False):
+            with self.subTest(enabled=enabled), self.settings(TASK_LIST_CACHE={'ENABLED': enabled}):
+                etag = self.get_list(self.lead)['ETag']
+                self.dev.username = f'renamed-{enabled}'
+                self.dev.save()
+                response = self.client.get(self.tasks_url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertIn(self.dev.username, [task['developer_username'] for task in response.data['results']])
+
+    def test_user_saves_that_keep_the_username_keep_the_cache(self):
+        self.get_list(self.lead)
+
+        # What a login does
+        update_last_login(None, self.dev)
+        self.dev.first_name = 'Dev'
+        self.dev.save()
+        self.dev.save(update_fields=['role'])
+
+        self.assertCached(self.lead)
+
+    def test_bulk_and_cascading_deletes_bump_each_scope_once(self):
+        for i in range(5):
+            Task.objects.create(title=f'Task {i}', developer=self.dev)
+        self.client.force_authenticate(user=self.dev)
+        ids = list(Task.objects.filter(developer=self.dev).values_list('id', flat=True))
+
+        with patch.object(task_list_cache, 'bump', wraps=task_list_cache.bump) as bump:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.delete(reverse('api-task-bulk'), ids, format='json')
+        # Once during the transaction and once after commit
+        self.assertEqual(bump.call_count, 2)
+        self.assertEqual(set(bump.call_args.args[0]), {'all', f'developer:{self.dev.id}'})
+
+        for i in range(3):
+            Task.objects.create(title=f'Other {i}', developer=self.other_dev)
+        request = RequestFactory().post('/admin/')
+        with patch.object(task_list_cache, 'bump', wraps=task_list_cache.bump) as bump:
+            UserAdmin(User, admin.site).delete_model(request, self.other_dev)
+        self.assertEqual(bump.call_count, 1)
+        self.assertFalse(Task.objects.filter(pk=self.other_task.pk).exists())
+
+    @override_settings(TASK_LIST_CACHE={'ENABLED': False})
+    def test_disabled_cache(self):
+        self.get_list(self.lead)
+        self.assertNotCached(self.lead)
+
+    def test_stats_endpoint_is_lead_only(self):
+        self.get_list(self.lead)
+        self.get_list(self.lead)
+
+        self.client.force_authenticate(user=self.lead)
+        response = self.client.get(reverse('api-task-cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(response.data['hits'], 1)
+        self.assertGreaterEqual(response.data['misses'], 1)
+        self.assertEqual(response.data['backend'], 'LocMemCache')
+
+        self.client.force_authenticate(user=self.dev)
+        self.assertEqual(self.client.get(reverse('api-task-cache-stats')).status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,134 @@
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks.changes import InvalidWatermark, decode_watermark, encode_watermark
+from tasks.models import Task, TaskTombstone, User
+
+
+@override_settings(TASK_SYNC={'SETTLE_SECONDS': 0, 'TOMBSTONE_DAYS': 30})
+class TaskChangesAPITests(APITestCase):
+    def setUp(self):
+        self.changes_url = reverse('api-task-changes')
+        self.lead = User.objects.create_user(username='lead', password='x', role='lead')
+        self.dev = User.objects.create_user(username='dev', password='x', role='developer')
+        self.other_dev = User.objects.create_user(username='other', password='x', role='developer')
+        self.tasks = [Task.objects.create(title=f'Task {i}', developer=self.dev) for i in range(3)]
+        self.other = Task.objects.create(title='Other', developer=self.other_dev)
+
+    def sync(self, user, since=None, **params):
+        self.client.force_authenticate(user=user)
+        if since is not None:
+            params['since'] = since
+        response = self.client.get(self.changes_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def changed_ids(self, data):
+        return [task['id'] for task in data['changes']]
+
+    def test_initial_sync_returns_scope(self):
+        data = self.sync(self.dev)
+        self.assertEqual(self.changed_ids(data), [task.id for task in self.tasks])
+        self.assertEqual((data['deleted'], data['has_more']), ([], False))
+        self.assertEqual(self.changed_ids(self.sync(self.lead)), [task.id for task in self.tasks] + [self.other.id])
+
+    def test_returns_only_changes_after_watermark(self):
+        watermark = self.sync(self.dev)['watermark']
+        self.tasks[1].title = 'Renamed'
+        self.tasks[1].save()
+        new = Task.objects.create(title='New', developer=self.dev)
+        deleted_id = self.tasks[0].id
+        self.tasks[0].delete()
+
+        # One indexed range read for changes and one for tombstones
+        with self.assertNumQueries(2):
+            data = self.sync(self.dev, watermark)
+        self.assertEqual(self.changed_ids(data), [self.tasks[1].id, new.id])
+        self.assertEqual(data['changes'][0]['title'], 'Renamed')
+        self.assertEqual(data['deleted'], [deleted_id])
+
+        data = self.sync(self.dev, data['watermark'])
+        self.assertEqual((data['changes'], data['deleted']), ([], []))
+
+    def test_reassigned_task_leaves_previous_scope(self):
+        dev_watermark = self.sync(self.dev)['watermark']
+        lead_watermark = self.sync(self.lead)['watermark']
+        self.tasks[2].developer = self.other_dev
+        self.tasks[2].save()
+
+        self.assertEqual(self.sync(self.dev, dev_watermark)['deleted'], [self.tasks[2].id])
+        data = self.sync(self.lead, lead_watermark)
+        self.assertEqual((self.changed_ids(data), data['deleted']), ([self.tasks[2].id], []))
+
+    def test_task_moved_away_and_back_is_kept(self):
+        watermark = self.sync(self.dev)['watermark']
+        task = self.tasks[0]
+        task.developer = self.other_dev
+        task.save()
+        task.developer = self.dev
+        task.save()
+        data = self.sync(self.dev, watermark)
+        self.assertEqual((self.changed_ids(data), data['deleted']), ([task.id], []))
+
+    def test_bulk_delete_writes_tombstones_in_one_insert(self):
+        watermark = self.sync(self.dev)['watermark']
+        self.client.force_authenticate(user=self.dev)
+        ids = [task.id for task in self.tasks]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(reverse('api-task-bulk'), ids, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT INTO "tasks_tasktombstone"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(sorted(self.sync(self.dev, watermark)['deleted']), ids)
+
+
+    def test_pages_through_changes(self):
+        data = self.sync(self.lead, page_size=3)
+        self.assertEqual((len(data['changes']), data['has_more']), (3, True))
+        data = self.sync(self.lead, data['watermark'], page_size=3)
+        self.assertEqual((self.changed_ids(data), data['has_more']), ([self.other.id], False))
+
+    def test_recent_changes_wait_to_settle(self):
+        watermark = self.sync(self.dev)['watermark']
+        Task.objects.create(title='New', developer=self.dev)
+        with override_settings(TASK_SYNC={'SETTLE_SECONDS': 60, 'TOMBSTONE_DAYS': 30}):
+            self.assertEqual(self.sync(self.dev, watermark)['changes'], [])
+        self.assertEqual(len(self.sync(self.dev, watermark)['changes']), 1)
+
+    def test_invalid_and_expired_watermarks(self):
+        self.client.force_authenticate(user=self.dev)
+        response = self.client.get(self.changes_url, {'since': 'nonsense'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        old = timezone.now() - timedelta(days=31)
+        response = self.client.get(self.changes_url, {'since': encode_watermark((old, 1), (old, 1))})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_naive_watermark_is_invalid(self):
+        self.client.force_authenticate(user=self.dev)
+        naive = urlsafe_b64encode(b'2026-01-01T00:00:00|1|2026-01-01T00:00:00|1').decode('ascii')
+        response = self.client.get(self.changes_url, {'since': naive})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.assertRaises(InvalidWatermark):
+            decode_watermark(naive)
+
+
+class PurgeTaskTombstonesCommandTests(TestCase):
+    def test_deletes_old_tombstones(self):
+        TaskTombstone.objects.create(task_id=1, removed_at=timezone.now() - timedelta(days=40))
+        TaskTombstone.objects.create(task_id=2)
+        out = StringIO()
+        call_command('purge_task_tombstones', stdout=out)
+        self.assertIn('Deleted 1 task tombstones', out.getvalue())
+        self.assertEqual(list(TaskTombstone.objects.values_list('task_id', flat=True)), [2])
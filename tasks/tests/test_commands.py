@@ -0,0 +1,189 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from tasks.management.commands.explain_task_queries import Command
+from tasks.models import Task, TaskCounter, User
+from tasks.warmup import warm_code
+
+
+class ExplainTaskQueriesCommandTests(TestCase):
+    def test_explains_list_querysets_and_rolls_back(self):
+        out = StringIO()
+        call_command('explain_task_queries', tasks=200, developers=5, stdout=out)
+        output = out.getvalue()
+
+        self.assertIn('lead: all tasks [page]', output)
+        self.assertIn('developer: own tasks by status [cursor]', output)
+        self.assertIn('tasks_task', output)
+        self.assertEqual(Task.objects.count(), 0)
+        self.assertEqual(User.objects.count(), 0)
+
+    def test_existing_rows_explain_busiest_developer(self):
+        User.objects.create_user(username='idle', role='developer')
+        busy = User.objects.create_user(username='busy', role='developer')
+        Task.objects.bulk_create(Task(title=f'Task {i}', developer=busy) for i in range(3))
+        out = StringIO()
+
+        with patch.object(Command, 'scenarios', wraps=Command().scenarios) as scenarios:
+            call_command('explain_task_queries', tasks=0, stdout=out)
+
+        self.assertEqual(scenarios.call_args.args[1], busy)
+        self.assertIn('lead: all tasks [page count]', out.getvalue())
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_keep_commits_seeded_rows(self):
+        call_command('explain_task_queries', tasks=50, developers=2, keep=True, stdout=StringIO())
+        self.assertEqual(Task.objects.count(), 50)
+
+
+class BenchTaskSerializersCommandTests(TestCase):
+    def test_reports_rows_per_second(self):
+        out = StringIO()
+        call_command('bench_task_serializers', page_size=10, iterations=2, stdout=out)
+        self.assertIn('TaskReadSerializer', out.getvalue())
+        self.assertIn('rows/s', out.getvalue())
+        self.assertEqual(Task.objects.count(), 0)
+
+
+class BenchJSONRenderersCommandTests(TestCase):
+    def test_reports_encode_and_decode_rates(self):
+        out = StringIO()
+        call_command('bench_json_renderers', page_size=10, iterations=2, stdout=out)
+        self.assertIn('FastJSON (orjson)', out.getvalue())
+        self.assertIn('pages/s', out.getvalue())
+        self.assertEqual(Task.objects.count(), 0)
+
+
+class BenchAsyncViewsCommandTests(TestCase):
+    def test_reports_sync_and_async_rates_and_rolls_back(self):
+        out = StringIO()
+        call_command('bench_async_views', tasks=30, developers=2, requests=4, concurrency=2, stdout=out)
+        output = out.getvalue()
+        self.assertIn('developer: own tasks         sync', output)
+        self.assertIn('developer: user list         async', output)
+        self.assertEqual(Task.objects.count(), 0)
+
+
+@patch('tasks.management.commands.serve.connections')
+@patch('tasks.management.commands.serve.Server')
+class ServeCommandTests(TestCase):
+    def test_preloads_threaded_wsgi_workers(self, server, connections):
+        call_command('serve', workers=3, threads=8)
+        application, config = server.call_args.args
+        self.assertEqual(application.__class__.__name__, 'WSGIHandler')
+        self.assertTrue(config['preload_app'])
+        self.assertEqual((config['workers'], config['worker_class'], config['threads']), (3, 'gthread', 8))
+        server.return_value.run.assert_called_once()
+
+    def test_asgi_uses_uvicorn_workers(self, server, connections):
+        call_command('serve', asgi=True)
+        application, config = server.call_args.args
+        self.assertEqual(application.__class__.__name__, 'ASGIHandler')
+        self.assertEqual(config['worker_class'], 'uvicorn.workers.UvicornWorker')
+
+    def test_workers_warm_up_after_fork(self, server, connections):
+        call_command('serve')
+        config = server.call_args.args[1]
+        with patch('tasks.management.commands.serve.warm_worker') as warm_worker:
+            config['post_fork'](None, None)
+        warm_worker.assert_called_once()
+        self.assertIsNotNone(warm_worker.call_args.args[0])
+
+    def test_asgi_workers_skip_warmup_requests(self, server, connections):
+        call_command('serve', asgi=True)
+        config = server.call_args.args[1]
+        with patch('tasks.management.commands.serve.warm_worker') as warm_worker:
+            config['post_fork'](None, None)
+        warm_worker.assert_called_once_with(None)
+
+    def test_code_warmup_does_not_touch_the_database(self, server, connections):
+        with self.assertNumQueries(0):
+            warm_code()
+
+
+class PurgeExpiredTokensCommandTests(TestCase):
+    def create_token(self, jti, expires_at):
+        return OutstandingToken.objects.create(jti=jti, token=jti, expires_at=expires_at)
+
+    def test_deletes_expired_tokens_in_batches(self):
+        past = timezone.now() - timedelta(days=1)
+        for i in range(5):
+            token = self.create_token(f'expired-{i}', past)
+            BlacklistedToken.objects.create(token=token)
+        live = self.create_token('live', timezone.now() + timedelta(days=1))
+        BlacklistedToken.objects.create(token=live)
+
+        out = StringIO()
+        # Three batches of id lookup, collect and two deletes, then the empty lookup
+        with self.assertNumQueries(13):
+            call_command('purge_expired_tokens', batch_size=2, stdout=out)
+
+        self.assertIn('Deleted 5 expired tokens', out.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['live'])
+        self.assertEqual(BlacklistedToken.objects.get().token, live)
+
+
+class ReconcileTaskCountersCommandTests(TestCase):
+    def setUp(self):
+        developer = User.objects.create_user(username='dev', password='x', role='developer')
+        Task.objects.create(title='Task', developer=developer)
+        TaskCounter.objects.filter(key='all').update(total=7)
+
+    def test_dry_run_reports_without_repairing(self):
+        out = StringIO()
+        call_command('reconcile_task_counters', dry_run=True, stdout=out)
+        self.assertIn('Found 1 drifted task counters', out.getvalue())
+        self.assertEqual(TaskCounter.objects.get(key='all').total, 7)
+
+    def test_repairs_drift(self):
+        out = StringIO()
+        call_command('reconcile_task_counters', stdout=out)
+        self.assertIn("all: stored {'total': 7, 'done': 0, 'open': 1}, actual {'total': 1, 'done': 0, 'open': 1}", out.getvalue())
+        self.assertEqual(TaskCounter.objects.get(key='all').total, 1)
+
+
+class ImportTasksCommandTests(TestCase):
+    def setUp(self):
+        self.dev = User.objects.create_user(username='dev', password='x', role='developer')
+        self.other_dev = User.objects.create_user(username='other', password='x', role='developer')
+
+    def write(self, name, content):
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_imports_csv_with_developer_usernames(self):
+        path = self.write('tasks.csv', 'title,is_done,developer\nOne,true,dev\nTwo,false,other\nThree,false,nobody\nFour,,\n')
+        out = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('import_tasks', path, stdout=out)
+        # One username lookup for the batch
+        self.assertEqual(len([query for query in queries if 'FROM "tasks_user"' in query['sql']]), 1)
+
+        self.assertIn('row 3: {"developer": ["Unknown username \\"nobody\\"."]}', out.getvalue())
+        self.assertIn('Imported 3 of 4 rows (1 errors)', out.getvalue())
+        self.assertEqual(
+            sorted(Task.objects.values_list('title', 'developer__username', 'is_done')),
+            [('Four', None, False), ('One', 'dev', True), ('Two', 'other', False)],
+        )
+        self.assertIsNotNone(Task.objects.get(title='One').completed_at)
+
+    def test_developer_option_and_ndjson(self):
+        path = self.write('legacy.json', '{"title": "One", "developer": "other"}\n{"title": "Two"}\n')
+        call_command('import_tasks', path, format='ndjson', developer='dev', batch_size=1, stdout=StringIO())
+        self.assertEqual(Task.objects.filter(developer=self.dev).count(), 2)
+
+    def test_unknown_format(self):
+        with self.assertRaises(CommandError):
+            call_command('import_tasks', self.write('tasks.txt', 'title\nOne\n'), stdout=StringIO())
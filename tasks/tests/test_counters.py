@@ -0,0 +1,157 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks.changes import task_tombstones
+from tasks.counters import task_counters
+from tasks.models import Task, TaskCounter, User
+
+
+class TaskCountersTests(TestCase):
+    def setUp(self):
+        self.dev = User.objects.create_user(username='dev', password='x', role='developer')
+        self.other_dev = User.objects.create_user(username='other', password='x', role='developer')
+
+    def counts(self, key):
+        counter = TaskCounter.objects.get(key=key)
+        return counter.total, counter.done, counter.open
+
+    def assertConsistent(self):
+        self.assertEqual(task_counters.reconcile(dry_run=True), [])
+
+    def test_create_update_delete(self):
+        task = Task.objects.create(title='Task', developer=self.dev)
+        Task.objects.create(title='Done', developer=self.dev, is_done=True)
+        self.assertEqual(self.counts('all'), (2, 1, 1))
+        self.assertEqual(self.counts(f'developer:{self.dev.id}'), (2, 1, 1))
+
+        task.is_done = True
+        task.save()
+        self.assertEqual(self.counts(f'developer:{self.dev.id}'), (2, 2, 0))
+
+        task.developer = self.other_dev
+        task.save()
+        self.assertEqual(self.counts(f'developer:{self.dev.id}'), (1, 1, 0))
+        self.assertEqual(self.counts(f'developer:{self.other_dev.id}'), (1, 1, 0))
+
+        task.delete()
+        self.assertEqual(self.counts('all'), (1, 1, 0))
+        self.assertEqual(self.counts(f'developer:{self.other_dev.id}'), (0, 0, 0))
+        self.assertConsistent()
+
+    def test_save_of_task_read_without_status(self):
+        task = Task.objects.create(title='Task', developer=self.dev)
+        task = Task.objects.only('id', 'title').get(pk=task.pk)
+        task.is_done = True
+        task.save()
+        self.assertEqual(self.counts(f'developer:{self.dev.id}'), (1, 1, 0))
+        self.assertConsistent()
+
+    def test_every_write_moves_changed_at(self):
+        task = Task.objects.create(title='Task', developer=self.dev)
+        changed_at = TaskCounter.objects.get(key='all').changed_at
+        task.title = 'Renamed'
+        task.save()
+        self.assertGreater(TaskCounter.objects.get(key='all').changed_at, changed_at)
+
+    def test_rolled_back_write_leaves_counts(self):
+        Task.objects.create(title='Task', developer=self.dev)
+        try:
+            with transaction.atomic():
+                Task.objects.create(title='Rolled back', developer=self.dev)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(self.counts('all'), (1, 0, 1))
+
+    def test_batch_writes_each_row_once(self):
+        tasks = [Task.objects.create(title=f'Task {i}', developer=self.dev) for i in range(10)]
+        # SELECT and DELETE of the tasks, one tombstone INSERT, one UPDATE per counter
+        # row, and the savepoint pair
+        with self.assertNumQueries(7), transaction.atomic(), task_counters.batch(), task_tombstones.batch():
+            Task.objects.filter(pk__in=[task.pk for task in tasks]).delete()
+        self.assertEqual(self.counts('all'), (0, 0, 0))
+
+    def test_deleting_a_developer(self):
+        Task.objects.create(title='Task', developer=self.dev)
+        Task.objects.create(title='Other', developer=self.other_dev)
+        self.dev.delete()
+        self.assertFalse(TaskCounter.objects.filter(key=f'developer:{self.dev.id}').exists())
+        self.assertEqual(self.counts('all'), (1, 0, 1))
+
+    def test_reconcile_repairs_drift(self):
+        Task.objects.create(title='Task', developer=self.dev)
+        TaskCounter.objects.filter(key='all').update(total=5, open=5)
+        TaskCounter.objects.filter(key=f'developer:{self.dev.id}').delete()
+
+        drift = task_counters.reconcile()
+
+        self.assertEqual([key for key, _, _ in drift], ['all', f'developer:{self.dev.id}'])
+        self.assertEqual(self.counts('all'), (1, 0, 1))
+        self.assertEqual(self.counts(f'developer:{self.dev.id}'), (1, 0, 1))
+        self.assertConsistent()
+
+
+class TaskCountersAPITests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.tasks_url = reverse('api-task-list-create')
+        self.lead = User.objects.create_user(username='lead', password='x', role='lead')
+        self.dev = User.objects.create_user(username='dev', password='x', role='developer')
+        self.other_dev = User.objects.create_user(username='other', password='x', role='developer')
+        self.tasks = [Task.objects.create(title=f'Task {i}', developer=self.dev) for i in range(3)]
+        Task.objects.create(title='Other', developer=self.other_dev, is_done=True)
+
+    def test_api_writes_keep_counters_consistent(self):
+        self.client.force_authenticate(user=self.dev)
+        bulk_url = reverse('api-task-bulk')
+        self.client.post(bulk_url, [{'title': 'New'}, {'title': 'New done', 'is_done': True}], format='json')
+        self.client.patch(bulk_url, [{'id': self.tasks[0].id, 'is_done': True}], format='json')
+        self.client.delete(bulk_url, [self.tasks[1].id], format='json')
+        self.client.post(reverse('api-task-toggle', args=[self.tasks[2].id]), {}, format='json')
+        self.client.patch(reverse('api-task-detail', args=[self.tasks[2].id]), {'is_done': False}, format='json')
+
+        self.assertEqual(task_counters.reconcile(dry_run=True), [])
+        counter = TaskCounter.objects.get(key=f'developer:{self.dev.id}')
+        self.assertEqual((counter.total, counter.done, counter.open), (4, 2, 2))
+
+    def test_list_count_comes_from_counters(self):
+        self.client.force_authenticate(user=self.lead)
+        TaskCounter.objects.filter(key='all').update(total=40)
+        TaskCounter.objects.filter(key=f'developer:{self.dev.id}').update(open=30)
+        cache.clear()
+
+        self.assertEqual(self.client.get(self.tasks_url).data['count'], 40)
+        self.assertEqual(self.client.get(self.tasks_url, {'developer': self.dev.id, 'is_done': 'false'}).data['count'], 30)
+        # Searches aren't counted ahead of time
+        self.assertEqual(self.client.get(self.tasks_url, {'q': 'task'}).data['count'], 3)
+
+    def test_list_count_for_developer_without_tasks(self):
+        developer = User.objects.create_user(username='new', password='x', role='developer')
+        self.client.force_authenticate(user=developer)
+        response = self.client.get(self.tasks_url)
+        self.assertEqual((response.data['count'], response.data['results']), (0, []))
+
+    def test_list_etag_changes_with_any_write(self):
+        self.client.force_authenticate(user=self.dev)
+        etag = self.client.get(self.tasks_url)['ETag']
+        self.tasks[0].title = 'Renamed'
+        self.tasks[0].save()
+        self.assertNotEqual(self.client.get(self.tasks_url)['ETag'], etag)
+
+    def test_counts_endpoint(self):
+        url = reverse('api-task-counts')
+        self.client.force_authenticate(user=self.lead)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['developer_username'], row['total'], row['done'], row['open']) for row in response.data],
+            [(None, 4, 1, 3), ('dev', 3, 0, 3), ('other', 1, 1, 0)],
+        )
+
+        self.client.force_authenticate(user=self.dev)
+        self.assertEqual([row['developer_username'] for row in self.client.get(url).data], ['dev'])
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.db import OperationalError
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from psycopg_pool import PoolTimeout
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks.db import pool_stats
+from tasks.middleware import PoolTimeoutMiddleware
+from tasks.models import User
+
+
+class FakePool:
+    closed = False
+
+    def get_stats(self):
+        return {
+            'pool_min': 2, 'pool_max': 8, 'pool_size': 5, 'pool_available': 1,
+            'requests_num': 40, 'requests_queued': 4, 'requests_wait_ms': 100, 'requests_errors': 1,
+        }
+
+
+class PoolStatsTests(TestCase):
+    def test_reports_usage_and_wait_time(self):
+        connections = {'default': SimpleNamespace(pool=FakePool(), settings_dict={})}
+        with patch('tasks.db.connections', connections):
+            stats = pool_stats()['default']
+        self.assertEqual(
+            (stats['size'], stats['in_use'], stats['idle'], stats['wait_ms_avg'], stats['timeouts']),
+            (5, 4, 1, 25, 1),
+        )
+
+    def test_unpooled_alias_reports_persistent_setting(self):
+        connections = {'default': SimpleNamespace(settings_dict={'CONN_MAX_AGE': 60})}
+        with patch('tasks.db.connections', connections):
+            self.assertEqual(pool_stats()['default'], {'pooled': False, 'conn_max_age': 60})
+
+
+class DatabasePoolStatsAPIViewTests(APITestCase):
+    def test_lead_only(self):
+        url = reverse('api-db-pool-stats')
+        self.client.force_authenticate(User.objects.create_user(username='dev', password='x', role='developer'))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(User.objects.create_user(username='lead', password='x', role='lead'))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('default', response.data)
+
+
+class PoolTimeoutMiddlewareTests(TestCase):
+    def setUp(self):
+        self.middleware = PoolTimeoutMiddleware(lambda request: None)
+        self.request = RequestFactory().get('/api/tasks/')
+
+    def test_pool_timeout_is_503(self):
+        try:
+            try:
+                raise PoolTimeout("couldn't get a connection after 3.00 sec")
+            except PoolTimeout as exc:
+                raise OperationalError(str(exc)) from exc
+        except OperationalError as exc:
+            response = self.middleware.process_exception(self.request, exc)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_other_database_errors_pass_through(self):
+        self.assertIsNone(self.middleware.process_exception(self.request, OperationalError('boom')))
@@ -0,0 +1,120 @@
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks.authentication import user_cache
+from tasks.events import TaskEventSubscriber, task_event_hub
+from tasks.models import Task, User
+
+
+class TaskEventsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.url = reverse('api-async-task-events')
+        self.lead = User.objects.create_user(username='lead', password='x', role='lead', is_active=True)
+        self.dev = User.objects.create_user(username='dev', password='x', role='developer', is_active=True)
+        self.other = User.objects.create_user(username='other', password='x', role='developer', is_active=True)
+
+    def headers(self, user, token=None):
+        return {'authorization': f'Bearer {token or AccessToken.for_user(user)}'}
+
+    async def open_stream(self, user, token=None, query=''):
+        response = await self.async_client.get(self.url + query, headers=self.headers(user, token))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream; charset=utf-8')
+        stream = aiter(response.streaming_content)
+        self.assertIn(b': connected', await anext(stream))
+        return stream
+
+    async def next_event(self, stream):
+        while True:
+            chunk = (await asyncio.wait_for(anext(stream), 5)).decode()
+            if chunk.startswith('event: '):
+                name, data = chunk.split('\n')[:2]
+                return name[len('event: '):], data[len('data: '):]
+
+    def commit(self, write):
+        # The test transaction never commits; run the on_commit callbacks directly
+        with self.captureOnCommitCallbacks(execute=True):
+            return write()
+
+    async def write(self, write):
+        return await sync_to_async(self.commit)(write)
+
+    async def test_developer_receives_own_task_events(self):
+        stream = await self.open_stream(self.dev)
+        await self.write(lambda: Task.objects.create(title='Not mine', developer=self.other))
+        task = await self.write(lambda: Task.objects.create(title='Mine', developer=self.dev))
+        name, data = await self.next_event(stream)
+        self.assertEqual(name, 'created')
+        self.assertIn('"title": "Mine"', data)
+
+        task.is_done = True
+        await self.write(task.save)
+        name, data = await self.next_event(stream)
+        self.assertEqual(name, 'updated')
+        self.assertIn('"is_done": true', data)
+
+        task_id = task.id
+        await self.write(task.delete)
+        self.assertEqual(await self.next_event(stream), ('deleted', f'{{"type": "deleted", "id": {task_id}}}'))
+        await stream.aclose()
+
+    async def test_reassignment_reaches_lead_and_previous_developer(self):
+        task = await Task.objects.acreate(title='Task', developer=self.dev)
+        lead_stream = await self.open_stream(self.lead)
+        dev_stream = await self.open_stream(self.dev)
+        task.developer = self.other
+        await self.write(task.save)
+        name, data = await self.next_event(lead_stream)
+        self.assertEqual(name, 'updated')
+        self.assertIn(f'"developer": {self.other.id}', data)
+        self.assertEqual((await self.next_event(dev_stream))[0], 'deleted')
+        await lead_stream.aclose()
+        await dev_stream.aclose()
+
+    @override_settings(TASK_EVENTS={'MAX_BATCH_EVENTS': 2})
+    async def test_large_write_sends_reload(self):
+        stream = await self.open_stream(self.dev)
+        response = await self.write(lambda: self.client.post(
+            reverse('api-task-bulk'), [{'title': f'Task {i}'} for i in range(3)],
+            content_type='application/json', headers=self.headers(self.dev)
+        ))
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((await self.next_event(stream))[0], 'reload')
+        await stream.aclose()
+
+    async def test_stream_ends_when_token_expires(self):
+        token = AccessToken.for_user(self.dev)
+        token.set_exp(lifetime=timedelta(seconds=1))
+        stream = await self.open_stream(self.dev, token)
+        with self.assertRaises(StopAsyncIteration):
+            await asyncio.wait_for(anext(stream), 5)
+        self.assertFalse(any(task_event_hub.scopes.values()))
+
+    async def test_unread_stream_does_not_subscribe(self):
+        response = await self.async_client.get(self.url, headers=self.headers(self.dev))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any(task_event_hub.scopes.values()))
+        stream = aiter(response.streaming_content)
+        await anext(stream)
+        self.assertTrue(task_event_hub.scopes.get(self.dev.id))
+        await stream.aclose()
+
+    async def test_lagging_subscriber_gets_reload(self):
+        subscriber = TaskEventSubscriber(None, queue_size=2)
+        for task_id in range(5):
+            subscriber.put({'type': 'deleted', 'id': task_id})
+        self.assertEqual(subscriber.queue.qsize(), 1)
+        self.assertEqual(subscriber.queue.get_nowait(), {'type': 'reload'})
+
+    def test_requires_asgi(self):
+        response = self.client.get(self.url, headers=self.headers(self.dev))
+        self.assertEqual(response.status_code, 501)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
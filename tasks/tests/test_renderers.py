@@ -0,0 +1,124 @@
+import io
+import json
+import unittest
+from datetime import datetime, time, timezone
+from decimal import Decimal
+from unittest.mock import patch
+from uuid import UUID
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase
+
+from tasks.models import Task, User
+from tasks.parsers import FastJSONParser, MessagePackParser
+from tasks.renderers import FastJSONRenderer, MessagePackRenderer, msgpack
+
+data = {
+    'created_at': datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc),
+    'time': time(1, 2, 3, 4567),
+    'amount': Decimal('1.50'),
+    'uuid': UUID('12345678-1234-5678-1234-567812345678'),
+    'lazy': gettext_lazy('Task not found'),
+    'title': 'Café\u2028ünïcode',
+    'tags': ('a', 'b'),
+    1: None,
+    'large': 2 ** 70,
+}
+
+
+class FastJSONRendererTests(unittest.TestCase):
+    def test_same_bytes_as_json_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_float_spelling(self):
+        # Both valid JSON for the same numbers
+        self.assertEqual(FastJSONRenderer().render([1e20, 0.5]), b'[1e20,0.5]')
+        self.assertEqual(JSONRenderer().render([1e20, 0.5]), b'[1e+20,0.5]')
+        self.assertEqual(FastJSONRenderer().render([float('nan')]), b'[null]')
+
+    def test_indent_uses_json_renderer(self):
+        media_type = 'application/json; indent=4'
+        rendered = FastJSONRenderer().render(data, media_type)
+        self.assertEqual(rendered, JSONRenderer().render(data, media_type))
+        self.assertIn(b'\n    ', rendered)
+
+    def test_falls_back_without_orjson(self):
+        with patch('tasks.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class FastJSONParserTests(unittest.TestCase):
+    def test_parses_like_json_parser(self):
+        body = JSONRenderer().render({'title': 'Café', 'is_done': True, 'ids': [1, 2]})
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+    def test_other_charsets_use_json_parser(self):
+        body = json.dumps({'title': 'Café'}, ensure_ascii=False).encode('latin-1')
+        parsed = FastJSONParser().parse(io.BytesIO(body), parser_context={'encoding': 'latin-1'})
+        self.assertEqual(parsed, {'title': 'Café'})
+
+    def test_invalid_json(self):
+        for body in [b'{"title": ', b'[NaN]']:
+            with self.subTest(body=body), self.assertRaisesRegex(ParseError, 'JSON parse error'):
+                FastJSONParser().parse(io.BytesIO(body))
+
+
+class FastJSONAPITests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer')
+        Task.objects.create(title='Task', developer=self.dev)
+
+    def test_list_rendered_with_fast_json(self):
+        self.client.force_authenticate(user=self.dev)
+        response = self.client.get(reverse('api-task-list-create'))
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_invalid_body(self):
+        self.client.force_authenticate(user=self.dev)
+        response = self.client.post(reverse('api-task-list-create'), '{"title": ', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('JSON parse error', response.data['detail'])
+
+
+@unittest.skipIf(msgpack is None, 'msgpack is not installed')
+class MessagePackTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.dev = User.objects.create_user(username='dev', password='testpass123', role='developer')
+        Task.objects.create(title='Task', developer=self.dev)
+
+    def test_round_trip(self):
+        # Map keys stay integers in MessagePack, and the parser only takes string keys
+        values = {key: value for key, value in data.items() if isinstance(key, str)}
+        body = MessagePackRenderer().render(values)
+        expected = JSONParser().parse(io.BytesIO(JSONRenderer().render(values)))
+        expected['large'] = str(2 ** 70)
+        self.assertEqual(MessagePackParser().parse(io.BytesIO(body)), expected)
+        with self.assertRaisesRegex(ParseError, 'MessagePack parse error'):
+            MessagePackParser().parse(io.BytesIO(body[:10]))
+
+    def test_negotiated_by_accept_and_content_type(self):
+        self.client.force_authenticate(user=self.dev)
+        url = reverse('api-task-list-create')
+
+        response = self.client.get(url, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content)['results'][0]['title'], 'Task')
+
+        response = self.client.post(
+            url, msgpack.packb({'title': 'Packed'}), content_type='application/msgpack',
+            HTTP_ACCEPT='application/msgpack',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(msgpack.unpackb(response.content)['title'], 'Packed')
@@ -0,0 +1,166 @@
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.client import AsyncRequestFactory
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks.authentication import user_cache
+from tasks.middleware import ReplicaRoutingMiddleware
+from tasks.models import Task, TaskCounter, User
+from tasks.routers import ReplicaRouter, choose_replica
+
+REPLICAS = {'WEIGHTS': {'replica_1': 0, 'replica_2': 1}, 'PIN_SECONDS': 5, 'CACHE_ALIAS': 'default'}
+
+# A second test database standing in for a read replica. It isn't a test mirror, so it
+# only has the rows a test copies into it, like a replica lagging the primary. Only
+# listed in READ_REPLICAS inside the tests, so it is migrated and flushed like any other.
+REPLICA_ALIAS = 'replica_test'
+if REPLICA_ALIAS not in connections.settings:
+    primary = connections.settings[DEFAULT_DB_ALIAS]
+    connections.settings[REPLICA_ALIAS] = {
+        **primary,
+        'TEST': {
+            **primary['TEST'],
+            'MIRROR': None,
+            # SQLite test databases are in memory, one per alias
+            'NAME': None if connections[DEFAULT_DB_ALIAS].vendor == 'sqlite' else
+            f"{primary['TEST']['NAME'] or 'test_' + primary['NAME']}_replica",
+        },
+    }
+
+
+@override_settings(READ_REPLICAS=REPLICAS)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+
+    def headers(self, user_id):
+        if user_id is None:
+            return {}
+        return {'authorization': f'Bearer {AccessToken.for_user(SimpleNamespace(id=user_id))}'}
+
+    def route(self, method, user_id=None):
+        """The alias a read made while handling the request is sent to."""
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(Task))
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)('/api/tasks/', headers=self.headers(user_id))
+        ReplicaRoutingMiddleware(view)(request)
+        return seen[0]
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertIsNone(self.router.db_for_read(Task))
+        self.assertEqual(self.router.db_for_write(Task), 'default')
+
+    def test_safe_requests_read_from_weighted_replica(self):
+        self.assertEqual(self.route('get'), 'replica_2')
+        self.assertEqual(self.route('get', user_id=1), 'replica_2')
+        self.assertIsNone(self.router.db_for_read(Task))
+
+    def test_writer_is_pinned_to_primary(self):
+        self.assertIsNone(self.route('post', user_id=1))
+        self.assertIsNone(self.route('get', user_id=1))
+        self.assertEqual(self.route('get', user_id=2), 'replica_2')
+
+        # The pin expires with its cache entry
+        cache.clear()
+        self.assertEqual(self.route('get', user_id=1), 'replica_2')
+
+    def test_invalid_token_is_not_pinned(self):
+        request = RequestFactory().post('/api/tasks/', headers={'authorization': 'Bearer invalid'})
+        ReplicaRoutingMiddleware(lambda request: HttpResponse())(request)
+        self.assertEqual(self.route('get'), 'replica_2')
+
+    async def test_async_requests(self):
+        seen = []
+
+        async def view(request):
+            seen.append(self.router.db_for_read(Task))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(view)
+        factory = AsyncRequestFactory()
+        await middleware(factory.post('/api/tasks/', headers=self.headers(1)))
+        await middleware(factory.get('/api/tasks/', headers=self.headers(1)))
+        await middleware(factory.get('/api/tasks/', headers=self.headers(2)))
+        self.assertEqual(seen, [None, None, 'replica_2'])
+
+    @override_settings(READ_REPLICAS={})
+    def test_without_replicas_everything_uses_primary(self):
+        self.assertIsNone(self.route('get'))
+
+    def test_weighted_choice(self):
+        with self.settings(READ_REPLICAS={'WEIGHTS': {'a': 3, 'b': 1}}):
+            picks = [choose_replica() for _ in range(2000)]
+        self.assertGreater(picks.count('a'), picks.count('b') * 2)
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica_1', 'tasks'))
+        self.assertIsNone(self.router.allow_migrate('default', 'tasks'))
+
+
+# Requests against a real replica alias. The router keeps reads on the primary inside
+# transactions, so this can't be a TestCase.
+class ReplicaDatabaseTests(TransactionTestCase):
+    databases = {DEFAULT_DB_ALIAS, REPLICA_ALIAS}
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        replicas = override_settings(READ_REPLICAS={**REPLICAS, 'WEIGHTS': {REPLICA_ALIAS: 1}})
+        replicas.enable()
+        self.addCleanup(replicas.disable)
+
+        self.lead = User.objects.create_user(username='lead', password='x', role='lead', is_active=True)
+        self.dev = User.objects.create_user(username='dev', password='x', role='developer', is_active=True)
+        Task.objects.create(title='Replicated', developer=self.dev)
+        self.replicate()
+        Task.objects.create(title='Lagging', developer=self.dev)
+
+    def replicate(self):
+        """Copy the primary's rows to the replica, which then misses every later write."""
+        # Including the empty 'all' counter the migrations create
+        TaskCounter.objects.using(REPLICA_ALIAS).all().delete()
+        for model in (User, Task, TaskCounter):
+            model.objects.using(REPLICA_ALIAS).bulk_create(model.objects.all())
+
+    def headers(self, user):
+        return {'authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    def titles(self, user):
+        response = self.client.get(reverse('api-task-list-create'), headers=self.headers(user))
+        self.assertEqual(response.status_code, 200)
+        return sorted(task['title'] for task in response.json()['results'])
+
+    def test_reads_use_replica_until_a_write_pins_the_user(self):
+        self.assertEqual(self.titles(self.dev), ['Replicated'])
+        response = self.client.post(
+            reverse('api-task-list-create'), {'title': 'New'},
+            content_type='application/json', headers=self.headers(self.dev)
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(Task.objects.using(REPLICA_ALIAS).filter(title='New').exists())
+
+        self.assertEqual(self.titles(self.dev), ['Lagging', 'New', 'Replicated'])
+        self.assertEqual(self.titles(self.lead), ['Replicated'])
+
+    def test_replica_reads_do_not_fill_task_list_cache(self):
+        self.assertEqual(self.titles(self.dev), ['Replicated'])
+        # The same request on the primary finds no cached replica page
+        with self.settings(READ_REPLICAS={}):
+            self.assertEqual(self.titles(self.dev), ['Lagging', 'Replicated'])
+        self.assertEqual(self.titles(self.dev), ['Lagging', 'Replicated'])
+
+    def test_developer_directory_loads_from_primary(self):
+        User.objects.create_user(username='new-dev', password='x', role='developer')
+        response = self.client.get(reverse('api-developer-directory'), headers=self.headers(self.lead))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([user['username'] for user in response.json()], ['dev', 'new-dev'])
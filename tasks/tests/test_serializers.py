@@ -1,5 +1,6 @@
 from rest_framework.test import APITestCase
-from tasks.serializers import TaskSerializer, UserSerializer
+from tasks.serializers import TaskSerializer, TaskReadSerializer, UserSerializer
+from rest_framework.renderers import JSONRenderer
 from django.contrib.auth import get_user_model
 from tasks.models import Task
 from django.utils import timezone
@@ -151,4 +152,35 @@ class TaskSerializerTests(APITestCase):
         data = serializer.data
         
         self.assertIsNone(data['developer'])
-        self.assertIsNone(data['developer_username'])
\ No newline at end of file
+        self.assertIsNone(data['developer_username'])
+
+
+class TaskReadSerializerTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='testdev',
+            password='testpass123',
+            role='developer'
+        )
+        Task.objects.create(title='Done Task', description='Done', developer=self.user, is_done=True)
+        Task.objects.create(title='Open Task', developer=self.user)
+        Task.objects.create(title='Unassigned Task', description='')
+        self.renderer = JSONRenderer()
+
+    def test_list_output_matches_task_serializer(self):
+        queryset = Task.objects.order_by('-created_at')
+        expected = self.renderer.render(TaskSerializer(queryset, many=True).data)
+        rows = TaskReadSerializer.rows(queryset)
+        self.assertEqual(self.renderer.render(TaskReadSerializer(rows, many=True).data), expected)
+
+    def test_instance_output_matches_task_serializer(self):
+        for task in Task.objects.all():
+            self.assertEqual(
+                self.renderer.render(TaskReadSerializer(task).data),
+                self.renderer.render(TaskSerializer(task).data)
+            )
+
+    def test_rows_are_a_single_query(self):
+        with self.assertNumQueries(1):
+            data = TaskReadSerializer(TaskReadSerializer.rows(Task.objects.all()), many=True).data
+        self.assertEqual(len(data), 3)
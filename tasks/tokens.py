@@ -0,0 +1,183 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .batching import bump_version
+
+
+# In-process set of the jtis of blacklisted, unexpired refresh tokens, so the refresh
+# endpoint can check the blacklist without a query. It is loaded on first use (or by
+# warm()), then kept current by reading only recently blacklisted rows whenever the
+# shared version key changes, and fully reloaded every SYNC_INTERVAL seconds. Past
+# MAX_SIZE entries it stops answering and checks fall back to the database.
+#
+# With a per-process cache backend other workers' version bumps are never seen, so
+# only hits are answered from the set and misses are checked in the database: a
+# token logged out in another worker stays refused.
+class BlacklistCache:
+    version_key = 'tokens:blacklist:version'
+    # Re-read rows blacklisted shortly before the last sync, in case their
+    # transaction committed after it
+    sync_overlap = timedelta(seconds=60)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    @property
+    def options(self):
+        return getattr(settings, 'TOKEN_BLACKLIST_CACHE', {})
+
+    @property
+    def enabled(self):
+        return self.options.get('ENABLED', True)
+
+    @property
+    def cache(self):
+        return caches[self.options.get('ALIAS', 'default')]
+
+    @property
+    def shared(self):
+        # Whether every worker process sees the version key
+        return not isinstance(self.cache, (LocMemCache, DummyCache))
+
+    @property
+    def max_size(self):
+        return self.options.get('MAX_SIZE', 100000)
+
+    def reset(self):
+        self.loading = False
+        self.syncing = False
+        self.jtis = None
+        self.overflow = False
+        self.version = None
+        self.loaded_at = 0.0
+        self.synced_from = None
+
+    def warm(self):
+        if self.enabled:
+            self.load(self.cache.get(self.version_key))
+
+    def load(self, version):
+        # Read without the lock, which only guards swapping the new set in, so checks
+        # keep being answered from the old set meanwhile
+        started = timezone.now()
+        try:
+            jtis = set(
+                BlacklistedToken.objects
+                .filter(token__expires_at__gt=started)
+                .values_list('token__jti', flat=True)[:self.max_size + 1]
+            )
+        except Exception:
+            with self.lock:
+                self.loading = False
+            raise
+        overflow = len(jtis) > self.max_size
+        with self.lock:
+            self.loading = False
+            self.overflow = overflow
+            self.jtis = set() if overflow else jtis
+            self.version = version
+            self.loaded_at = time.monotonic()
+            self.synced_from = started
+
+    def sync(self, version, synced_from):
+        # Like load(), reads without the lock and only takes it to merge the rows in
+        started = timezone.now()
+        try:
+            jtis = set(
+                BlacklistedToken.objects
+                .filter(blacklisted_at__gte=synced_from - self.sync_overlap)
+                .values_list('token__jti', flat=True)
+            )
+        except Exception:
+            with self.lock:
+                self.syncing = False
+            raise
+        with self.lock:
+            self.syncing = False
+            if self.jtis is None or self.overflow:
+                return
+            self.jtis.update(jtis)
+            self.overflow = len(self.jtis) > self.max_size
+            self.version = version
+            self.synced_from = max(self.synced_from, started)
+
+    def contains(self, jti):
+        """
+        Return whether the jti is blacklisted, or None when the cache can't tell
+        (disabled, over MAX_SIZE, or a miss in a per-process cache) and the caller
+        should ask the database.
+        """
+        if not self.enabled:
+            return None
+        version = self.cache.get(self.version_key)
+        synced_from = None
+        with self.lock:
+            # One thread reloads or syncs; the others go on with the current set
+            reload = not self.loading and (
+                self.jtis is None or time.monotonic() - self.loaded_at > self.options.get('SYNC_INTERVAL', 60)
+            )
+            self.loading = self.loading or reload
+            if not reload and not self.loading and not self.syncing and self.jtis is not None \
+                    and not self.overflow and version != self.version:
+                self.syncing = True
+                synced_from = self.synced_from
+        if reload:
+            self.load(version)
+        elif synced_from is not None:
+            self.sync(version, synced_from)
+
+        with self.lock:
+            if self.jtis is None or self.overflow:
+                # Still loading in another thread, or too many to keep
+                return None
+            if jti in self.jtis:
+                return True
+            if version != self.version:
+                # Another thread is still syncing the new rows
+                return None
+            return False if self.shared else None
+
+    def add(self, jti):
+        """
+        Record a blacklisting once its transaction commits, so a rolled back logout
+        leaves the token usable here as well.
+        """
+        if self.enabled:
+            transaction.on_commit(lambda: self.added(jti))
+
+    def added(self, jti):
+        with self.lock:
+            if self.jtis is not None and not self.overflow:
+                self.jtis.add(jti)
+        # Other processes resync now that the row is visible to them
+        self.bump()
+
+    def bump(self):
+        bump_version(self.cache, self.version_key)
+
+
+blacklist_cache = BlacklistCache()
+
+
+# Refresh token whose blacklist check is answered by blacklist_cache when it can
+class CachedBlacklistRefreshToken(RefreshToken):
+    def check_blacklist(self):
+        blacklisted = blacklist_cache.contains(self.payload[api_settings.JTI_CLAIM])
+        if blacklisted is None:
+            return super().check_blacklist()
+        if blacklisted:
+            raise TokenError(_("Token is blacklisted"))
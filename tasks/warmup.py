@@ -0,0 +1,107 @@
+import logging
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import reverse
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .serializers import TaskBulkSerializer, TaskReadSerializer, TaskSerializer, UserSerializer
+from .tokens import blacklist_cache
+
+templates = ['login.html', 'signup.html', 'tasks.html', 'task_detail.html']
+
+# Requests that need no credentials or data but still pass through the middleware,
+# URL resolver, DRF's request/response cycle, authentication and rendering
+warmup_requests = [
+    ('GET', 'api-task-list-create'),
+    ('GET', 'api-async-task-list'),
+    ('GET', 'api-user-list'),
+    ('POST', 'api-token_refresh'),
+    ('GET', 'login'),
+]
+
+
+def warm_code():
+    """
+    Build everything Django and DRF otherwise set up lazily on the first request.
+    Touches no database or socket, so it is safe in the server process before
+    workers are forked; they inherit the result through copy-on-write memory.
+    """
+    # The first reverse() builds the resolver's lookup tables
+    for _, url_name in warmup_requests:
+        reverse(url_name)
+
+    # DRF and simplejwt import their configured classes on first attribute access
+    for name in ('DEFAULT_RENDERER_CLASSES', 'DEFAULT_PARSER_CLASSES', 'DEFAULT_AUTHENTICATION_CLASSES',
+                 'DEFAULT_PERMISSION_CLASSES', 'DEFAULT_CONTENT_NEGOTIATION_CLASS', 'DEFAULT_PAGINATION_CLASS',
+                 'EXCEPTION_HANDLER'):
+        getattr(api_settings, name)
+    for name in ('AUTH_TOKEN_CLASSES', 'TOKEN_USER_CLASS', 'TOKEN_REFRESH_SERIALIZER', 'TOKEN_OBTAIN_SERIALIZER',
+                 'USER_AUTHENTICATION_RULE'):
+        getattr(jwt_settings, name)
+
+    # ModelSerializer introspects the model the first time its fields are built
+    for serializer_class in (TaskSerializer, TaskBulkSerializer, UserSerializer):
+        serializer_class().fields
+    TaskReadSerializer([], many=True).data
+
+    for name in templates:
+        get_template(name)
+
+
+def warm_worker(application=None):
+    """
+    Per-process warmup, run in each worker after fork and before it accepts
+    connections: open the database connections, load the token blacklist cache
+    and, given a WSGI application, send a few requests through it.
+    """
+    for alias in connections:
+        connections[alias].ensure_connection()
+    blacklist_cache.warm()
+    if application is not None:
+        warm_requests(application)
+
+    # Django connections belong to the thread that opened them, and request threads
+    # open their own. With the pool (DB_POOL) closing hands these back to it still
+    # open, ready for the request threads; without it they can't be reused, and
+    # opening them only checked that the databases are reachable.
+    connections.close_all()
+
+
+def warm_requests(application):
+
+    # The warmup requests are expected to fail with 4xx; don't log them
+    request_logger = logging.getLogger('django.request')
+    level = request_logger.level
+    request_logger.setLevel(logging.ERROR)
+    try:
+        for method, url_name in warmup_requests:
+            response = application(warmup_environ(method, reverse(url_name)), lambda status, headers, exc_info=None: None)
+            response.close()
+    finally:
+        request_logger.setLevel(level)
+
+
+def warmup_environ(method, path):
+    return {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': next((host for host in settings.ALLOWED_HOSTS if '*' not in host), 'localhost').lstrip('.'),
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': '2',
+        'wsgi.input': BytesIO(b'{}'),
+        'wsgi.url_scheme': 'http',
+        'wsgi.errors': StringIO(),
+        'wsgi.version': (1, 0),
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }